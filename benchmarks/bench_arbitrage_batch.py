@@ -0,0 +1,73 @@
+"""
+Compare l'évaluation paire par paire (find_arbitrage_opportunity) et l'évaluation
+vectorisée (find_arbitrage_opportunities_batch) sur 1k, 10k et 100k paires, avec 2 puis 4 DEX.
+
+    python -m benchmarks.bench_arbitrage_batch
+"""
+import time
+from typing import Tuple
+import numpy as np
+from src.arbitrage_logic import ArbitrageLogic
+from src.venues import DEFAULT_VENUES, Venue
+
+
+def generate_pairs(n: int, n_venues: int = 2, seed: int = 42):
+    """
+    Génère des réserves aléatoires (N, V, 2) avec un écart de prix de quelques pourcents entre DEX,
+    chaque paire au-delà des deux premiers DEX n'étant listée que sur une partie d'entre eux
+    """
+    rng = np.random.default_rng(seed)
+    token0_decimals = rng.choice([6, 8, 18], size=n)
+    token1_decimals = rng.choice([6, 8, 18], size=n)
+    reserve0 = rng.uniform(1e3, 1e7, size=n) * 10.0 ** token0_decimals
+    reserve1 = rng.uniform(1e3, 1e7, size=n) * 10.0 ** token1_decimals
+    scale = rng.uniform(0.5, 2.0, size=(n, n_venues))
+    scale[:, 0] = 1.0
+    skew = rng.uniform(0.97, 1.03, size=(n, n_venues))
+    skew[:, 0] = 1.0
+    reserves = np.stack([reserve0[:, None] * scale, reserve1[:, None] * scale * skew], axis=2)
+    if n_venues > 2:
+        reserves[:, 2:][rng.random((n, n_venues - 2)) < 0.5] = 0.0
+    return reserves, token0_decimals, token1_decimals
+
+
+def run_loop(logic: ArbitrageLogic, reserves, token0_decimals, token1_decimals) -> Tuple[int, float]:
+    reserves_int = [[(int(r0), int(r1)) for r0, r1 in venues] for venues in reserves]
+    decimals = list(zip(token0_decimals.tolist(), token1_decimals.tolist()))
+
+    start = time.perf_counter()
+    found = 0
+    for i in range(len(reserves_int)):
+        if logic.find_arbitrage_opportunity(reserves_int[i], *decimals[i]) is not None:
+            found += 1
+    return found, time.perf_counter() - start
+
+
+def run_batch(logic: ArbitrageLogic, reserves, token0_decimals, token1_decimals) -> Tuple[int, float]:
+    start = time.perf_counter()
+    result = logic.find_arbitrage_opportunities_batch(reserves, token0_decimals, token1_decimals)
+    return len(result["indices"]), time.perf_counter() - start
+
+
+def main():
+    print(f"{'DEX':>4} {'paires':>8} {'boucle (s)':>12} {'vectorisé (s)':>14} {'paires/s vect.':>16} {'gain':>8} {'retenues':>9}")
+    for n_venues in (2, 4):
+        # DEX au-delà des deux par défaut : forks fictifs aux frais d'UniswapV2
+        venues = DEFAULT_VENUES + [
+            Venue(f'fork{v}', f'0x{v:040x}', f'0x{v:040x}') for v in range(len(DEFAULT_VENUES), n_venues)
+        ]
+        logic = ArbitrageLogic(min_volume_usdt=25000, min_profit_percent=1.0, venues=venues)
+        for n in (1_000, 10_000, 100_000):
+            data = generate_pairs(n, n_venues)
+            loop_found, loop_time = run_loop(logic, *data)
+            batch_found, batch_time = run_batch(logic, *data)
+            if loop_found != batch_found:
+                print(f"Attention: {loop_found} opportunités (boucle) contre {batch_found} (vectorisé)")
+            print(
+                f"{n_venues:>4} {n:>8} {loop_time:>12.4f} {batch_time:>14.5f} {n / batch_time:>16,.0f} "
+                f"{loop_time / batch_time:>7.0f}x {batch_found:>9}"
+            )
+
+
+if __name__ == '__main__':
+    main()
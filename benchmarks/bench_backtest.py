@@ -0,0 +1,84 @@
+"""
+Backtest d'un mois de blocs (216 000 blocs, 1000 paires) sur un historique Sync synthétique
+écrit sur disque puis relu par memory-map, avec la mémoire maximale du processus.
+
+    python -m benchmarks.bench_backtest
+"""
+import resource
+import tempfile
+import time
+import numpy as np
+from src.arbitrage_logic import ArbitrageLogic
+from src.backtest import Backtester, SyncHistory, SyncHistoryWriter, print_report
+from src.config import USDC_ADDRESS, USDT_ADDRESS, WETH_ADDRESS
+from src.metrics import Metrics
+from src.trading_logic import TradingLogic
+
+BLOCKS_PER_MONTH = 30 * 24 * 300
+ETH_PRICE_USDT = 2000.0
+# Tokens de cotation : (adresse, décimales, prix USD)
+QUOTES = [(USDT_ADDRESS, 6, 1.0), (USDC_ADDRESS, 6, 1.0), (WETH_ADDRESS, 18, ETH_PRICE_USDT)]
+
+
+def write_history(directory: str, n_pairs: int, n_blocks: int, events_per_block: float, seed: int = 42,
+                  chunk_blocks: int = 10_000) -> int:
+    """
+    Historique synthétique : chaque Sync écarte la pool de son prix de référence de quelques pour mille.
+    Le token1 de chaque paire est USDT, USDC ou WETH, pour que volumes et profits aient un prix USD.
+    """
+    rng = np.random.default_rng(seed)
+    decimals0 = rng.choice([6, 8, 18], size=n_pairs)
+    quote = rng.integers(0, len(QUOTES), size=n_pairs)
+    quote_tokens = [QUOTES[q][0] for q in quote.tolist()]
+    decimals1 = np.array([QUOTES[q][1] for q in quote.tolist()])
+    quote_usd = np.array([QUOTES[q][2] for q in quote.tolist()])
+    liquidity_usd = rng.uniform(1e4, 1e7, size=n_pairs)
+    price0_usd = np.exp(rng.uniform(np.log(0.01), np.log(1000), size=n_pairs))
+    base0 = liquidity_usd / price0_usd * 10.0 ** decimals0
+    base1 = liquidity_usd / quote_usd * 10.0 ** decimals1
+    # Pool Uniswap à l'index 2*i, pool Sushiswap plus petite au même prix à l'index 2*i+1
+    scale = np.ones(2 * n_pairs)
+    scale[1::2] = rng.uniform(0.1, 1.0, size=n_pairs)
+    pool_base0 = np.repeat(base0, 2) * scale
+    pool_base1 = np.repeat(base1, 2) * scale
+
+    pairs = [
+        {'token0': f'T{i}', 'token1': quote_tokens[i], 'decimals0': int(decimals0[i]), 'decimals1': int(decimals1[i]),
+         'pools': [f'U{i}', f'S{i}']}
+        for i in range(n_pairs)
+    ]
+    writer = SyncHistoryWriter(directory, pairs)
+    writer.append(np.zeros(2 * n_pairs), np.arange(2 * n_pairs), pool_base0, pool_base1)
+    for first in range(1, n_blocks + 1, chunk_blocks):
+        count = min(chunk_blocks, n_blocks + 1 - first)
+        per_block = rng.poisson(events_per_block, size=count)
+        blocks = np.repeat(np.arange(first, first + count), per_block)
+        pools = rng.integers(0, 2 * n_pairs, size=len(blocks))
+        move = np.exp(rng.normal(0.0, 0.003, size=len(blocks)))
+        writer.append(blocks, pools, pool_base0[pools] * move, pool_base1[pools] / move)
+    writer.close()
+    return writer.rows
+
+
+def main():
+    n_pairs, n_blocks = 1000, BLOCKS_PER_MONTH
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        rows = write_history(directory, n_pairs, n_blocks, events_per_block=4.0)
+        print(f"Historique : {rows:,} lignes ({rows * 24 / 1e6:.0f} Mo) écrites en {time.perf_counter() - start:.1f} s")
+
+        logic = ArbitrageLogic(min_volume_usdt=1000, min_profit_percent=0.7, metrics=Metrics(enabled=False))
+        trading = TradingLogic(None, None, None, metrics=Metrics(enabled=False))
+        backtester = Backtester(logic, trading, gas_price_gwei=20.0, eth_price_usdt=ETH_PRICE_USDT)
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        report = backtester.run(SyncHistory(directory), chunk_rows=1 << 18)
+        sweep = backtester.sweep(report['events'], [0.6, 0.7, 1.0], [0, 1000, 25000])
+        print_report(report, sweep)
+        print(f"Débit : {report['blocks'] / report['elapsed_s']:,.0f} blocs/s, "
+              f"{report['rows'] / report['elapsed_s']:,.0f} événements/s")
+        print(f"Mémoire max : {rss_before / 1024:.0f} Mo avant le rejeu, "
+              f"{resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} Mo après")
+
+
+if __name__ == '__main__':
+    main()
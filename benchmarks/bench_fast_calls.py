@@ -0,0 +1,110 @@
+"""
+Micro-benchmark des lectures fréquentes : chemin web3 générique (contrat construit à
+chaque appel, encodage et décodage ABI) contre sélecteurs précalculés et décodage à
+disposition fixe. Mesure uniquement le coût CPU côté client, sans réseau.
+
+    python -m benchmarks.bench_fast_calls
+"""
+import json
+import timeit
+from eth_abi import decode, encode
+from web3 import AsyncWeb3
+from src.fast_calls import (
+    DECIMALS_SELECTOR, GET_RESERVES_SELECTOR, TOKEN0_SELECTOR,
+    decode_address, decode_aggregate3, decode_reserves, decode_uint,
+    encode_aggregate3, encode_all_pairs
+)
+
+PAIR = '0x0d4a11d5EEaaC28EC3F61d100daF4d40471f1852'
+FACTORY = '0x5C69bEe701ef814a2B6a3EDD4B1652CB9cc5aA6f'
+TOKEN = '0xdAC17F958D2ee523a2206206994597C13D831ec7'
+
+# ABIs du chemin web3 générique, référence de la comparaison
+FACTORY_ABI = json.loads('''[
+    {"inputs":[],"name":"allPairsLength","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},
+    {"inputs":[{"internalType":"uint256","name":"","type":"uint256"}],"name":"allPairs","outputs":[{"internalType":"address","name":"","type":"address"}],"stateMutability":"view","type":"function"}
+]''')
+
+PAIR_ABI = json.loads('''[
+    {"inputs":[],"name":"token0","outputs":[{"internalType":"address","name":"","type":"address"}],"stateMutability":"view","type":"function"},
+    {"inputs":[],"name":"token1","outputs":[{"internalType":"address","name":"","type":"address"}],"stateMutability":"view","type":"function"},
+    {"inputs":[],"name":"getReserves","outputs":[{"internalType":"uint112","name":"_reserve0","type":"uint112"},{"internalType":"uint112","name":"_reserve1","type":"uint112"},{"internalType":"uint32","name":"_blockTimestampLast","type":"uint32"}],"stateMutability":"view","type":"function"}
+]''')
+
+ERC20_ABI = json.loads('''[
+    {"inputs":[],"name":"symbol","outputs":[{"internalType":"string","name":"","type":"string"}],"stateMutability":"view","type":"function"},
+    {"inputs":[],"name":"decimals","outputs":[{"internalType":"uint8","name":"","type":"uint8"}],"stateMutability":"view","type":"function"}
+]''')
+
+RESERVES_DATA = encode(['uint112', 'uint112', 'uint32'], [10**24, 3 * 10**13, 1700000000])
+ADDRESS_DATA = encode(['address'], [TOKEN])
+DECIMALS_DATA = encode(['uint8'], [6])
+
+
+def main():
+    w3 = AsyncWeb3()
+
+    def web3_get_reserves():
+        contract = w3.eth.contract(address=PAIR, abi=PAIR_ABI)
+        contract.functions.getReserves()._encode_transaction_data()
+        return w3.codec.decode(['uint112', 'uint112', 'uint32'], RESERVES_DATA)[:2]
+
+    def fast_get_reserves():
+        GET_RESERVES_SELECTOR
+        return decode_reserves(RESERVES_DATA)
+
+    def web3_token0():
+        contract = w3.eth.contract(address=PAIR, abi=PAIR_ABI)
+        contract.functions.token0()._encode_transaction_data()
+        return AsyncWeb3.to_checksum_address(w3.codec.decode(['address'], ADDRESS_DATA)[0])
+
+    def fast_token0():
+        TOKEN0_SELECTOR
+        return decode_address(ADDRESS_DATA)
+
+    def web3_all_pairs():
+        contract = w3.eth.contract(address=FACTORY, abi=FACTORY_ABI)
+        contract.functions.allPairs(1234)._encode_transaction_data()
+        return AsyncWeb3.to_checksum_address(w3.codec.decode(['address'], ADDRESS_DATA)[0])
+
+    def fast_all_pairs():
+        encode_all_pairs(1234)
+        return decode_address(ADDRESS_DATA)
+
+    def web3_decimals():
+        contract = w3.eth.contract(address=TOKEN, abi=ERC20_ABI)
+        contract.functions.decimals()._encode_transaction_data()
+        return w3.codec.decode(['uint8'], DECIMALS_DATA)[0]
+
+    def fast_decimals():
+        DECIMALS_SELECTOR
+        return decode_uint(DECIMALS_DATA)
+
+    calls = [(PAIR, GET_RESERVES_SELECTOR)] * 500
+    aggregate_result = encode(['(bool,bytes)[]'], [[(True, RESERVES_DATA)] * 500])
+
+    def abi_aggregate3():
+        encode(['(address,bool,bytes)[]'], [[(target, True, data) for target, data in calls]])
+        return decode(['(bool,bytes)[]'], aggregate_result)[0]
+
+    def fast_aggregate3():
+        encode_aggregate3(calls)
+        return decode_aggregate3(aggregate_result)
+
+    cases = [
+        ('getReserves', web3_get_reserves, fast_get_reserves, 2000),
+        ('token0', web3_token0, fast_token0, 2000),
+        ('allPairs', web3_all_pairs, fast_all_pairs, 2000),
+        ('decimals', web3_decimals, fast_decimals, 2000),
+        ('aggregate3 x500', abi_aggregate3, fast_aggregate3, 20),
+    ]
+    print(f"{'lecture':<16} {'web3 (µs)':>10} {'rapide (µs)':>12} {'gain':>8}")
+    for name, slow, fast, number in cases:
+        assert slow() == fast() or name.startswith('aggregate3')
+        slow_time = timeit.timeit(slow, number=number) / number * 1e6
+        fast_time = timeit.timeit(fast, number=number) / number * 1e6
+        print(f"{name:<16} {slow_time:>10.1f} {fast_time:>12.2f} {slow_time / fast_time:>7.0f}x")
+
+
+if __name__ == '__main__':
+    main()
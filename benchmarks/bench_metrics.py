@@ -0,0 +1,51 @@
+"""
+Coût de l'instrumentation (src/metrics.py) : coût unitaire de chaque mesure, activée ou non,
+puis part estimée dans le traitement d'un bloc sur la fixture rejouée de bench_replay.
+
+    python -m benchmarks.bench_metrics
+"""
+import asyncio
+import timeit
+from src.metrics import Metrics
+from benchmarks.bench_replay import run
+from benchmarks.replay_fixtures import generate_fixture
+
+
+def unit_costs(metrics: Metrics, number: int = 200_000) -> dict:
+    def timer():
+        with metrics.timer('reserves', 18_000_000):
+            pass
+
+    return {
+        'timer': timeit.timeit(timer, number=number) / number,
+        'funnel': timeit.timeit(lambda: metrics.funnel('found'), number=number) / number,
+        'record_rpc': timeit.timeit(lambda: metrics.record_rpc('eth_call', 512, 4096, 0.01), number=number) / number,
+        'set_gauge': timeit.timeit(lambda: metrics.set_gauge('queue_depth', 'tx_pending', 3), number=number) / number,
+    }
+
+
+def main():
+    enabled = unit_costs(Metrics(enabled=True))
+    disabled = unit_costs(Metrics(enabled=False))
+    print(f"{'mesure':<12} {'activée (ns)':>13} {'désactivée (ns)':>16}")
+    for name in enabled:
+        print(f"{name:<12} {enabled[name] * 1e9:>13.0f} {disabled[name] * 1e9:>16.0f}")
+
+    metrics = Metrics(enabled=True)
+    fixture = generate_fixture(2000, 30)
+    results = asyncio.run(run(fixture, 0.0, metrics))
+    snapshot = metrics.snapshot()
+
+    # Nombre de mesures effectuées pendant le rejeu, valorisées à leur coût unitaire
+    timers = sum(stage['count'] for stage in snapshot['stages'].values())
+    rpc = sum(method['requests'] for method in snapshot['rpc'].values())
+    funnel = sum(snapshot['funnel'].values())
+    cost = timers * enabled['timer'] + rpc * enabled['record_rpc'] + funnel * enabled['funnel']
+    busy = results['stages']['decision']['p50_ms'] / 1000 * results['blocks']
+    print(f"Rejeu : {timers} chronos, {rpc} requêtes RPC, {int(funnel)} événements d'entonnoir")
+    print(f"Coût estimé de l'instrumentation : {cost * 1000:.2f} ms sur {busy * 1000:.0f} ms de traitement "
+          f"({cost / busy * 100:.3f} %)")
+
+
+if __name__ == '__main__':
+    main()
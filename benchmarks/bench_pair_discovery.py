@@ -0,0 +1,77 @@
+"""
+Démarrage sur un univers ciblé : parcours complet de allPairs (registre vide) contre découverte
+par CREATE2 des paires token préféré × token de base, sur une fixture synthétique rejouée
+derrière un serveur JSON-RPC local avec latence simulée.
+
+    python -m benchmarks.bench_pair_discovery
+    python -m benchmarks.bench_pair_discovery --pairs 20000 --preferred 100 --latency 0.05
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from web3 import AsyncWeb3
+from src.metrics import Metrics
+from src.rpc_transport import PooledAsyncProvider
+from benchmarks.bench_replay import make_scanner
+from benchmarks.replay_fixtures import ReplayChain, fixture_venues, generate_fixture
+
+
+async def run(args):
+    fixture = generate_fixture(args.pairs, 1, n_venues=args.venues)
+    chain = ReplayChain(fixture)
+    venues = fixture_venues(fixture)
+    server = chain.server(args.latency)
+    url = server.start_in_thread()
+    provider = PooledAsyncProvider([url], requests_per_second=10**6, max_connections=64)
+    w3 = AsyncWeb3(provider)
+    # Les paires communes de la fixture relient TK{i} à TK{i+1} : les tokens pairs sont les
+    # tokens préférés, les tokens impairs les tokens de base
+    tokens = [fixture['pairs'][pair][0] for pair in fixture['factories'][venues[1].factory][::2]]
+    preferred = tokens[0:2 * args.preferred:2]
+    base = tokens[1:2 * args.base:2]
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            before = server.requests
+            start = time.perf_counter()
+            scanner = make_scanner(w3, workdir, Metrics(enabled=False), venues)
+            await scanner.scan_dex_pairs(max_pairs=10**9)
+            scan_time = time.perf_counter() - start
+            scan_calls = server.requests - before
+            expected = {pair for token in preferred for pair in scanner.pairs_of(token) if set(pair) & set(base)}
+
+        with tempfile.TemporaryDirectory() as workdir:
+            before = server.requests
+            start = time.perf_counter()
+            scanner = make_scanner(w3, workdir, Metrics(enabled=False), venues)
+            found = await scanner.discover_pairs(preferred, base)
+            discover_time = time.perf_counter() - start
+            discover_calls = server.requests - before
+    finally:
+        await provider.close()
+        server.stop_thread()
+
+    print(f"Fixture : {len(chain.pairs)} paires sur {len(venues)} DEX, latence RPC simulée {args.latency * 1000:.0f} ms")
+    print(f"Univers ciblé : {len(preferred)} tokens préférés × {len(base)} tokens de base "
+          f"({len(preferred) * len(base) * len(venues)} adresses candidates)")
+    print(f"{'méthode':<22} {'durée (s)':>10} {'appels RPC':>11} {'paires':>8}")
+    print(f"{'allPairs complet':<22} {scan_time:>10.3f} {scan_calls:>11} {len(expected):>8}")
+    print(f"{'CREATE2 ciblé':<22} {discover_time:>10.3f} {discover_calls:>11} {len(found):>8}")
+    if set(found) != expected:
+        print(f"Attention : {len(set(found) ^ expected)} paires diffèrent entre les deux méthodes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Découverte ciblée par CREATE2 contre parcours de allPairs")
+    parser.add_argument('--pairs', type=int, default=5000, help="Paires communes de la fixture")
+    parser.add_argument('--venues', type=int, default=2)
+    parser.add_argument('--preferred', type=int, default=50, help="Nombre de tokens préférés")
+    parser.add_argument('--base', type=int, default=50, help="Nombre de tokens de base")
+    parser.add_argument('--latency', type=float, default=0.02, help="Latence RPC simulée, en secondes")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    main()
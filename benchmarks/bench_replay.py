@@ -0,0 +1,208 @@
+"""
+Rejoue une fixture de blocs (enregistrée ou synthétique) derrière un serveur JSON-RPC local
+et fait tourner DexScanner, ArbitrageLogic et TradingLogic de bout en bout, sans mainnet.
+
+Mesures : scan à froid et à chaud, appels RPC par bloc (par méthode), délai entre l'arrivée
+d'un bloc et la décision, p50/p99 de chaque étape.
+
+    python -m benchmarks.bench_replay
+    python -m benchmarks.bench_replay --fixture replay.json --output resultats.json
+"""
+from typing import Dict, List, Optional
+from collections import Counter
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import numpy as np
+from web3 import AsyncWeb3
+from src.arbitrage_logic import ArbitrageLogic
+from src.dex_scanner import DexScanner
+from src.fee_oracle import BlockFeeOracle
+from src.metrics import Metrics
+from src.multicall import Multicall
+from src.pair_registry import PairRegistry
+from src.rpc_transport import PooledAsyncProvider
+from src.stats_journal import StatsJournal
+from src.stats_manager import StatsManager
+from src.token_store import TokenStore
+from src.trading_logic import TradingLogic
+from src.venues import Venue
+from benchmarks.replay_fixtures import ReplayChain, fixture_venues, generate_fixture, load_fixture
+
+STAGES = ('head', 'reserves', 'screen', 'evaluate', 'analyze', 'decision')
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    values = np.asarray(samples) * 1000
+    return {'p50_ms': float(np.percentile(values, 50)), 'p99_ms': float(np.percentile(values, 99))}
+
+
+def make_scanner(w3, workdir: str, metrics: Metrics, venues: List[Venue]) -> DexScanner:
+    multicall = Multicall(w3)
+    return DexScanner(
+        w3, venues, multicall,
+        PairRegistry(os.path.join(workdir, 'pair_registry.json')),
+        TokenStore(multicall, os.path.join(workdir, 'token_metadata.json')),
+        metrics
+    )
+
+
+async def replay_block(
+    w3, scanner: DexScanner, logic: ArbitrageLogic, trading: TradingLogic, decimals: np.ndarray
+) -> Dict[str, float]:
+    """Traite un bloc comme le ferait le bot : en-tête, réserves, filtrage vectorisé, calcul exact, analyse"""
+    timings = {}
+    start = time.perf_counter()
+
+    block_number = await w3.eth.block_number
+    trading.fee_oracle.on_new_block(block_number)
+    timings['head'] = time.perf_counter()
+
+    snapshot = await scanner.get_reserves_batch(scanner.common_pairs, block_number)
+    timings['reserves'] = time.perf_counter()
+
+    # Tokens synthétiques sans prix USD : le token1 sert d'unité de compte (valorisation par défaut)
+    candidates = logic.find_arbitrage_opportunities_batch(
+        snapshot.as_array(), decimals[:, 0], decimals[:, 1], block_number
+    )
+    timings['screen'] = time.perf_counter()
+
+    opportunities = []
+    for i in candidates['indices'].tolist():
+        token0, token1 = snapshot.pairs[i]
+        opportunity = logic.find_arbitrage_opportunity(
+            snapshot.venue_reserves(i), int(decimals[i, 0]), int(decimals[i, 1]), block_number
+        )
+        if opportunity is not None:
+            opportunities.append({
+                **opportunity,
+                'token0': token0,
+                'token1': token1,
+                'block_number': block_number
+            })
+    timings['evaluate'] = time.perf_counter()
+
+    decisions = await asyncio.gather(*(trading.analyze_opportunity(opportunity) for opportunity in opportunities))
+    timings['analyze'] = timings['decision'] = time.perf_counter()
+
+    previous = start
+    durations = {}
+    for stage in STAGES[:-1]:
+        durations[stage] = timings[stage] - previous
+        previous = timings[stage]
+    durations['decision'] = timings['decision'] - start
+    durations['candidates'] = len(opportunities)
+    durations['accepted'] = sum(decision is not None for decision in decisions)
+    return durations
+
+
+async def run(fixture: Dict, latency: float, metrics: Optional[Metrics] = None) -> Dict:
+    metrics = metrics or Metrics()
+    chain = ReplayChain(fixture)
+    venues = fixture_venues(fixture)
+    server = chain.server(latency)
+    url = server.start_in_thread()
+    provider = PooledAsyncProvider([url], requests_per_second=10**6, max_connections=64, metrics=metrics)
+    w3 = AsyncWeb3(provider)
+    results: Dict = {
+        'pairs': len(chain.pairs), 'venues': len(venues), 'blocks': len(chain.blocks), 'latency_ms': latency * 1000
+    }
+
+    with tempfile.TemporaryDirectory() as workdir:
+        try:
+            # Scan à froid : registre et métadonnées vides
+            before = server.requests
+            start = time.perf_counter()
+            scanner = make_scanner(w3, workdir, metrics, venues)
+            await scanner.scan_dex_pairs(max_pairs=10**9)
+            results['cold_scan_s'] = time.perf_counter() - start
+            results['cold_scan_rpc_calls'] = server.requests - before
+
+            # Scan à chaud : nouveau scanner relisant registre et métadonnées persistés
+            before = server.requests
+            start = time.perf_counter()
+            scanner = make_scanner(w3, workdir, metrics, venues)
+            common_pairs = await scanner.scan_dex_pairs(max_pairs=10**9)
+            results['warm_scan_s'] = time.perf_counter() - start
+            results['warm_scan_rpc_calls'] = server.requests - before
+            results['common_pairs'] = len(common_pairs)
+
+            decimals = np.array([
+                [scanner.token_store.get(token0)['decimals'], scanner.token_store.get(token1)['decimals']]
+                for token0, token1 in common_pairs
+            ], dtype=np.int64).reshape(-1, 2)
+            logic = ArbitrageLogic(min_volume_usdt=0, min_profit_percent=0.5, metrics=metrics, venues=venues)
+            stats = StatsManager(StatsJournal(
+                os.path.join(workdir, 'stats_journal.jsonl'), os.path.join(workdir, 'stats.json')
+            ))
+            trading = TradingLogic(w3, None, stats, BlockFeeOracle(w3, metrics=metrics), metrics)
+
+            samples: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+            calls_per_block: List[int] = []
+            methods: Counter = Counter()
+            candidates = accepted = 0
+            while True:
+                before_requests, before_methods = server.requests, Counter(server.calls)
+                durations = await replay_block(w3, scanner, logic, trading, decimals)
+                calls_per_block.append(server.requests - before_requests)
+                methods.update(Counter(server.calls) - before_methods)
+                for stage in STAGES:
+                    samples[stage].append(durations[stage])
+                candidates += durations['candidates']
+                accepted += durations['accepted']
+                if not chain.advance():
+                    break
+            stats.journal.close()
+
+            results['rpc_calls_per_block'] = float(np.mean(calls_per_block))
+            results['rpc_calls_per_block_by_method'] = {
+                method: count / len(calls_per_block) for method, count in sorted(methods.items())
+            }
+            results['stages'] = {stage: percentiles(samples[stage]) for stage in STAGES}
+            results['candidates'] = candidates
+            results['accepted'] = accepted
+            results['funnel'] = metrics.snapshot()['funnel']
+        finally:
+            await provider.close()
+            server.stop_thread()
+    return results
+
+
+def report(results: Dict):
+    print(f"Fixture : {results['pairs']} paires sur {results['venues']} DEX, {results['blocks']} blocs, "
+          f"{results['common_pairs']} paires communes, "
+          f"latence RPC simulée {results['latency_ms']:.1f} ms")
+    print(f"Scan à froid : {results['cold_scan_s']:.3f} s ({results['cold_scan_rpc_calls']} appels RPC)")
+    print(f"Scan à chaud : {results['warm_scan_s']:.3f} s ({results['warm_scan_rpc_calls']} appels RPC)")
+    by_method = ', '.join(f"{method} {count:.1f}" for method, count in results['rpc_calls_per_block_by_method'].items())
+    print(f"Appels RPC par bloc : {results['rpc_calls_per_block']:.1f} ({by_method})")
+    print(f"Opportunités : {results['candidates']} candidates, {results['accepted']} retenues après frais")
+    print("Entonnoir : " + ' -> '.join(f"{stage} {count:.0f}" for stage, count in results['funnel'].items()))
+    print(f"{'étape':<10} {'p50 (ms)':>10} {'p99 (ms)':>10}")
+    for stage, values in results['stages'].items():
+        print(f"{stage:<10} {values['p50_ms']:>10.2f} {values['p99_ms']:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de bout en bout sur fixtures rejouées")
+    parser.add_argument('--fixture', help="Fixture JSON (par défaut : fixture synthétique)")
+    parser.add_argument('--pairs', type=int, default=2000)
+    parser.add_argument('--blocks', type=int, default=50)
+    parser.add_argument('--venues', type=int, default=2, help="Nombre de DEX de la fixture synthétique")
+    parser.add_argument('--latency', type=float, default=0.0, help="Latence RPC simulée, en secondes")
+    parser.add_argument('--output', help="Écrit les résultats en JSON pour comparaison entre versions")
+    args = parser.parse_args()
+
+    fixture = load_fixture(args.fixture) if args.fixture else generate_fixture(args.pairs, args.blocks, n_venues=args.venues)
+    results = asyncio.run(run(fixture, args.latency))
+    report(results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Mesure le transport RPC mutualisé (PooledAsyncProvider) contre AsyncHTTPProvider
+sur des serveurs JSON-RPC locaux : débit, mutualisation des lectures identiques,
+routage selon la latence et bascule lorsqu'un endpoint tombe.
+
+    python -m benchmarks.bench_rpc_transport
+"""
+import asyncio
+import time
+from web3 import AsyncWeb3
+from web3.providers.async_rpc import AsyncHTTPProvider
+from src.rpc_transport import PooledAsyncProvider
+from benchmarks.mock_rpc import MockRpcServer
+
+
+async def timed_requests(w3: AsyncWeb3, n: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            await w3.eth.get_balance(AsyncWeb3.to_checksum_address(f'0x{i:040x}'))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(n)))
+    return time.perf_counter() - start
+
+
+async def main():
+    fast = MockRpcServer({'eth_getBalance': lambda params: hex(10**18)}, latency=0.002)
+    slow = MockRpcServer({'eth_getBalance': lambda params: hex(10**18)}, latency=0.020)
+    fast_url = await fast.start()
+    slow_url = await slow.start()
+
+    # Débit : 2000 lectures distinctes, 50 en parallèle
+    baseline = AsyncWeb3(AsyncHTTPProvider(fast_url))
+    baseline_time = await timed_requests(baseline, 2000, 50)
+    pooled_provider = PooledAsyncProvider([fast_url], requests_per_second=10**6, max_connections=50)
+    pooled = AsyncWeb3(pooled_provider)
+    pooled_time = await timed_requests(pooled, 2000, 50)
+    print(f"Débit AsyncHTTPProvider : {2000 / baseline_time:,.0f} req/s")
+    print(f"Débit PooledAsyncProvider : {2000 / pooled_time:,.0f} req/s")
+
+    # Mutualisation : 100 appelants demandent le même prix du gas au même moment
+    before = fast.calls['eth_gasPrice']
+    await asyncio.gather(*(pooled.eth.gas_price for _ in range(100)))
+    print(f"Mutualisation : 100 appels gas_price -> {fast.calls['eth_gasPrice'] - before} requête(s) envoyée(s)")
+    await pooled_provider.close()
+
+    # Routage : deux endpoints, le plus rapide doit recevoir l'essentiel du trafic
+    routed_provider = PooledAsyncProvider([slow_url, fast_url], requests_per_second=10**6)
+    routed = AsyncWeb3(routed_provider)
+    fast_before, slow_before = fast.requests, slow.requests
+    await timed_requests(routed, 500, 1)
+    print(f"Routage : rapide {fast.requests - fast_before} req, lent {slow.requests - slow_before} req")
+
+    # Bascule : l'endpoint rapide tombe, les requêtes doivent aboutir sur l'autre
+    fast.failing = True
+    start = time.perf_counter()
+    await timed_requests(routed, 200, 10)
+    print(f"Bascule : 200 requêtes abouties en {time.perf_counter() - start:.2f} s avec l'endpoint rapide en panne")
+    await routed_provider.close()
+
+    await fast.stop()
+    await slow.stop()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,138 @@
+"""
+Débit du moteur multi-processus (ShardedEngine) selon le nombre de processus, comparé à
+l'évaluation dans un seul processus : 100k paires, 20 % de paires modifiées par bloc.
+
+    python -m benchmarks.bench_sharded
+    python -m benchmarks.bench_sharded --pairs 200000 --changed 0.5 --workers 1 2 4 8
+"""
+from typing import Dict, List, Tuple
+import argparse
+import asyncio
+import os
+import time
+import numpy as np
+from src.arbitrage_logic import ArbitrageLogic, PairUsdPrices
+from src.config import USDT_ADDRESS
+from src.metrics import Metrics
+from src.reserves import ReserveSnapshot
+from src.sharded_engine import ShardedEngine
+from src.venues import DEFAULT_VENUES
+from benchmarks.bench_arbitrage_batch import generate_pairs
+
+ETH_PRICE_USDT = 2000.0
+
+
+def generate_blocks(reserves: np.ndarray, n_blocks: int, changed: float, seed: int = 7) -> List[List[Tuple[int, int, int, int]]]:
+    """Mises à jour (paire, DEX, reserve0, reserve1) de chaque bloc, le premier contenant toutes les paires"""
+    rng = np.random.default_rng(seed)
+    n_pairs, n_venues, _ = reserves.shape
+    current = reserves.copy()
+    blocks = [[
+        (i, v, int(current[i, v, 0]), int(current[i, v, 1])) for i in range(n_pairs) for v in range(n_venues)
+    ]]
+    for _ in range(n_blocks):
+        pairs = rng.choice(n_pairs, size=int(n_pairs * changed), replace=False)
+        venues = rng.integers(0, n_venues, size=len(pairs))
+        move = rng.uniform(0.995, 1.005, size=len(pairs))
+        current[pairs, venues, 0] *= move
+        current[pairs, venues, 1] /= move
+        blocks.append([
+            (i, v, int(current[i, v, 0]), int(current[i, v, 1]))
+            for i, v in zip(pairs.tolist(), venues.tolist())
+        ])
+    return blocks
+
+
+def make_pairs(n_pairs: int) -> List[Tuple[str, str]]:
+    """Paires synthétiques cotées en USDT, pour que les profits aient un prix USD"""
+    return [(f'T{i}', USDT_ADDRESS) for i in range(n_pairs)]
+
+
+def run_single(blocks, decimals0, decimals1, n_venues: int, min_profit_usdt: float) -> Tuple[float, int]:
+    """Même traitement que le moteur multi-processus (écriture vectorisée, filtrage, calcul exact), dans un seul processus"""
+    logic = ArbitrageLogic(25000, 1.0, Metrics(enabled=False), DEFAULT_VENUES[:n_venues])
+    pairs = make_pairs(len(decimals0))
+    usd_prices = PairUsdPrices(pairs).prices(ETH_PRICE_USDT)
+    snapshot = ReserveSnapshot(0, pairs, n_venues)
+    screen_reserves = np.zeros((len(decimals0), n_venues, 2), dtype=np.float64)
+    found = 0
+    start = time.perf_counter()
+    for block_number, updates in enumerate(blocks):
+        for i, venue, reserve0, reserve1 in updates:
+            snapshot.set_reserves(i, venue, reserve0, reserve1)
+        values = np.array(updates, dtype=np.float64)
+        rows = values[:, 0].astype(np.int64)
+        screen_reserves[rows, values[:, 1].astype(np.int64)] = values[:, 2:4]
+        touched = np.unique(rows)
+        result = logic.find_arbitrage_opportunities_batch(
+            screen_reserves[touched], decimals0[touched], decimals1[touched], usd_prices=usd_prices[touched]
+        )
+        for i in touched[result['indices']].tolist():
+            opportunity = logic.find_arbitrage_opportunity(
+                snapshot.venue_reserves(i), int(decimals0[i]), int(decimals1[i]), block_number, tuple(usd_prices[i].tolist())
+            )
+            if opportunity is not None and block_number > 0:
+                found += opportunity['expected_profit_usdt'] > min_profit_usdt
+        if block_number == 0:
+            # Le premier bloc initialise les réserves, il n'est pas chronométré
+            start = time.perf_counter()
+    return time.perf_counter() - start, found
+
+
+async def run_sharded(
+    blocks, decimals0, decimals1, n_venues: int, workers: int, min_profit_usdt: float
+) -> Tuple[float, int]:
+    engine = ShardedEngine(
+        workers=workers, min_volume_usdt=25000, min_profit_percent=1.0,
+        venues=DEFAULT_VENUES[:n_venues], metrics=Metrics(enabled=False)
+    )
+    engine.start(make_pairs(len(decimals0)), zip(decimals0.tolist(), decimals1.tolist()))
+    try:
+        found = 0
+        start = time.perf_counter()
+        for block_number, updates in enumerate(blocks):
+            candidates = await engine.evaluate(block_number, updates, min_profit_usdt, ETH_PRICE_USDT)
+            if block_number == 0:
+                # Bloc d'initialisation (et démarrage des processus) non chronométré
+                start = time.perf_counter()
+            else:
+                found += len(candidates)
+        return time.perf_counter() - start, found
+    finally:
+        engine.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Débit du moteur multi-processus")
+    parser.add_argument('--pairs', type=int, default=100_000)
+    parser.add_argument('--venues', type=int, default=2)
+    parser.add_argument('--blocks', type=int, default=20)
+    parser.add_argument('--changed', type=float, default=0.2, help="Part des paires modifiées par bloc")
+    parser.add_argument('--workers', type=int, nargs='+')
+    parser.add_argument('--min-profit-usdt', type=float, default=12.0, help="Coût du gas simulé : 300k gas à 20 gwei")
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    workers = args.workers or sorted({1, 2, 4, cores} | {w for w in (8, 16) if w <= cores})
+    reserves, decimals0, decimals1 = generate_pairs(args.pairs, args.venues)
+    # Tous les DEX au même prix au départ : seuls les swaps des blocs suivants créent des écarts
+    reserves[:, :, 1] = reserves[:, :, 0] * (reserves[:, 0, 1] / reserves[:, 0, 0])[:, None]
+    blocks = generate_blocks(reserves, args.blocks, args.changed)
+    updates = sum(len(block) for block in blocks[1:])
+    print(f"{args.pairs:,} paires sur {args.venues} DEX, {args.blocks} blocs, {updates:,} mises à jour, {cores} cœurs")
+
+    elapsed, found = run_single(blocks, decimals0, decimals1, args.venues, args.min_profit_usdt)
+    baseline = updates / elapsed
+    print(f"{'processus':>10} {'durée (s)':>10} {'màj/s':>12} {'accélération':>13} {'candidats':>10}")
+    print(f"{'(aucun)':>10} {elapsed:>10.2f} {baseline:>12,.0f} {1.0:>12.2f}x {found:>10}")
+    for count in workers:
+        elapsed, sharded_found = asyncio.run(run_sharded(
+            blocks, decimals0, decimals1, args.venues, count, args.min_profit_usdt
+        ))
+        if sharded_found != found:
+            print(f"Attention: {sharded_found} candidats contre {found} dans un seul processus")
+        print(f"{count:>10} {elapsed:>10.2f} {updates / elapsed:>12,.0f} {updates / elapsed / baseline:>12.2f}x {sharded_found:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Enregistre 100k événements (90 % d'opportunités, 10 % de trades) avec le journal
+append-only et compare avec l'ancienne réécriture complète de stats.json,
+mesurée sur un échantillon plus petit puisque son coût croît avec l'historique.
+
+    python -m benchmarks.bench_stats_journal
+"""
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+from src.stats_journal import StatsJournal
+from src.stats_manager import StatsManager
+
+TRADE = {'pair': 'WETH/USDT', 'profit_usdt': 12.5, 'volume_usdt': 25000.0, 'profit_percent': 1.2}
+
+
+def record_events(manager: StatsManager, n: int):
+    for i in range(n):
+        if i % 10 == 0:
+            manager.add_trade(TRADE)
+        else:
+            manager.add_opportunity_found()
+
+
+def legacy_record_events(path: str, n: int):
+    """Reproduit l'ancien comportement : copie du dict et json.dump(indent=2) à chaque événement"""
+    stats = {'total_pnl': 0.0, 'opportunities_found': 0, 'opportunities_taken': 0,
+             'total_volume': 0.0, 'trades': [], 'preferred_tokens': set()}
+    for i in range(n):
+        if i % 10 == 0:
+            stats['opportunities_taken'] += 1
+            stats['total_pnl'] += TRADE['profit_usdt']
+            stats['trades'].append({'timestamp': datetime.now().isoformat(), **TRADE})
+        else:
+            stats['opportunities_found'] += 1
+        with open(path, 'w') as f:
+            save_data = stats.copy()
+            save_data['preferred_tokens'] = list(save_data['preferred_tokens'])
+            json.dump(save_data, f, indent=2)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        journal = StatsJournal(
+            journal_path=os.path.join(directory, 'stats_journal.jsonl'),
+            snapshot_path=os.path.join(directory, 'stats.json')
+        )
+        manager = StatsManager(journal)
+
+        n = 100_000
+        start = time.perf_counter()
+        record_events(manager, n)
+        journal.sync()
+        elapsed = time.perf_counter() - start
+        print(f"Journal : {n} événements en {elapsed:.2f} s ({n / elapsed:,.0f} événements/s)")
+
+        start = time.perf_counter()
+        pnl = manager.get_pnl_last(3600)
+        print(f"PnL sur 1 h : {pnl['pnl_usdt']:.1f} USDT, {pnl['trades']} trades "
+              f"(requête en {(time.perf_counter() - start) * 1e6:.0f} µs)")
+
+        start = time.perf_counter()
+        reloaded = StatsManager(StatsJournal(
+            journal_path=os.path.join(directory, 'stats_journal.jsonl'),
+            snapshot_path=os.path.join(directory, 'stats.json')
+        ))
+        assert reloaded.stats['opportunities_found'] == manager.stats['opportunities_found']
+        assert reloaded.get_average_profit() == manager.get_average_profit()
+        print(f"Rechargement après redémarrage : {time.perf_counter() - start:.2f} s")
+
+        legacy_n = 5_000
+        start = time.perf_counter()
+        legacy_record_events(os.path.join(directory, 'legacy_stats.json'), legacy_n)
+        elapsed = time.perf_counter() - start
+        print(f"Ancienne méthode : {legacy_n} événements en {elapsed:.2f} s ({legacy_n / elapsed:,.0f} événements/s)")
+
+
+if __name__ == '__main__':
+    main()
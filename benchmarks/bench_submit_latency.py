@@ -0,0 +1,135 @@
+"""
+Latence du chemin critique entre la décision et la diffusion d'une transaction d'arbitrage :
+construction d'origine (dernier bloc pour l'échéance, estimation de gas, prix du gas, encodage
+web3, signature) contre calldata préparée, gas en cache par route et frais du bloc en cache.
+Serveur JSON-RPC local avec plusieurs latences simulées.
+
+    python -m benchmarks.bench_submit_latency
+"""
+from typing import Dict, List
+from collections import Counter
+import asyncio
+import time
+import numpy as np
+from eth_abi import encode
+from eth_utils import keccak
+from web3 import AsyncWeb3
+from src.amm_math import apply_slippage
+from src.metrics import Metrics
+from src.rpc_transport import PooledAsyncProvider
+from src.trade_executor import TradeExecutor
+from benchmarks.mock_rpc import MockRpcServer
+
+PRIVATE_KEY = '0x' + '11' * 32
+BLOCK_NUMBER = 18_000_000
+TOKENS = [AsyncWeb3.to_checksum_address(f'0x{0x7000 + i:040x}') for i in range(20)]
+
+
+def make_server(latency: float) -> MockRpcServer:
+    return MockRpcServer({
+        'eth_getBlockByNumber': lambda params: {
+            'number': hex(BLOCK_NUMBER), 'hash': '0x' + '11' * 32, 'parentHash': '0x' + '00' * 32,
+            'timestamp': hex(1_700_000_000), 'baseFeePerGas': hex(20 * 10**9),
+            'gasLimit': hex(30_000_000), 'gasUsed': hex(15_000_000), 'transactions': []
+        },
+        'eth_estimateGas': lambda params: hex(180_000),
+        'eth_getTransactionCount': lambda params: '0x0',
+        'eth_sendRawTransaction': lambda params: '0x' + keccak(bytes.fromhex(params[0][2:])).hex(),
+        'eth_feeHistory': lambda params: {
+            'oldestBlock': hex(BLOCK_NUMBER), 'baseFeePerGas': [hex(20 * 10**9)] * 2,
+            'gasUsedRatio': [0.5], 'reward': [[hex(10**9)]]
+        },
+        'eth_call': lambda params: '0x' + encode(['uint112', 'uint112', 'uint32'], [10**22, 2 * 10**13, 0]).hex(),
+    }, latency=latency)
+
+
+def make_opportunity(i: int) -> Dict:
+    return {
+        'token0': TOKENS[i % len(TOKENS)],
+        'token1': TOKENS[(i + 1) % len(TOKENS)],
+        'sell_venue': ('uniswap', 'sushiswap')[i % 2],
+        'optimal_amount': 10**18 + i,
+        'expected_intermediate_amount': 2 * 10**18 + i,
+        'block_number': BLOCK_NUMBER
+    }
+
+
+async def legacy_submit(executor: TradeExecutor, opportunity: Dict):
+    """Chemin d'origine de TradeExecutor._submit_arbitrage"""
+    amount_in = opportunity['optimal_amount']
+    min_amount_out = apply_slippage(opportunity['expected_intermediate_amount'], executor.max_slippage_bps)
+    deadline = (await executor.w3.eth.get_block('latest'))['timestamp'] + 300
+    path = [opportunity['token0'], opportunity['token1']]
+    sell_router = executor.contracts.get(executor.routers[opportunity['sell_venue']], executor.router_abi)
+    swap_tx = sell_router.functions.swapExactTokensForTokens(
+        amount_in, min_amount_out, path, executor.account.address, deadline
+    )
+    gas_estimate, gas_price = await asyncio.gather(
+        swap_tx.estimate_gas({'from': executor.account.address}),
+        executor.w3.eth.gas_price
+    )
+    transaction = await swap_tx.build_transaction({
+        'from': executor.account.address,
+        'gas': int(gas_estimate * 1.2),
+        'gasPrice': gas_price
+    })
+    return await executor.pipeline.submit(transaction)
+
+
+async def measure(latency: float, n: int, templated: bool) -> Dict:
+    server = make_server(latency)
+    url = server.start_in_thread()
+    provider = PooledAsyncProvider([url], requests_per_second=10**6, max_connections=16)
+    w3 = AsyncWeb3(provider)
+    executor = TradeExecutor(w3, PRIVATE_KEY, Metrics(enabled=False))
+    # Pas de surveillance des reçus pendant la mesure
+    executor.pipeline.poll_interval = 3600
+    try:
+        # État du bot au moment où une opportunité arrive : nonce synchronisé, frais du bloc connus
+        await executor.pipeline.nonces.sync()
+        await executor.fee_oracle.get(BLOCK_NUMBER)
+        opportunities = [make_opportunity(i) for i in range(n)]
+        if templated:
+            await executor.warm((o['sell_venue'], o['token0'], o['token1']) for o in opportunities)
+            # Une première soumission par route remplit le cache de gas, comme en régime établi
+            for opportunity in opportunities[:2 * len(TOKENS)]:
+                await executor.submit_arbitrage(opportunity)
+        else:
+            await legacy_submit(executor, opportunities[0])
+
+        before_requests, before_calls = server.requests, Counter(server.calls)
+        samples: List[float] = []
+        for opportunity in opportunities:
+            start = time.perf_counter()
+            if templated:
+                await executor.submit_arbitrage(opportunity)
+            else:
+                await legacy_submit(executor, opportunity)
+            samples.append(time.perf_counter() - start)
+        methods = Counter(server.calls) - before_calls
+        values = np.asarray(samples) * 1000
+        return {
+            'p50_ms': float(np.percentile(values, 50)),
+            'p99_ms': float(np.percentile(values, 99)),
+            'rpc_per_tx': (server.requests - before_requests) / n,
+            'methods': {method: count / n for method, count in sorted(methods.items())}
+        }
+    finally:
+        await executor.stop()
+        await provider.close()
+        server.stop_thread()
+
+
+async def main():
+    n = 200
+    print(f"{'latence RPC':>12} {'chemin':<10} {'p50 (ms)':>10} {'p99 (ms)':>10} {'RPC/tx':>8}  méthodes")
+    for latency in (0.0, 0.005, 0.02):
+        for name, templated in (('origine', False), ('préparé', True)):
+            result = await measure(latency, n, templated)
+            methods = ', '.join(f"{method} {count:.1f}" for method, count in result['methods'].items())
+            print(f"{latency * 1000:>9.0f} ms {name:<10} {result['p50_ms']:>10.2f} {result['p99_ms']:>10.2f} "
+                  f"{result['rpc_per_tx']:>8.1f}  {methods}")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,105 @@
+"""
+Mesure le temps de recherche des cycles profitables (3 et 4 sauts) dans un graphe
+synthétique de 10k arêtes, en recherche complète puis incrémentale après un bloc.
+Des cycles profitables connus sont injectés et leur détection est vérifiée.
+
+    python -m benchmarks.bench_token_graph
+"""
+import random
+import time
+from typing import Dict, List, Tuple
+from src.token_graph import TokenGraph
+
+
+def token(i: int) -> str:
+    return f"0x{i:040x}"
+
+
+def pool(i: int) -> str:
+    return f"0x{i + 10**6:040x}"
+
+
+def generate_graph(n_tokens: int, n_pools: int, seed: int = 7) -> Tuple[List[Tuple[str, str, str]], Dict[str, Tuple[int, int]], List[float]]:
+    """
+    Paires cohérentes avec un prix de référence par token (aucun cycle profitable),
+    avec quelques tokens très connectés comme sur mainnet (WETH, USDC, ...)
+    """
+    rng = random.Random(seed)
+    prices = [rng.uniform(0.01, 1000) for _ in range(n_tokens)]
+    hubs = list(range(10))
+    # Toutes les paires entre hubs existent, puis des paires hub/token et token/token
+    candidates = [(a, b) for a in hubs for b in hubs if a < b]
+    pairs, reserves, seen = [], {}, set()
+    while len(pairs) < n_pools:
+        if candidates:
+            a, b = candidates.pop(0)
+        else:
+            a = rng.choice(hubs) if rng.random() < 0.5 else rng.randrange(n_tokens)
+            b = rng.randrange(n_tokens)
+        if a == b or (a, b) in seen or (b, a) in seen:
+            continue
+        seen.add((a, b))
+        address = pool(len(pairs))
+        liquidity = rng.uniform(1e3, 1e6)
+        # Bruit inférieur aux frais : aucun cycle n'est profitable
+        noise = rng.uniform(0.999, 1.001)
+        pairs.append((address, token(a), token(b)))
+        reserves[address] = (int(liquidity / prices[a] * 1e18), int(liquidity / prices[b] * noise * 1e18))
+    return pairs, reserves, prices
+
+
+def main():
+    pairs, reserves, prices = generate_graph(n_tokens=2000, n_pools=5000)
+    graph = TokenGraph()
+    graph.add_pairs(pairs, reserves)
+    print(f"Graphe : {len(graph.tokens)} tokens, {len(graph)} arêtes")
+
+    start = time.perf_counter()
+    cycles = graph.find_cycles()
+    full_time = time.perf_counter() - start
+    assert not cycles, f"{len(cycles)} cycles inattendus dans un graphe cohérent"
+    print(f"Recherche complète (aucun cycle) : {full_time * 1000:.1f} ms")
+
+    # Injection d'un triangle profitable de 3 % : on enrichit le token C dans le pool C -> A
+    a, b, c = 2000, 2001, 2002
+    injected = {
+        pool(90001): (token(a), token(b), 10**21, int(10**21 * prices[0] / prices[1])),
+        pool(90002): (token(b), token(c), 10**21, 10**21),
+        pool(90003): (token(a), token(c), 10**21, int(10**21 * prices[0] / prices[1] * 0.97)),
+    }
+    for address, (token0, token1, reserve0, reserve1) in injected.items():
+        graph.add_pool(address, token0, token1, (reserve0, reserve1))
+
+    start = time.perf_counter()
+    cycles = graph.find_cycles()
+    full_time = time.perf_counter() - start
+    assert any(set(cycle['pools']) == set(injected) for cycle in cycles), "Triangle injecté non détecté"
+    print(f"Recherche complète (triangle injecté) : {full_time * 1000:.1f} ms, {len(cycles)} cycle(s)")
+
+    # Bloc suivant : 50 pools modifiés, dont le pool entre les deux premiers hubs décalé de 5 %
+    rng = random.Random(1)
+    changed = {}
+    for address in rng.sample(list(reserves), 50):
+        reserve0, reserve1 = reserves[address]
+        changed[address] = (reserve0, int(reserve1 * rng.uniform(0.9995, 1.0005)))
+    hub_pool = pool(0)
+    reserve0, reserve1 = reserves[hub_pool]
+    changed[hub_pool] = (reserve0, int(reserve1 * 1.05))
+
+    start = time.perf_counter()
+    cycles = graph.update_and_find_cycles(changed)
+    incremental_time = time.perf_counter() - start
+    print(f"Recherche incrémentale ({len(changed)} pools modifiés) : {incremental_time * 1000:.1f} ms, {len(cycles)} cycle(s)")
+    assert any(hub_pool in cycle['pools'] for cycle in cycles), "Cycle via le pool modifié non détecté"
+    print(f"Meilleur cycle : {len(cycles[0]['pools'])} sauts, {cycles[0]['profit_percent']:.2f} %")
+
+    # La recherche complète sur le graphe mis à jour doit trouver les mêmes cycles
+    start = time.perf_counter()
+    full_cycles = graph.find_cycles()
+    full_time = time.perf_counter() - start
+    assert {tuple(cycle['pools']) for cycle in full_cycles} >= {tuple(cycle['pools']) for cycle in cycles}
+    print(f"Recherche complète après le bloc : {full_time * 1000:.1f} ms, {len(full_cycles)} cycle(s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Serveur JSON-RPC local pour les benchmarks et les essais hors mainnet.
+Chaque méthode est servie par un handler params -> résultat ; la latence,
+les pannes et le nombre d'appels par méthode sont contrôlables.
+"""
+from typing import Any, Callable, Dict, Optional
+from collections import Counter
+import asyncio
+import threading
+from aiohttp import web
+
+
+class MockRpcServer:
+    def __init__(self, handlers: Optional[Dict[str, Callable[[list], Any]]] = None, latency: float = 0.0):
+        self.handlers: Dict[str, Callable[[list], Any]] = {
+            'web3_clientVersion': lambda params: 'MockRpc/1.0',
+            'eth_chainId': lambda params: '0x1',
+            'net_version': lambda params: '1',
+            'eth_blockNumber': lambda params: hex(self.block_number),
+            'eth_gasPrice': lambda params: hex(20 * 10**9),
+        }
+        self.handlers.update(handlers or {})
+        self.latency = latency
+        self.block_number = 18_000_000
+        self.failing = False
+        self.calls: Counter = Counter()
+        self.requests = 0
+        self.bytes_received = 0
+        self.runner: Optional[web.AppRunner] = None
+        self.url: Optional[str] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.thread: Optional[threading.Thread] = None
+
+    def _dispatch(self, request: Dict) -> Dict:
+        method = request.get('method')
+        self.calls[method] += 1
+        handler = self.handlers.get(method)
+        if handler is None:
+            return {'jsonrpc': '2.0', 'id': request.get('id'), 'error': {'code': -32601, 'message': f'{method} non supportée'}}
+        try:
+            result = handler(request.get('params') or [])
+        except Exception as e:
+            return {'jsonrpc': '2.0', 'id': request.get('id'), 'error': {'code': -32000, 'message': str(e)}}
+        return {'jsonrpc': '2.0', 'id': request.get('id'), 'result': result}
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        body = await request.read()
+        self.requests += 1
+        self.bytes_received += len(body)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.failing:
+            return web.Response(status=503)
+        payload = await request.json()
+        if isinstance(payload, list):
+            return web.json_response([self._dispatch(item) for item in payload])
+        return web.json_response(self._dispatch(payload))
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        app = web.Application()
+        app.router.add_post('/', self._handle)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://{host}:{port}/"
+        return self.url
+
+    async def stop(self):
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+    def start_in_thread(self) -> str:
+        """Démarre le serveur dans sa propre boucle et son propre thread, hors de la boucle mesurée"""
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        return asyncio.run_coroutine_threadsafe(self.start(), self.loop).result()
+
+    def stop_thread(self):
+        if self.loop is not None:
+            asyncio.run_coroutine_threadsafe(self.stop(), self.loop).result()
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
+            self.loop.close()
+            self.loop = None
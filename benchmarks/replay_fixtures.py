@@ -0,0 +1,477 @@
+"""
+Fixtures de blocs enregistrés et chaîne rejouée derrière MockRpcServer.
+
+Format JSON d'une fixture :
+    venues    : DEX rejoués (voir Venue.to_dict), dans l'ordre de DexScanner.venues
+    factories : factory -> liste ordonnée des paires (allPairs)
+    pairs     : paire -> [token0, token1]
+    tokens    : token -> {"symbol", "decimals"}
+    blocks    : liste de {"number", "hash", "timestamp", "base_fee", "priority_fee", "reserves"},
+                reserves ne contenant que les paires modifiées depuis le bloc précédent
+                (toutes les paires pour le premier bloc)
+    receipts  : hash de transaction -> reçu JSON-RPC
+
+Génération synthétique ou enregistrement depuis un vrai endpoint :
+
+    python -m benchmarks.replay_fixtures generate --pairs 2000 --blocks 50 --out replay.json
+    python -m benchmarks.replay_fixtures record --rpc https://... --pairs 500 --blocks 20 --out replay.json
+"""
+from typing import Dict, List, Optional, Tuple
+import argparse
+import asyncio
+import json
+import os
+import numpy as np
+from eth_abi import decode, encode
+from eth_utils import keccak, to_checksum_address
+from src.config import MULTICALL3_ADDRESS, USDT_ADDRESS, WETH_ADDRESS, WETH_USDT_PAIR
+from src.fast_calls import (
+    AGGREGATE3_SELECTOR, ALL_PAIRS_LENGTH_SELECTOR, ALL_PAIRS_SELECTOR, DECIMALS_SELECTOR,
+    GET_RESERVES_SELECTOR, SYMBOL_SELECTOR, TOKEN0_SELECTOR, TOKEN1_SELECTOR, WORD,
+    decode_uint, encode_uint
+)
+from src.reserve_cache import SYNC_TOPIC
+from src.venues import DEFAULT_VENUES, Venue
+from benchmarks.mock_rpc import MockRpcServer
+
+
+def load_fixture(path: str) -> Dict:
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def save_fixture(fixture: Dict, path: str):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(fixture, f)
+    os.replace(tmp_path, path)
+
+
+def _address(prefix: int, i: int) -> str:
+    return to_checksum_address(f'0x{prefix:04x}{i:036x}')
+
+
+def fixture_venues(fixture: Dict) -> List[Venue]:
+    """DEX d'une fixture ; les fixtures sans DEX enregistrés portent sur Uniswap et Sushiswap"""
+    if 'venues' not in fixture:
+        return DEFAULT_VENUES
+    return [Venue.from_dict(venue) for venue in fixture['venues']]
+
+
+def synthetic_venues(n_venues: int) -> List[Venue]:
+    """Uniswap, Sushiswap puis des forks fictifs aux frais d'UniswapV2 jusqu'à n_venues DEX"""
+    return DEFAULT_VENUES[:n_venues] + [
+        Venue(f'fork{v}', _address(0xf000, v), _address(0xf100, v), init_code_hash='0x' + keccak(text=f'fork{v}').hex())
+        for v in range(len(DEFAULT_VENUES), n_venues)
+    ]
+
+
+def generate_fixture(
+    n_pairs: int = 2000, n_blocks: int = 50, seed: int = 42, changed_ratio: float = 0.05, n_venues: int = 2
+) -> Dict:
+    """
+    Fixture synthétique : n_pairs paires communes aux n_venues factories (plus autant de paires
+    propres à chacune), des réserves qui évoluent d'un bloc à l'autre sur changed_ratio des
+    paires. La plupart des écarts créés sont refermés dans le même bloc, comme le ferait
+    un arbitragiste concurrent, les autres restent exploitables. Les adresses des paires sont
+    celles que donnerait CREATE2 sur chaque factory.
+    """
+    venues = synthetic_venues(n_venues)
+    rng = np.random.default_rng(seed)
+    n_tokens = n_pairs + 1
+    tokens = {WETH_ADDRESS: {'symbol': 'WETH', 'decimals': 18}, USDT_ADDRESS: {'symbol': 'USDT', 'decimals': 6}}
+    token_addresses = [_address(0x7000, i) for i in range(n_tokens)]
+    decimals = rng.choice([6, 8, 18], size=n_tokens)
+    for i, address in enumerate(token_addresses):
+        tokens[address] = {'symbol': f'TK{i}', 'decimals': int(decimals[i])}
+
+    pairs = {WETH_USDT_PAIR: [WETH_ADDRESS, USDT_ADDRESS]}
+    # La paire WETH/USDT de référence du BlockFeeOracle est sur le premier DEX (Uniswap)
+    factory_pairs: List[List[str]] = [[WETH_USDT_PAIR]] + [[] for _ in venues[1:]]
+    reserves = {WETH_USDT_PAIR: [20_000 * 10**18, 40_000_000 * 10**6]}
+    counterparts: Dict[str, List[str]] = {}
+    for i in range(n_pairs):
+        token0, token1 = token_addresses[i], token_addresses[i + 1]
+        reserve0 = int(rng.uniform(1e3, 1e7)) * 10**int(decimals[i])
+        reserve1 = int(rng.uniform(1e3, 1e7)) * 10**int(decimals[i + 1])
+        listed = [venue.pair_address(token0, token1) for venue in venues]
+        for v, pool in enumerate(listed):
+            pairs[pool] = [token0, token1]
+            factory_pairs[v].append(pool)
+            counterparts[pool] = [other for other in listed if other != pool]
+            if v == 0:
+                reserves[pool] = [reserve0, reserve1]
+            else:
+                # Les autres DEX plus petits, au même prix à quelques pourcents près
+                scale = rng.uniform(0.1, 1.0)
+                reserves[pool] = [int(reserve0 * scale), int(reserve1 * scale * rng.uniform(0.995, 1.005))]
+
+        # Paires propres à un seul DEX : découvertes mais jamais communes
+        for v in range(len(venues)):
+            own_token = _address(0xc000 + 0x100 * v, i)
+            own = venues[v].pair_address(token0, own_token)
+            pairs[own] = [token0, own_token]
+            reserves[own] = [reserve0, reserve1]
+            factory_pairs[v].append(own)
+
+    blocks = []
+    base_fee = 20 * 10**9
+    traded = list(reserves)
+    receipts = {}
+    for b in range(n_blocks):
+        number = 18_000_000 + b
+        if b == 0:
+            changed = dict(reserves)
+        else:
+            changed = {}
+            for index in rng.choice(len(traded), size=max(1, int(len(traded) * changed_ratio)), replace=False):
+                pair = traded[index]
+                reserve0, reserve1 = reserves[pair]
+                # Swap aléatoire : le produit des réserves est conservé au premier ordre
+                move = rng.uniform(0.995, 1.005)
+                reserves[pair] = [int(reserve0 * move), int(reserve1 / move)]
+                changed[pair] = reserves[pair]
+                if pair in counterparts and rng.random() < 0.8:
+                    # Écart refermé : les autres DEX sont ramenés au même prix à k constant
+                    price = reserves[pair][1] / reserves[pair][0]
+                    for other in counterparts[pair]:
+                        k = reserves[other][0] * reserves[other][1]
+                        reserves[other] = [int((k / price) ** 0.5), int((k * price) ** 0.5)]
+                        changed[other] = reserves[other]
+            base_fee = int(base_fee * rng.uniform(0.9, 1.1))
+        block_hash = '0x' + keccak(text=f'block-{number}').hex()
+        blocks.append({
+            'number': number,
+            'hash': block_hash,
+            'timestamp': 1_700_000_000 + 12 * b,
+            'base_fee': base_fee,
+            'priority_fee': 10**9,
+            'reserves': changed
+        })
+        tx_hash = '0x' + keccak(text=f'tx-{number}').hex()
+        receipts[tx_hash] = {
+            'transactionHash': tx_hash,
+            'transactionIndex': '0x0',
+            'blockHash': block_hash,
+            'blockNumber': hex(number),
+            'from': _address(0xe000, 0),
+            'to': _address(0xe000, 1),
+            'cumulativeGasUsed': hex(180_000),
+            'gasUsed': hex(180_000),
+            'effectiveGasPrice': hex(base_fee + 10**9),
+            'contractAddress': None,
+            'logs': [],
+            'logsBloom': '0x' + '00' * 256,
+            'status': '0x1',
+            'type': '0x2'
+        }
+
+    return {
+        'venues': [venue.to_dict() for venue in venues],
+        'factories': {venue.factory: venue_pairs for venue, venue_pairs in zip(venues, factory_pairs)},
+        'pairs': pairs,
+        'tokens': tokens,
+        'blocks': blocks,
+        'receipts': receipts
+    }
+
+
+async def record_fixture(w3, scanner, n_blocks: int, max_pairs: int, poll_interval: float = 1.0) -> Dict:
+    """
+    Enregistre une fixture depuis un vrai endpoint : paires communes découvertes par le scanner,
+    puis réserves et frais de n_blocks blocs consécutifs. Les reçus ne sont pas enregistrés.
+    """
+    common_pairs = await scanner.scan_dex_pairs(max_pairs)
+    # Paires communes de chaque DEX, la paire WETH/USDT de référence étant sur Uniswap
+    factory_pairs = [
+        [addresses[pair] for pair in common_pairs if pair in addresses] for addresses in scanner.pair_addresses
+    ]
+    factory_pairs[0].insert(0, WETH_USDT_PAIR)
+    pairs = {WETH_USDT_PAIR: [WETH_ADDRESS, USDT_ADDRESS]}
+    for addresses in scanner.pair_addresses:
+        for pair in common_pairs:
+            if pair in addresses:
+                pairs[addresses[pair]] = list(pair)
+    tokens = {
+        token: scanner.token_store.get(token)
+        for pair in pairs.values() for token in pair
+        if scanner.token_store.get(token) is not None
+    }
+
+    blocks = []
+    previous: Dict[str, List[int]] = {}
+    last_block = None
+    while len(blocks) < n_blocks:
+        number = await w3.eth.block_number
+        if number == last_block:
+            await asyncio.sleep(poll_interval)
+            continue
+        last_block = number
+        addresses = list(pairs)
+        block, fee_history, results = await asyncio.gather(
+            w3.eth.get_block(number),
+            w3.eth.fee_history(1, number, [50]),
+            scanner.multicall.aggregate([(address, GET_RESERVES_SELECTOR) for address in addresses], number)
+        )
+        changed = {}
+        for address, data in zip(addresses, results):
+            if data:
+                reserve0, reserve1 = decode(['uint112', 'uint112', 'uint32'], data)[:2]
+                if previous.get(address) != [reserve0, reserve1]:
+                    changed[address] = previous[address] = [reserve0, reserve1]
+        blocks.append({
+            'number': number,
+            'hash': block['hash'].hex(),
+            'timestamp': block['timestamp'],
+            'base_fee': fee_history['baseFeePerGas'][-1],
+            'priority_fee': fee_history['reward'][0][0],
+            'reserves': changed
+        })
+        print(f"Bloc {number} enregistré ({len(changed)} paires modifiées)")
+
+    return {
+        'venues': [venue.to_dict() for venue in scanner.venues],
+        'factories': {venue.factory: venue_pairs for venue, venue_pairs in zip(scanner.venues, factory_pairs)},
+        'pairs': pairs,
+        'tokens': tokens,
+        'blocks': blocks,
+        'receipts': {}
+    }
+
+
+def _encode_address(address: str) -> bytes:
+    return bytes(12) + bytes.fromhex(address[2:])
+
+
+def _decode_aggregate3_calls(data: bytes) -> List[Tuple[str, bytes]]:
+    """Décode la calldata aggregate3((address,bool,bytes)[]) en (cible, données) par appel"""
+    array_start = 4 + decode_uint(data[4:4 + WORD]) + WORD
+    count = decode_uint(data[array_start - WORD:array_start])
+    calls = []
+    for i in range(count):
+        element = array_start + decode_uint(data[array_start + i * WORD:])
+        target = '0x' + data[element + 12:element + WORD].hex()
+        data_start = element + decode_uint(data[element + 2 * WORD:])
+        length = decode_uint(data[data_start:])
+        calls.append((target, data[data_start + WORD:data_start + WORD + length]))
+    return calls
+
+
+def _encode_aggregate3_results(results: List[Optional[bytes]]) -> bytes:
+    """Encode le retour (bool,bytes)[] d'aggregate3, None marquant un appel en échec"""
+    heads, tails = [], []
+    offset = WORD * len(results)
+    for result in results:
+        data = result or b''
+        heads.append(encode_uint(offset))
+        element = b''.join((
+            encode_uint(result is not None),
+            encode_uint(2 * WORD),
+            encode_uint(len(data)),
+            data,
+            bytes((-len(data)) % WORD)
+        ))
+        tails.append(element)
+        offset += len(element)
+    return b''.join([encode_uint(WORD), encode_uint(len(results))] + heads + tails)
+
+
+class ReplayChain:
+    """
+    État de chaîne rejoué à partir d'une fixture, servi par un MockRpcServer.
+    Les appels eth_call (directs ou groupés via Multicall3) sont résolus sur les réserves
+    du bloc demandé ; advance() fait apparaître le bloc suivant.
+    """
+
+    def __init__(self, fixture: Dict):
+        self.fixture = fixture
+        self.factories = {factory.lower(): pairs for factory, pairs in fixture['factories'].items()}
+        self.pairs = {pair.lower(): tokens for pair, tokens in fixture['pairs'].items()}
+        self.tokens = {token.lower(): info for token, info in fixture['tokens'].items()}
+        self.blocks = fixture['blocks']
+        self.block_index = {block['number']: i for i, block in enumerate(self.blocks)}
+        self.hash_index = {block['hash']: i for i, block in enumerate(self.blocks)}
+        self.receipts = fixture.get('receipts', {})
+        # Réserves complètes de chaque bloc, reconstruites à partir des modifications
+        self.states: List[Dict[str, List[int]]] = []
+        state: Dict[str, List[int]] = {}
+        for block in self.blocks:
+            state = {**state, **{pair.lower(): value for pair, value in block['reserves'].items()}}
+            self.states.append(state)
+        self.head = 0
+        self.multicall = MULTICALL3_ADDRESS.lower()
+
+    @property
+    def block(self) -> Dict:
+        return self.blocks[self.head]
+
+    def advance(self) -> bool:
+        """Passe au bloc suivant ; retourne False une fois la fixture épuisée"""
+        if self.head + 1 >= len(self.blocks):
+            return False
+        self.head += 1
+        return True
+
+    def _block_position(self, block_identifier) -> int:
+        if isinstance(block_identifier, str) and block_identifier.startswith('0x'):
+            return self.block_index.get(int(block_identifier, 16), self.head)
+        return self.head
+
+    def _call(self, to: str, data: bytes, position: int) -> Optional[bytes]:
+        """Exécute un appel de lecture ; None correspond à un revert"""
+        to = to.lower()
+        selector = data[:4]
+        if to in self.factories:
+            pairs = self.factories[to]
+            if selector == ALL_PAIRS_LENGTH_SELECTOR:
+                return encode_uint(len(pairs))
+            if selector == ALL_PAIRS_SELECTOR:
+                index = decode_uint(data[4:])
+                return _encode_address(pairs[index]) if index < len(pairs) else None
+        elif to in self.pairs:
+            if selector == TOKEN0_SELECTOR:
+                return _encode_address(self.pairs[to][0])
+            if selector == TOKEN1_SELECTOR:
+                return _encode_address(self.pairs[to][1])
+            if selector == GET_RESERVES_SELECTOR:
+                reserve0, reserve1 = self.states[position].get(to, (0, 0))
+                timestamp = self.blocks[position]['timestamp'] % 2**32
+                return encode_uint(reserve0) + encode_uint(reserve1) + encode_uint(timestamp)
+        elif to in self.tokens:
+            if selector == SYMBOL_SELECTOR:
+                return encode(['string'], [self.tokens[to]['symbol']])
+            if selector == DECIMALS_SELECTOR:
+                return encode_uint(self.tokens[to]['decimals'])
+        elif to != self.multicall:
+            # Adresse sans code : retour vide, comme sur la chaîne
+            return b''
+        return None
+
+    def eth_call(self, params: list) -> str:
+        transaction, block_identifier = params[0], params[1] if len(params) > 1 else 'latest'
+        position = self._block_position(block_identifier)
+        data = bytes.fromhex(transaction['data'][2:])
+        if transaction['to'].lower() == self.multicall and data[:4] == AGGREGATE3_SELECTOR:
+            results = [self._call(target, call_data, position) for target, call_data in _decode_aggregate3_calls(data)]
+            return '0x' + _encode_aggregate3_results(results).hex()
+        result = self._call(transaction['to'], data, position)
+        if result is None:
+            raise ValueError('execution reverted')
+        return '0x' + result.hex()
+
+    def eth_block_number(self, params: list) -> str:
+        return hex(self.block['number'])
+
+    def eth_gas_price(self, params: list) -> str:
+        return hex(self.block['base_fee'] + self.block['priority_fee'])
+
+    def eth_fee_history(self, params: list) -> Dict:
+        block = self.blocks[self._block_position(params[1])]
+        return {
+            'oldestBlock': hex(block['number']),
+            'baseFeePerGas': [hex(block['base_fee']), hex(block['base_fee'])],
+            'gasUsedRatio': [0.5],
+            'reward': [[hex(block['priority_fee'])]]
+        }
+
+    def eth_get_block_by_number(self, params: list) -> Dict:
+        position = self._block_position(params[0])
+        block = self.blocks[position]
+        parent = self.blocks[position - 1]['hash'] if position else '0x' + '00' * 32
+        return {
+            'number': hex(block['number']),
+            'hash': block['hash'],
+            'parentHash': parent,
+            'timestamp': hex(block['timestamp']),
+            'baseFeePerGas': hex(block['base_fee']),
+            'gasLimit': hex(30_000_000),
+            'gasUsed': hex(15_000_000),
+            'transactions': []
+        }
+
+    def eth_get_logs(self, params: list) -> List[Dict]:
+        """Événements Sync d'un bloc (filtre par blockHash), un par paire modifiée dans la fixture"""
+        query = params[0]
+        position = self.hash_index.get(query.get('blockHash'))
+        if position is None or SYNC_TOPIC not in (query.get('topics') or [SYNC_TOPIC]):
+            return []
+        block = self.blocks[position]
+        addresses = query.get('address')
+        addresses = None if addresses is None else {address.lower() for address in addresses}
+        logs = []
+        for pair, (reserve0, reserve1) in block['reserves'].items():
+            if addresses is not None and pair.lower() not in addresses:
+                continue
+            logs.append({
+                'address': pair,
+                'topics': [SYNC_TOPIC],
+                'data': '0x' + (encode_uint(reserve0) + encode_uint(reserve1)).hex(),
+                'blockNumber': hex(block['number']),
+                'blockHash': block['hash'],
+                'logIndex': hex(len(logs)),
+                'transactionHash': '0x' + keccak(text=f"{block['number']}:{pair}").hex(),
+                'transactionIndex': hex(len(logs)),
+                'removed': False
+            })
+        return logs
+
+    def eth_get_transaction_receipt(self, params: list) -> Optional[Dict]:
+        return self.receipts.get(params[0])
+
+    def server(self, latency: float = 0.0) -> MockRpcServer:
+        """Serveur JSON-RPC local servant cette chaîne"""
+        return MockRpcServer({
+            'eth_call': self.eth_call,
+            'eth_blockNumber': self.eth_block_number,
+            'eth_gasPrice': self.eth_gas_price,
+            'eth_feeHistory': self.eth_fee_history,
+            'eth_getBlockByNumber': self.eth_get_block_by_number,
+            'eth_getLogs': self.eth_get_logs,
+            'eth_getTransactionReceipt': self.eth_get_transaction_receipt,
+        }, latency=latency)
+
+
+async def _record(args):
+    from web3 import AsyncWeb3
+    from src.dex_scanner import DexScanner
+    from src.multicall import Multicall
+    from src.pair_registry import PairRegistry
+    from src.rpc_transport import PooledAsyncProvider
+    from src.token_store import TokenStore
+
+    provider = PooledAsyncProvider([args.rpc])
+    w3 = AsyncWeb3(provider)
+    multicall = Multicall(w3)
+    scanner = DexScanner(
+        w3, None, multicall,
+        PairRegistry(f"{args.out}.registry.json"), TokenStore(multicall, f"{args.out}.tokens.json")
+    )
+    try:
+        fixture = await record_fixture(w3, scanner, args.blocks, args.pairs)
+    finally:
+        await provider.close()
+    save_fixture(fixture, args.out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Génère ou enregistre une fixture de rejeu")
+    parser.add_argument('mode', choices=['generate', 'record'])
+    parser.add_argument('--out', required=True)
+    parser.add_argument('--pairs', type=int, default=2000)
+    parser.add_argument('--blocks', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--venues', type=int, default=2, help="Nombre de DEX (mode generate)")
+    parser.add_argument('--rpc', help="Endpoint JSON-RPC (mode record)")
+    args = parser.parse_args()
+
+    if args.mode == 'generate':
+        save_fixture(generate_fixture(args.pairs, args.blocks, args.seed, n_venues=args.venues), args.out)
+    else:
+        if not args.rpc:
+            parser.error("--rpc est requis en mode record")
+        asyncio.run(_record(args))
+    print(f"Fixture écrite dans {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+from typing import Dict, List, Optional, Tuple
+from decimal import Decimal
+from math import isqrt
+
+# Frais UniswapV2 : 0,3 % (997 / 1000)
+FEE_NUMERATOR = 997
+FEE_DENOMINATOR = 1000
+
+
+def get_amount_out(
+    amount_in: int,
+    reserve_in: int,
+    reserve_out: int,
+    fee_numerator: int = FEE_NUMERATOR,
+    fee_denominator: int = FEE_DENOMINATOR
+) -> int:
+    """Montant reçu pour amount_in, identique à UniswapV2Library.getAmountOut"""
+    if amount_in <= 0:
+        raise ValueError('INSUFFICIENT_INPUT_AMOUNT')
+    if reserve_in <= 0 or reserve_out <= 0:
+        raise ValueError('INSUFFICIENT_LIQUIDITY')
+    amount_in_with_fee = amount_in * fee_numerator
+    numerator = amount_in_with_fee * reserve_out
+    denominator = reserve_in * fee_denominator + amount_in_with_fee
+    return numerator // denominator
+
+
+def get_amount_in(
+    amount_out: int,
+    reserve_in: int,
+    reserve_out: int,
+    fee_numerator: int = FEE_NUMERATOR,
+    fee_denominator: int = FEE_DENOMINATOR
+) -> int:
+    """Montant à fournir pour recevoir amount_out, identique à UniswapV2Library.getAmountIn"""
+    if amount_out <= 0:
+        raise ValueError('INSUFFICIENT_OUTPUT_AMOUNT')
+    if reserve_in <= 0 or reserve_out <= amount_out:
+        raise ValueError('INSUFFICIENT_LIQUIDITY')
+    numerator = reserve_in * amount_out * fee_denominator
+    denominator = (reserve_out - amount_out) * fee_numerator
+    return numerator // denominator + 1
+
+
+def get_round_trip_amount_out(
+    amount_in: int,
+    first_reserves: Tuple[int, int],
+    second_reserves: Tuple[int, int],
+    fee_numerator: int = FEE_NUMERATOR,
+    fee_denominator: int = FEE_DENOMINATOR,
+    second_fee_numerator: Optional[int] = None,
+    second_fee_denominator: Optional[int] = None
+) -> int:
+    """
+    Montant récupéré après un aller-retour sur deux pools.
+    Les réserves sont données dans le sens de l'échange : (réserve entrée, réserve sortie).
+    Les frais du second pool, s'ils ne sont pas donnés, sont ceux du premier.
+    """
+    if second_fee_numerator is None:
+        second_fee_numerator, second_fee_denominator = fee_numerator, fee_denominator
+    intermediate = get_amount_out(amount_in, *first_reserves, fee_numerator, fee_denominator)
+    if intermediate <= 0:
+        return 0
+    return get_amount_out(intermediate, *second_reserves, second_fee_numerator, second_fee_denominator)
+
+
+def get_optimal_round_trip_input(
+    first_reserves: Tuple[int, int],
+    second_reserves: Tuple[int, int],
+    fee_numerator: int = FEE_NUMERATOR,
+    fee_denominator: int = FEE_DENOMINATOR,
+    second_fee_numerator: Optional[int] = None,
+    second_fee_denominator: Optional[int] = None
+) -> int:
+    """
+    Montant d'entrée maximisant le profit d'un aller-retour sur deux pools, frais inclus.
+
+    Les deux pools se composent en un pool virtuel out = K*x / (C + M*x), dont le profit
+    out - x est maximal pour x = (sqrt(K*C) - C) / M. Avec f1 = n1/d1 et f2 = n2/d2 les frais
+    de chaque pool, cela donne en entiers :
+    x = (isqrt(n1 n2 d1 d2 a_in a_out b_in b_out) - d1 d2 a_in b_in) / (n1 (d2 b_in + n2 a_out))
+    Retourne 0 si aucun montant n'est profitable.
+    """
+    a_in, a_out = first_reserves
+    b_in, b_out = second_reserves
+    if min(a_in, a_out, b_in, b_out) <= 0:
+        return 0
+
+    n1, d1 = fee_numerator, fee_denominator
+    n2, d2 = (n1, d1) if second_fee_numerator is None else (second_fee_numerator, second_fee_denominator)
+    numerator = isqrt(n1 * n2 * d1 * d2 * a_in * a_out * b_in * b_out) - d1 * d2 * a_in * b_in
+    if numerator <= 0:
+        return 0
+    return numerator // (n1 * (d2 * b_in + n2 * a_out))
+
+
+# Saut d'un chemin multi-pools : (réserve entrée, réserve sortie, numérateur des frais, dénominateur des frais)
+Hop = Tuple[int, int, int, int]
+
+
+def get_path_amount_out(amount_in: int, hops: List[Hop]) -> int:
+    """Montant reçu au bout du chemin hops, saut par saut comme UniswapV2Library.getAmountsOut"""
+    amount = amount_in
+    for reserve_in, reserve_out, fee_numerator, fee_denominator in hops:
+        if amount <= 0:
+            return 0
+        amount = get_amount_out(amount, reserve_in, reserve_out, fee_numerator, fee_denominator)
+    return amount
+
+
+def get_optimal_path_input(hops: List[Hop]) -> int:
+    """
+    Montant d'entrée maximisant le profit d'un cycle (le chemin revient à son token de départ).
+
+    Comme pour l'aller-retour, les pools se composent en un pool virtuel out = K*x / (C + M*x) :
+    un saut de réserves (a, b) et de frais n/d transforme (K, C, M) en
+    (n b K, d a C, d a M + n K). Le profit out - x est maximal pour x = (sqrt(K*C) - C) / M.
+    Retourne 0 si aucun montant n'est profitable.
+    """
+    k, c, m = 1, 1, 0
+    for reserve_in, reserve_out, fee_numerator, fee_denominator in hops:
+        if reserve_in <= 0 or reserve_out <= 0:
+            return 0
+        k, c, m = (
+            fee_numerator * reserve_out * k,
+            fee_denominator * reserve_in * c,
+            fee_denominator * reserve_in * m + fee_numerator * k
+        )
+    numerator = isqrt(k * c) - c
+    if numerator <= 0 or m <= 0:
+        return 0
+    return numerator // m
+
+
+def apply_slippage(amount: int, slippage_bps: int) -> int:
+    """Applique une tolérance de slippage (en points de base) à un montant attendu"""
+    return amount * (10000 - slippage_bps) // 10000
+
+
+def price_impact(reserve_in: int, reserve_out: int, amount_in: int) -> Decimal:
+    """Impact de prix exact d'un échange à produit constant (hors frais)"""
+    k = reserve_in * reserve_out
+    new_reserve_out = k // (reserve_in + amount_in)
+    return Decimal(reserve_out - new_reserve_out) / Decimal(reserve_out)
+
+
+class RoundTripCache:
+    """
+    Mémoïsation par bloc des allers-retours optimaux, indexée par les réserves des deux pools.
+    Les entrées du bloc précédent restent disponibles : un pool inchangé d'un bloc
+    à l'autre n'est donc jamais recalculé, et la mémoire reste bornée à deux blocs.
+    """
+
+    def __init__(self):
+        self.block_number: Optional[int] = None
+        self.current: Dict[Tuple, Tuple[int, int]] = {}
+        self.previous: Dict[Tuple, Tuple[int, int]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_optimal(
+        self,
+        block_number: Optional[int],
+        first_reserves: Tuple[int, int],
+        second_reserves: Tuple[int, int],
+        fee_numerator: int = FEE_NUMERATOR,
+        fee_denominator: int = FEE_DENOMINATOR,
+        second_fee_numerator: Optional[int] = None,
+        second_fee_denominator: Optional[int] = None
+    ) -> Tuple[int, int]:
+        """Retourne (montant d'entrée optimal, montant récupéré) pour l'aller-retour"""
+        if block_number != self.block_number:
+            self.previous = self.current
+            self.current = {}
+            self.block_number = block_number
+
+        if second_fee_numerator is None:
+            second_fee_numerator, second_fee_denominator = fee_numerator, fee_denominator
+        fees = (fee_numerator, fee_denominator, second_fee_numerator, second_fee_denominator)
+        key = (first_reserves, second_reserves, fees)
+        result = self.current.get(key)
+        if result is None:
+            result = self.previous.get(key)
+        if result is not None:
+            self.hits += 1
+            self.current[key] = result
+            return result
+
+        self.misses += 1
+        amount_in = get_optimal_round_trip_input(first_reserves, second_reserves, *fees)
+        amount_out = 0
+        if amount_in > 0:
+            amount_out = get_round_trip_amount_out(amount_in, first_reserves, second_reserves, *fees)
+        result = (amount_in, amount_out)
+        self.current[key] = result
+        return result
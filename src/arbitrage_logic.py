@@ -1,88 +1,303 @@
-from typing import Dict, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 from decimal import Decimal
+from math import isnan
 from web3 import Web3
+import numpy as np
+from .amm_math import (
+    Hop, RoundTripCache, get_amount_out, get_optimal_path_input, get_path_amount_out, price_impact
+)
+from .config import STABLECOINS, WETH_ADDRESS
+from .metrics import METRICS, Metrics
+from .venues import Venue, load_venues
+
+# Prix USD (token0, token1) d'une unité entière de chaque token, None si inconnu.
+# Par défaut le token1 sert d'unité de compte.
+UsdPrices = Tuple[Optional[float], Optional[float]]
+DEFAULT_USD_PRICES: UsdPrices = (None, 1.0)
+
+
+class PairUsdPrices:
+    """
+    Prix en USD d'une unité entière des deux tokens de chaque paire, au format attendu par
+    find_arbitrage_opportunities_batch : 1 pour les stablecoins, le prix de l'ETH du bloc pour
+    WETH, NaN pour les autres tokens.
+    """
+
+    def __init__(self, pairs: Iterable[Tuple[str, str]], stablecoins: Iterable[str] = STABLECOINS, weth: str = WETH_ADDRESS):
+        stablecoins = {token.lower() for token in stablecoins}
+        tokens = [(token0.lower(), token1.lower()) for token0, token1 in pairs]
+        self.stable = np.array([[token in stablecoins for token in pair] for pair in tokens], dtype=bool).reshape(-1, 2)
+        self.weth = np.array([[token == weth.lower() for token in pair] for pair in tokens], dtype=bool).reshape(-1, 2)
+
+    def __len__(self) -> int:
+        return len(self.stable)
+
+    def valued(self) -> np.ndarray:
+        """Paires dont au moins un token a un prix USD"""
+        return (self.stable | self.weth).any(axis=1)
+
+    def prices(self, eth_price_usdt: float) -> np.ndarray:
+        """Tableau (N, 2) des prix USD au prix de l'ETH donné"""
+        return np.where(self.weth, eth_price_usdt, np.where(self.stable, 1.0, np.nan))
+
 
 class ArbitrageLogic:
-    def __init__(self, min_volume_usdt: float = 25000):
+    def __init__(
+        self,
+        min_volume_usdt: float = 25000,
+        min_profit_percent: float = 0.0,
+        metrics: Optional[Metrics] = None,
+        venues: Optional[List[Venue]] = None
+    ):
         self.min_volume_usdt = min_volume_usdt
+        self.min_profit_percent = min_profit_percent
+        self.metrics = metrics or METRICS
         self.USDT_DECIMALS = 6
         self.USDT_ADDRESS = "0xdAC17F958D2ee523a2206206994597C13D831ec7"
+        self.round_trip_cache = RoundTripCache()
+        # Les réserves sont indexées par DEX dans l'ordre de cette liste
+        self.venues = venues or load_venues()
+        self.fee_factors = [venue.fee_factor for venue in self.venues]
+        self.fee_numerators = np.array([venue.fee_numerator for venue in self.venues], dtype=np.float64)
+        self.fee_denominators = np.array([venue.fee_denominator for venue in self.venues], dtype=np.float64)
         
     def calculate_price_impact(self, reserve0: int, reserve1: int, amount_in: int) -> Decimal:
         """Calcule l'impact de prix pour un montant donné"""
-        k = reserve0 * reserve1
-        new_reserve0 = reserve0 + amount_in
-        new_reserve1 = k // new_reserve0
-        price_impact = (reserve1 - new_reserve1) / reserve1
-        return Decimal(str(price_impact))
+        return price_impact(reserve0, reserve1, amount_in)
 
     def find_arbitrage_opportunity(
         self,
-        uni_reserves: Tuple[int, int],
-        sushi_reserves: Tuple[int, int],
+        venue_reserves: List[Tuple[int, int]],
         token0_decimals: int,
-        token1_decimals: int
+        token1_decimals: int,
+        block_number: Optional[int] = None,
+        usd_prices: UsdPrices = DEFAULT_USD_PRICES
     ) -> Dict:
         """
-        Trouve et calcule les opportunités d'arbitrage entre Uniswap et Sushiswap
+        Trouve et calcule la meilleure opportunité d'arbitrage entre les DEX d'une paire.
+        venue_reserves donne les réserves sur chaque DEX, (0, 0) si la paire n'y est pas listée.
+        L'aller-retour part du token0 : vente sur le DEX au meilleur prix de vente net de frais,
+        rachat sur celui au meilleur prix d'achat net de frais, choisis en une seule passe.
+        Volume et profit sont valorisés en USD avec usd_prices ; une paire sans prix USD est ignorée.
+        Le calcul est mémoïsé par bloc sur les réserves.
         """
-        # Prix sur Uniswap
-        uni_price = (uni_reserves[1] * 10**token0_decimals) / (uni_reserves[0] * 10**token1_decimals)
-        
-        # Prix sur Sushiswap
-        sushi_price = (sushi_reserves[1] * 10**token0_decimals) / (sushi_reserves[0] * 10**token1_decimals)
+        scale = 10**token0_decimals
+        unit = 10**token1_decimals
+        sell_venue = buy_venue = None
+        best_bid = best_ask = sell_price = buy_price = 0.0
+        for venue, (reserve0, reserve1) in enumerate(venue_reserves):
+            if reserve0 <= 0 or reserve1 <= 0:
+                continue
+            price = (reserve1 * scale) / (reserve0 * unit)
+            fee_factor = self.fee_factors[venue]
+            # Prix net de frais : reçu en vendant le token0, payé en le rachetant
+            if sell_venue is None or price * fee_factor > best_bid:
+                sell_venue, best_bid, sell_price = venue, price * fee_factor, price
+            if buy_venue is None or price / fee_factor < best_ask:
+                buy_venue, best_ask, buy_price = venue, price / fee_factor, price
 
-        # Calcul de la différence de prix
-        price_diff = abs(uni_price - sushi_price)
-        price_diff_percent = (price_diff / min(uni_price, sushi_price)) * 100
+        # Un même DEX meilleur des deux côtés signifie qu'aucun écart ne couvre les frais
+        if sell_venue is None or sell_venue == buy_venue:
+            return None
 
-        # Déterminer la direction de l'arbitrage
-        buy_on_uni = uni_price < sushi_price
-        
-        # Calculer le volume optimal
-        optimal_amount = self._calculate_optimal_amount(
-            uni_reserves if buy_on_uni else sushi_reserves,
-            sushi_reserves if buy_on_uni else uni_reserves,
-            token0_decimals,
-            token1_decimals
+        # Prix USD d'une unité brute de token0, directement ou via le token1 au prix d'achat
+        token0_usd = self._token0_usd(usd_prices, buy_price)
+        if token0_usd is None:
+            return None
+        token_price = token0_usd / scale
+
+        sell_reserves = venue_reserves[sell_venue]
+        buy_reserves = venue_reserves[buy_venue]
+        price_diff_percent = (sell_price - buy_price) / buy_price * 100
+
+        # Calculer le volume optimal, frais de chaque DEX inclus
+        sell = self.venues[sell_venue]
+        buy = self.venues[buy_venue]
+        optimal_amount, amount_out = self.round_trip_cache.get_optimal(
+            block_number,
+            (sell_reserves[0], sell_reserves[1]),
+            (buy_reserves[1], buy_reserves[0]),
+            sell.fee_numerator, sell.fee_denominator,
+            buy.fee_numerator, buy.fee_denominator
         )
+        if optimal_amount <= 0:
+            return None
 
         # Vérifier le volume minimum
-        volume_usdt = self._calculate_volume_usdt(optimal_amount, uni_price)
+        volume_usdt = self._calculate_volume_usdt(optimal_amount, token_price)
         
-        if volume_usdt < self.min_volume_usdt:
+        if volume_usdt < self.min_volume_usdt or price_diff_percent < self.min_profit_percent:
             return None
 
+        self.metrics.funnel('found')
         return {
             "profit_percent": price_diff_percent,
             "volume_usdt": volume_usdt,
             "optimal_amount": optimal_amount,
-            "buy_on_uni": buy_on_uni,
-            "uni_price": uni_price,
-            "sushi_price": sushi_price
+            "expected_intermediate_amount": get_amount_out(
+                optimal_amount, sell_reserves[0], sell_reserves[1], sell.fee_numerator, sell.fee_denominator
+            ),
+            "expected_amount_out": amount_out,
+            "expected_profit": amount_out - optimal_amount,
+            "expected_profit_usdt": self._calculate_volume_usdt(amount_out - optimal_amount, token_price),
+            "buy_venue": buy.name,
+            "sell_venue": sell.name,
+            "buy_price": buy_price,
+            "sell_price": sell_price
         }
 
-    def _calculate_optimal_amount(
+    def find_cycle_opportunity(
         self,
-        buy_reserves: Tuple[int, int],
-        sell_reserves: Tuple[int, int],
-        token0_decimals: int,
-        token1_decimals: int
-    ) -> int:
+        hops: List[Hop],
+        token_decimals: int,
+        token_usd: float
+    ) -> Optional[Dict]:
         """
-        Calcule le montant optimal pour l'arbitrage en prenant en compte les réserves
-        et l'impact de prix
+        Taille et valorise un cycle de TokenGraph partant d'un token de prix USD token_usd.
+        hops donne chaque saut dans le sens du cycle, frais de son DEX inclus (voir amm_math.Hop).
         """
-        # Formule simplifiée pour le calcul du montant optimal
-        # Cette formule peut être améliorée en prenant en compte les frais
-        k1 = buy_reserves[0] * buy_reserves[1]
-        k2 = sell_reserves[0] * sell_reserves[1]
-        
-        # On limite le montant à 30% des réserves pour éviter trop d'impact
-        max_amount = min(buy_reserves[0], sell_reserves[0]) * 3 // 10
-        
-        return max_amount
+        optimal_amount = get_optimal_path_input(hops)
+        if optimal_amount <= 0:
+            return None
+        amount_out = get_path_amount_out(optimal_amount, hops)
+        if amount_out <= optimal_amount:
+            return None
+
+        token_price = token_usd / 10**token_decimals
+        volume_usdt = self._calculate_volume_usdt(optimal_amount, token_price)
+        if volume_usdt < self.min_volume_usdt:
+            return None
+
+        self.metrics.funnel('found')
+        return {
+            "volume_usdt": volume_usdt,
+            "optimal_amount": optimal_amount,
+            "expected_amount_out": amount_out,
+            "expected_profit": amount_out - optimal_amount,
+            "expected_profit_usdt": self._calculate_volume_usdt(amount_out - optimal_amount, token_price),
+            "token_price_usdt": token_price
+        }
+
+    def find_arbitrage_opportunities_batch(
+        self,
+        reserves: np.ndarray,
+        token0_decimals: np.ndarray,
+        token1_decimals: np.ndarray,
+        block_number: Optional[int] = None,
+        usd_prices: Optional[np.ndarray] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Évalue N paires sur V DEX en une seule passe vectorisée.
+        reserves est de forme (N, V, 2), une paire absente d'un DEX y ayant des réserves nulles ;
+        les décimales sont de forme (N,), usd_prices de forme (N, 2) avec NaN pour un prix
+        inconnu (voir PairUsdPrices) ; sans usd_prices le token1 sert d'unité de compte.
+        Retourne les indices des paires retenues et les valeurs calculées pour ces paires,
+        les DEX d'achat et de vente étant donnés par leur index.
+        """
+        with self.metrics.timer('screen', block_number):
+            result = self._screen_batch(reserves, token0_decimals, token1_decimals, usd_prices)
+        self.metrics.funnel('screened', len(result['indices']))
+        return result
+
+    def _screen_batch(
+        self,
+        reserves: np.ndarray,
+        token0_decimals: np.ndarray,
+        token1_decimals: np.ndarray,
+        usd_prices: Optional[np.ndarray] = None
+    ) -> Dict[str, np.ndarray]:
+        reserves = np.asarray(reserves, dtype=np.float64)
+        token0_decimals = np.asarray(token0_decimals, dtype=np.float64)
+        decimals_scale = 10.0 ** (token0_decimals - np.asarray(token1_decimals, dtype=np.float64))
+        fee_factors = self.fee_numerators / self.fee_denominators
+
+        # Les DEX où la paire a une réserve nulle sont ignorés
+        listed = (reserves > 0).all(axis=2)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            price = reserves[:, :, 1] / reserves[:, :, 0] * decimals_scale[:, None]
+        # Meilleur prix de vente et d'achat nets de frais, en une passe sur les V DEX
+        sell_venue = np.argmax(np.where(listed, price * fee_factors, -np.inf), axis=1)
+        buy_venue = np.argmin(np.where(listed, price / fee_factors, np.inf), axis=1)
+        valid = (listed.sum(axis=1) >= 2) & (sell_venue != buy_venue)
+
+        rows = np.arange(len(reserves))
+        sell_reserves = reserves[rows, sell_venue]
+        buy_reserves = reserves[rows, buy_venue]
+        sell_price = price[rows, sell_venue]
+        buy_price = price[rows, buy_venue]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            price_diff_percent = (sell_price - buy_price) / buy_price * 100
+        optimal_amount = self._calculate_optimal_amount_batch(buy_reserves, sell_reserves, sell_venue, buy_venue)
+        # Prix USD d'une unité brute de token0 ; NaN sans prix USD, ce qui écarte la paire
+        if usd_prices is None:
+            token0_usd = buy_price * DEFAULT_USD_PRICES[1]
+        else:
+            usd_prices = np.asarray(usd_prices, dtype=np.float64)
+            token0_usd = np.where(np.isnan(usd_prices[:, 0]), buy_price * usd_prices[:, 1], usd_prices[:, 0])
+        token_price = token0_usd / 10.0 ** token0_decimals
+        volume_usdt = optimal_amount * token_price
+
+        selected = (
+            valid
+            & (optimal_amount > 0)
+            & (volume_usdt >= self.min_volume_usdt)
+            & (price_diff_percent >= self.min_profit_percent)
+        )
+        indices = np.flatnonzero(selected)
+        expected_profit = self._calculate_round_trip_profit_batch(
+            buy_reserves[indices], sell_reserves[indices], optimal_amount[indices],
+            sell_venue[indices], buy_venue[indices]
+        )
+        return {
+            "indices": indices,
+            "profit_percent": price_diff_percent[indices],
+            "volume_usdt": volume_usdt[indices],
+            "optimal_amount": optimal_amount[indices],
+            "expected_profit": expected_profit,
+            "expected_profit_usdt": expected_profit * token_price[indices],
+            "buy_venue": buy_venue[indices],
+            "sell_venue": sell_venue[indices],
+            "buy_price": buy_price[indices],
+            "sell_price": sell_price[indices]
+        }
+
+    def _calculate_optimal_amount_batch(
+        self, buy_reserves: np.ndarray, sell_reserves: np.ndarray, sell_venue: np.ndarray, buy_venue: np.ndarray
+    ) -> np.ndarray:
+        """
+        Version vectorisée (float64) de la formule fermée de amm_math.get_optimal_round_trip_input,
+        pour un aller-retour token0 -> token1 sur le DEX de vente puis token1 -> token0 sur celui d'achat
+        """
+        n1, d1 = self.fee_numerators[sell_venue], self.fee_denominators[sell_venue]
+        n2, d2 = self.fee_numerators[buy_venue], self.fee_denominators[buy_venue]
+        a_in, a_out = sell_reserves[:, 0], sell_reserves[:, 1]
+        b_in, b_out = buy_reserves[:, 1], buy_reserves[:, 0]
+        # Racines séparées pour éviter le dépassement du produit des quatre réserves
+        root = np.sqrt(n1 * n2 * d1 * d2) * np.sqrt(a_in * a_out) * np.sqrt(b_in * b_out)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            optimal = (root - d1 * d2 * a_in * b_in) / (n1 * (d2 * b_in + n2 * a_out))
+        return np.floor(np.nan_to_num(np.maximum(optimal, 0.0)))
+
+    def _calculate_round_trip_profit_batch(
+        self, buy_reserves: np.ndarray, sell_reserves: np.ndarray, amount_in: np.ndarray,
+        sell_venue: np.ndarray, buy_venue: np.ndarray
+    ) -> np.ndarray:
+        """Profit en token0 (float64) de l'aller-retour de amount_in, frais inclus, comme get_round_trip_amount_out"""
+        n1, d1 = self.fee_numerators[sell_venue], self.fee_denominators[sell_venue]
+        n2, d2 = self.fee_numerators[buy_venue], self.fee_denominators[buy_venue]
+        intermediate = amount_in * n1 * sell_reserves[:, 1] / (sell_reserves[:, 0] * d1 + amount_in * n1)
+        amount_out = intermediate * n2 * buy_reserves[:, 0] / (buy_reserves[:, 1] * d2 + intermediate * n2)
+        return amount_out - amount_in
+
+    def _token0_usd(self, usd_prices: UsdPrices, price: float) -> Optional[float]:
+        """Prix USD d'une unité entière de token0, price étant le prix en token1 d'une unité de token0"""
+        usd0, usd1 = usd_prices
+        if usd0 is not None and not isnan(usd0):
+            return usd0
+        if usd1 is not None and not isnan(usd1):
+            return price * usd1
+        return None
 
     def _calculate_volume_usdt(self, amount: int, token_price: float) -> float:
-        """Convertit un montant de token en volume USDT"""
+        """Convertit un montant brut de token en volume USDT (token_price : USD par unité brute)"""
         return amount * token_price
@@ -0,0 +1,399 @@
+"""
+Backtest des seuils de trading sur l'historique des événements Sync.
+
+L'historique est stocké en colonnes de largeur fixe (bloc, index de pool, reserve0, reserve1),
+un fichier binaire par colonne, relues par memory-map et par tranches : la mémoire utilisée
+ne dépend pas de la longueur de l'historique.
+
+    python -m src.backtest ingest --from-block 18000000 --to-block 18216000 --pairs 1000 --out history
+    python -m src.backtest run --history history --min-profit 1.0 --min-volume 25000 --gas-gwei 30
+"""
+from typing import Dict, Iterator, List, Optional, Tuple
+import argparse
+import asyncio
+import json
+import os
+import time
+import numpy as np
+from .arbitrage_logic import ArbitrageLogic, PairUsdPrices
+from .fast_calls import GET_RESERVES_SELECTOR, decode_reserves
+from .metrics import Metrics
+from .reserve_cache import SYNC_TOPIC
+from .trading_logic import TradingLogic
+from .venues import DEFAULT_VENUES, Venue
+
+# Colonnes de l'historique : nom -> type numpy de largeur fixe.
+# Les réserves sont en float64, la précision des règles vectorisées d'ArbitrageLogic.
+COLUMNS = {
+    'block': np.uint32,
+    'pool': np.uint32,
+    'reserve0': np.float64,
+    'reserve1': np.float64
+}
+
+
+class SyncHistoryWriter:
+    """
+    Écrit un historique colonne par colonne, par ajouts successifs triés par bloc.
+    Avec V DEX, la pool de la paire i sur le DEX v a l'index i*V+v.
+    """
+
+    def __init__(self, directory: str, pairs: List[Dict], venues: List[Venue] = DEFAULT_VENUES):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.pairs = pairs
+        self.venues = venues
+        self.files = {name: open(os.path.join(directory, f'{name}.bin'), 'wb') for name in COLUMNS}
+        self.rows = 0
+        self.first_block: Optional[int] = None
+        self.last_block: Optional[int] = None
+
+    def append(self, blocks, pools, reserve0, reserve1):
+        blocks = np.asarray(blocks, dtype=COLUMNS['block'])
+        if not len(blocks):
+            return
+        if (self.last_block is not None and blocks[0] < self.last_block) or np.any(np.diff(blocks.astype(np.int64)) < 0):
+            raise ValueError("Les événements doivent être ajoutés dans l'ordre des blocs")
+        columns = {
+            'block': blocks,
+            'pool': np.asarray(pools, dtype=COLUMNS['pool']),
+            'reserve0': np.asarray(reserve0, dtype=COLUMNS['reserve0']),
+            'reserve1': np.asarray(reserve1, dtype=COLUMNS['reserve1'])
+        }
+        for name, values in columns.items():
+            values.tofile(self.files[name])
+        if self.first_block is None:
+            self.first_block = int(blocks[0])
+        self.last_block = int(blocks[-1])
+        self.rows += len(blocks)
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+        meta = {
+            'venues': [venue.to_dict() for venue in self.venues],
+            'pairs': self.pairs,
+            'rows': self.rows,
+            'first_block': self.first_block,
+            'last_block': self.last_block
+        }
+        tmp_path = os.path.join(self.directory, 'meta.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, os.path.join(self.directory, 'meta.json'))
+
+
+class SyncHistory:
+    """Lecture par memory-map d'un historique écrit par SyncHistoryWriter"""
+
+    def __init__(self, directory: str):
+        with open(os.path.join(directory, 'meta.json'), 'r') as f:
+            meta = json.load(f)
+        # Les historiques sans DEX enregistrés ont été écrits pour Uniswap et Sushiswap
+        self.venues = [Venue.from_dict(venue) for venue in meta['venues']] if 'venues' in meta else DEFAULT_VENUES
+        self.pairs: List[Dict] = meta['pairs']
+        self.rows: int = meta['rows']
+        self.first_block: Optional[int] = meta['first_block']
+        self.last_block: Optional[int] = meta['last_block']
+        self.columns = {
+            name: np.memmap(os.path.join(directory, f'{name}.bin'), dtype=dtype, mode='r', shape=(self.rows,))
+            if self.rows else np.empty(0, dtype=dtype)
+            for name, dtype in COLUMNS.items()
+        }
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def iter_chunks(self, chunk_rows: int = 1 << 20) -> Iterator[Dict[str, np.ndarray]]:
+        """Parcourt l'historique par tranches d'environ chunk_rows lignes, sans couper un bloc"""
+        blocks = self.columns['block']
+        start = 0
+        while start < self.rows:
+            end = min(start + chunk_rows, self.rows)
+            if end < self.rows:
+                # Recule jusqu'au début du bloc en cours, ou avance s'il occupe toute la tranche
+                boundary = start + int(np.searchsorted(blocks[start:end], blocks[end], 'left'))
+                end = boundary if boundary > start else start + int(np.searchsorted(blocks[start:], blocks[start], 'right'))
+            yield {name: np.asarray(column[start:end]) for name, column in self.columns.items()}
+            start = end
+
+
+async def ingest_sync_history(
+    w3,
+    scanner,
+    pairs: List[Tuple[str, str]],
+    from_block: int,
+    to_block: int,
+    directory: str,
+    block_step: int = 2000,
+    address_chunk_size: int = 1000
+) -> SyncHistory:
+    """
+    Construit l'historique des paires données (communes à au moins deux DEX du scanner) :
+    réserves initiales au bloc from_block - 1 puis événements Sync jusqu'à to_block inclus.
+    """
+    await scanner.prefetch_tokens(pairs)
+    # Sans décimales connues une paire ne peut pas être évaluée
+    token_store = scanner.token_store
+    pairs = [pair for pair in pairs if token_store.get(pair[0]) is not None and token_store.get(pair[1]) is not None]
+    n_venues = len(scanner.venues)
+    pool_addresses: List[str] = []
+    pool_index: Dict[str, int] = {}
+    meta_pairs = []
+    for i, (token0, token1) in enumerate(pairs):
+        pools = [addresses.get((token0, token1)) for addresses in scanner.pair_addresses]
+        for venue, address in enumerate(pools):
+            if address is not None:
+                pool_addresses.append(address)
+                pool_index[address.lower()] = i * n_venues + venue
+        meta_pairs.append({
+            'token0': token0,
+            'token1': token1,
+            'decimals0': token_store.get(token0)['decimals'],
+            'decimals1': token_store.get(token1)['decimals'],
+            'pools': pools
+        })
+
+    writer = SyncHistoryWriter(directory, meta_pairs, scanner.venues)
+    try:
+        results = await scanner.multicall.aggregate(
+            [(address, GET_RESERVES_SELECTOR) for address in pool_addresses], block_identifier=from_block - 1
+        )
+        seed = [decode_reserves(data) if data else (0, 0) for data in results]
+        writer.append(
+            [from_block - 1] * len(seed), [pool_index[address.lower()] for address in pool_addresses],
+            [float(r0) for r0, _ in seed], [float(r1) for _, r1 in seed]
+        )
+
+        chunks = [pool_addresses[i:i + address_chunk_size] for i in range(0, len(pool_addresses), address_chunk_size)]
+        for start in range(from_block, to_block + 1, block_step):
+            end = min(start + block_step - 1, to_block)
+            results = await asyncio.gather(*(
+                w3.eth.get_logs({'fromBlock': start, 'toBlock': end, 'address': chunk, 'topics': [SYNC_TOPIC]})
+                for chunk in chunks
+            ))
+            logs = sorted(
+                (log for chunk_logs in results for log in chunk_logs),
+                key=lambda log: (log['blockNumber'], log['logIndex'])
+            )
+            rows = []
+            for log in logs:
+                data = bytes(log['data'])
+                rows.append((
+                    log['blockNumber'],
+                    pool_index[log['address'].lower()],
+                    float(int.from_bytes(data[0:32], 'big')),
+                    float(int.from_bytes(data[32:64], 'big'))
+                ))
+            if rows:
+                writer.append(*zip(*rows))
+            print(f"Blocs {start}-{end} : {len(rows)} événements Sync")
+    finally:
+        writer.close()
+    return SyncHistory(directory)
+
+
+class Backtester:
+    """
+    Rejoue un historique Sync à travers les règles de décision d'ArbitrageLogic (seuils de profit
+    et de volume) et de TradingLogic (profit net après un coût de gas simulé). Volumes et profits
+    sont valorisés en USD au prix de l'ETH simulé ; les paires sans stablecoin ni WETH sont ignorées.
+    Seules les paires modifiées dans un bloc sont réévaluées ; toutes les opportunités au profit
+    positif sont conservées, ce qui permet de comparer d'autres seuils sans relire l'historique.
+    """
+
+    def __init__(
+        self,
+        logic: ArbitrageLogic,
+        trading: TradingLogic,
+        gas_price_gwei: float = 30.0,
+        eth_price_usdt: float = 2000.0
+    ):
+        self.logic = logic
+        self.trading = trading
+        self.eth_price_usdt = eth_price_usdt
+        self.gas_cost_usdt = trading.estimate_gas_cost_usdt({
+            'gas_price': gas_price_gwei * 1e9,
+            'eth_price_usdt': eth_price_usdt
+        })
+        self.screen: Optional[ArbitrageLogic] = None
+
+    def run(self, history: SyncHistory, chunk_rows: int = 1 << 20) -> Dict:
+        start_time = time.perf_counter()
+        # Évaluation sans seuils, aux frais des DEX de l'historique : les seuils sont appliqués
+        # ensuite pour mesurer les manqués
+        self.screen = ArbitrageLogic(
+            min_volume_usdt=0, min_profit_percent=0.0, metrics=Metrics(enabled=False), venues=history.venues
+        )
+        n_pairs = len(history.pairs)
+        n_venues = len(history.venues)
+        reserves = np.zeros((n_venues * n_pairs, 2), dtype=np.float64)
+        # Vue (N, V, 2) sur les mêmes réserves, mise à jour avec elles
+        venue_reserves = reserves.reshape(n_pairs, n_venues, 2)
+        decimals0 = np.array([pair['decimals0'] for pair in history.pairs], dtype=np.float64)
+        decimals1 = np.array([pair['decimals1'] for pair in history.pairs], dtype=np.float64)
+        pair_usd_prices = PairUsdPrices((pair['token0'], pair['token1']) for pair in history.pairs)
+        usd_prices = pair_usd_prices.prices(self.eth_price_usdt)
+
+        keys = ('block', 'pair', 'profit_percent', 'volume_usdt', 'net_profit_usdt')
+        found: Dict[str, List[np.ndarray]] = {key: [] for key in keys}
+        blocks_replayed = 0
+        for chunk in history.iter_chunks(chunk_rows):
+            # Opportunités de la tranche, regroupées à la fin de celle-ci en un tableau par colonne
+            chunk_found: Dict[str, List[np.ndarray]] = {key: [] for key in keys}
+            blocks, pools = chunk['block'], chunk['pool']
+            chunk_reserves = np.stack([chunk['reserve0'], chunk['reserve1']], axis=1)
+            bounds = np.concatenate(([0], np.flatnonzero(np.diff(blocks)) + 1, [len(blocks)]))
+            blocks_replayed += len(bounds) - 1
+            for s, e in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+                block_pools = pools[s:e]
+                if e - s == 1:
+                    reserves[block_pools] = chunk_reserves[s:e]
+                    touched = block_pools // n_venues
+                else:
+                    # Plusieurs Sync d'une même pool dans le bloc : seule la dernière compte
+                    unique_pools, last = np.unique(block_pools[::-1], return_index=True)
+                    reserves[unique_pools] = chunk_reserves[e - 1 - last]
+                    touched = np.unique(unique_pools // n_venues)
+                self._evaluate(int(blocks[s]), touched, venue_reserves, decimals0, decimals1, usd_prices, chunk_found)
+            if chunk_found['block']:
+                for key, values in chunk_found.items():
+                    found[key].append(np.concatenate(values))
+
+        events = {key: np.concatenate(values) if values else np.empty(0) for key, values in found.items()}
+        report = self.report(events, history)
+        report['blocks'] = blocks_replayed
+        report['unpriced_pairs'] = int(len(pair_usd_prices) - pair_usd_prices.valued().sum())
+        report['rows'] = len(history)
+        report['elapsed_s'] = time.perf_counter() - start_time
+        report['events'] = events
+        return report
+
+    def _evaluate(self, block_number: int, touched: np.ndarray, reserves: np.ndarray, decimals0: np.ndarray,
+                  decimals1: np.ndarray, usd_prices: np.ndarray, found: Dict[str, List[np.ndarray]]):
+        result = self.screen.find_arbitrage_opportunities_batch(
+            reserves[touched], decimals0[touched], decimals1[touched], usd_prices=usd_prices[touched]
+        )
+        indices = result['indices']
+        if not len(indices):
+            return
+        pairs = touched[indices]
+        # Profit en USD, comme expected_profit_usdt dans le bot
+        profit_usdt = result['expected_profit_usdt']
+        found['block'].append(np.full(len(pairs), block_number, dtype=np.int64))
+        found['pair'].append(pairs.astype(np.int64))
+        found['profit_percent'].append(result['profit_percent'])
+        found['volume_usdt'].append(result['volume_usdt'])
+        found['net_profit_usdt'].append(profit_usdt - self.gas_cost_usdt)
+
+    def evaluate_thresholds(self, events: Dict[str, np.ndarray], min_profit_percent: float, min_volume_usdt: float) -> Dict:
+        """PnL, taux de réussite et manqués pour un couple de seuils, à partir des opportunités rejouées"""
+        signals = (events['profit_percent'] >= min_profit_percent) & (events['volume_usdt'] >= min_volume_usdt)
+        profitable = events['net_profit_usdt'] > 0
+        taken = signals & profitable
+        missed = ~signals & profitable
+        return {
+            'min_profit_percent': min_profit_percent,
+            'min_volume_usdt': min_volume_usdt,
+            'signals': int(signals.sum()),
+            'trades': int(taken.sum()),
+            'pnl_usdt': float(events['net_profit_usdt'][taken].sum()),
+            # Part des signaux d'ArbitrageLogic qui restent rentables après le gas
+            'hit_rate': float(taken.sum() / signals.sum()) if signals.any() else 0.0,
+            'missed': int(missed.sum()),
+            'missed_pnl_usdt': float(events['net_profit_usdt'][missed].sum())
+        }
+
+    def sweep(self, events: Dict[str, np.ndarray], profit_thresholds: List[float], volume_thresholds: List[float]) -> List[Dict]:
+        return [
+            self.evaluate_thresholds(events, min_profit, min_volume)
+            for min_profit in profit_thresholds for min_volume in volume_thresholds
+        ]
+
+    def report(self, events: Dict[str, np.ndarray], history: SyncHistory, top: int = 10) -> Dict:
+        report = self.evaluate_thresholds(events, self.logic.min_profit_percent, self.logic.min_volume_usdt)
+        report['gas_cost_usdt'] = self.gas_cost_usdt
+
+        taken = (
+            (events['profit_percent'] >= self.logic.min_profit_percent)
+            & (events['volume_usdt'] >= self.logic.min_volume_usdt)
+            & (events['net_profit_usdt'] > 0)
+        )
+        pnl_by_pair = np.bincount(
+            events['pair'][taken].astype(np.int64), weights=events['net_profit_usdt'][taken], minlength=len(history.pairs)
+        )
+        best = np.argsort(pnl_by_pair)[::-1][:top]
+        report['top_pairs'] = [
+            {'pair': f"{history.pairs[i]['token0']}/{history.pairs[i]['token1']}", 'pnl_usdt': float(pnl_by_pair[i])}
+            for i in best if pnl_by_pair[i] > 0
+        ]
+        return report
+
+
+def print_report(report: Dict, sweep: Optional[List[Dict]] = None):
+    print(f"Blocs rejoués : {report['blocks']:,} ({report['rows']:,} événements Sync) en {report['elapsed_s']:.1f} s")
+    print(f"Coût du gas simulé : {report['gas_cost_usdt']:.2f} USDT par arbitrage")
+    if report['unpriced_pairs']:
+        print(f"Paires ignorées faute de prix USD : {report['unpriced_pairs']}")
+    print(f"Signaux : {report['signals']}, trades rentables : {report['trades']}, "
+          f"taux de réussite : {report['hit_rate'] * 100:.1f} %")
+    print(f"PnL : {report['pnl_usdt']:,.2f} USDT")
+    print(f"Manqués (rentables mais sous les seuils) : {report['missed']}, {report['missed_pnl_usdt']:,.2f} USDT")
+    for pair in report['top_pairs']:
+        print(f"  {pair['pair']}: {pair['pnl_usdt']:,.2f} USDT")
+    if sweep:
+        print(f"{'profit min (%)':>14} {'volume min':>12} {'trades':>8} {'PnL (USDT)':>14} {'réussite':>9} {'manqués':>8}")
+        for row in sweep:
+            print(f"{row['min_profit_percent']:>14.2f} {row['min_volume_usdt']:>12,.0f} {row['trades']:>8} "
+                  f"{row['pnl_usdt']:>14,.2f} {row['hit_rate'] * 100:>8.1f}% {row['missed']:>8}")
+
+
+async def _ingest(args):
+    from .dex_scanner import DexScanner
+    from .web3_client import Web3Client
+
+    client = Web3Client()
+    try:
+        scanner = DexScanner(client.w3)
+        pairs = await scanner.scan_dex_pairs(args.pairs)
+        await ingest_sync_history(client.w3, scanner, pairs, args.from_block, args.to_block, args.out, args.block_step)
+    finally:
+        await client.close()
+
+
+def main():
+    from .config import MIN_PROFIT_PERCENTAGE, MIN_VOLUME_USDT
+
+    parser = argparse.ArgumentParser(description="Backtest des seuils sur l'historique des événements Sync")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    ingest = subparsers.add_parser('ingest', help="Construit l'historique depuis le nœud RPC configuré")
+    ingest.add_argument('--from-block', type=int, required=True)
+    ingest.add_argument('--to-block', type=int, required=True)
+    ingest.add_argument('--pairs', type=int, default=1000)
+    ingest.add_argument('--block-step', type=int, default=2000)
+    ingest.add_argument('--out', required=True)
+    run = subparsers.add_parser('run', help="Rejoue un historique")
+    run.add_argument('--history', required=True)
+    run.add_argument('--min-profit', type=float, default=MIN_PROFIT_PERCENTAGE)
+    run.add_argument('--min-volume', type=float, default=MIN_VOLUME_USDT)
+    run.add_argument('--gas-gwei', type=float, default=30.0)
+    run.add_argument('--eth-price', type=float, default=2000.0)
+    run.add_argument('--sweep', action='store_true', help="Compare aussi une grille de seuils")
+    args = parser.parse_args()
+
+    if args.command == 'ingest':
+        asyncio.run(_ingest(args))
+        return
+
+    logic = ArbitrageLogic(args.min_volume, args.min_profit, metrics=Metrics(enabled=False))
+    trading = TradingLogic(None, None, None, metrics=Metrics(enabled=False))
+    backtester = Backtester(logic, trading, args.gas_gwei, args.eth_price)
+    report = backtester.run(SyncHistory(args.history))
+    sweep = None
+    if args.sweep:
+        sweep = backtester.sweep(report['events'], [0.0, 0.5, 1.0, 2.0], [0, 1000, 10000, 25000])
+    print_report(report, sweep)
+
+
+if __name__ == '__main__':
+    main()
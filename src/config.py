@@ -20,4 +20,54 @@ SUSHISWAP_FACTORY = '0xC0AEe478e3658e2610c5F7A4A2E1777cE9e4f2Ac'
 UNISWAP_ROUTER = '0x7a250d5630B4cF539739dF2C5dAcb4c659F2488D'
 SUSHISWAP_ROUTER = '0xd9e1cE17f2641f24aE83637ab66a2cca9C378B9F'
 WETH_ADDRESS = '0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2'
-USDT_ADDRESS = '0xdAC17F958D2ee523a2206206994597C13D831ec7'
\ No newline at end of file
+USDT_ADDRESS = '0xdAC17F958D2ee523a2206206994597C13D831ec7'
+USDC_ADDRESS = '0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48'
+DAI_ADDRESS = '0x6B175474E89094C44Da98b954EedeAC495271d0F'
+WBTC_ADDRESS = '0x2260FAC5E5542a773Aa44fBCfeDf7C193bc2C599'
+# Tokens valorisés à 1 USD ; les profits et volumes des autres paires passent par WETH ou sont ignorés
+STABLECOINS = [token.strip() for token in os.getenv('STABLECOINS', ','.join([
+    USDT_ADDRESS,
+    USDC_ADDRESS,
+    DAI_ADDRESS
+])).split(',') if token.strip()]
+# Paire WETH/USDT Uniswap V2 (token0 = WETH, token1 = USDT)
+WETH_USDT_PAIR = '0x0d4a11d5EEaaC28EC3F61d100daF4d40471f1852'
+
+# DEX (forks UniswapV2) : keccak256 du bytecode de création des paires, pour CREATE2
+UNISWAP_INIT_CODE_HASH = '0x96e8ac4277198ff8b6f785478aa9a39f403cb768dd02cbee326c3e7da348845f'
+SUSHISWAP_INIT_CODE_HASH = '0xe18a34eb0e04b04f7a0ac29a6e80748dca96319b42c54d679cb821dca90c6303'
+# Fichier JSON optionnel de DEX supplémentaires (voir venues.example.json)
+VENUES_PATH = os.getenv('VENUES_PATH', '')
+
+# Découverte des paires
+MULTICALL3_ADDRESS = '0xcA11bde05977b3631167028862bE2a173976CA11'
+MULTICALL_CHUNK_SIZE = int(os.getenv('MULTICALL_CHUNK_SIZE', '500'))
+MULTICALL_CONCURRENCY = int(os.getenv('MULTICALL_CONCURRENCY', '4'))
+PAIR_REGISTRY_PATH = os.getenv('PAIR_REGISTRY_PATH', 'pair_registry.json')
+TOKEN_METADATA_PATH = os.getenv('TOKEN_METADATA_PATH', 'token_metadata.json')
+# Découverte ciblée : tokens de base combinés avec chaque token préféré (WETH, USDT, USDC, DAI, WBTC par défaut)
+BASE_TOKENS = [token.strip() for token in os.getenv('BASE_TOKENS', ','.join([
+    WETH_ADDRESS,
+    USDT_ADDRESS,
+    USDC_ADDRESS,
+    DAI_ADDRESS,
+    WBTC_ADDRESS
+])).split(',') if token.strip()]
+
+# Moteur multi-processus : processus d'évaluation de src.engine (0 : évaluation dans le processus du moteur)
+SHARD_WORKERS = int(os.getenv('SHARD_WORKERS', '0'))
+
+# Moteur sans interface : instantanés d'état diffusés aux clients locaux (interface graphique)
+SNAPSHOT_PORT = int(os.getenv('SNAPSHOT_PORT', '9109'))
+SNAPSHOT_RATE = float(os.getenv('SNAPSHOT_RATE', '4'))  # instantanés par seconde au plus
+AUTO_EXECUTE = os.getenv('AUTO_EXECUTE', 'false').lower() in ('1', 'true', 'yes')
+# Ordonnancement des exécutions : exécutions simultanées au plus, âge maximal d'une opportunité en blocs
+MAX_IN_FLIGHT = int(os.getenv('MAX_IN_FLIGHT', '2'))
+MAX_OPPORTUNITY_AGE_BLOCKS = int(os.getenv('MAX_OPPORTUNITY_AGE_BLOCKS', '2'))
+# Seules les paires modifiées sont réévaluées à chaque bloc, toutes dès que la base fee ou le prix
+# de l'ETH s'écarte de plus de cette part de sa valeur lors de la dernière évaluation complète
+FULL_EVALUATION_FEE_MOVE = float(os.getenv('FULL_EVALUATION_FEE_MOVE', '0.05'))
+
+# Instrumentation
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+METRICS_PORT = int(os.getenv('METRICS_PORT', '9108'))
@@ -1,80 +1,223 @@
 from web3 import Web3
-from typing import List, Tuple, Dict
-import json
-
-# ABIs nécessaires
-FACTORY_ABI = json.loads('''[
-    {"inputs":[],"name":"allPairsLength","outputs":[{"internalType":"uint256","name":"","type":"uint256"}],"stateMutability":"view","type":"function"},
-    {"inputs":[{"internalType":"uint256","name":"","type":"uint256"}],"name":"allPairs","outputs":[{"internalType":"address","name":"","type":"address"}],"stateMutability":"view","type":"function"}
-]''')
-
-PAIR_ABI = json.loads('''[
-    {"inputs":[],"name":"token0","outputs":[{"internalType":"address","name":"","type":"address"}],"stateMutability":"view","type":"function"},
-    {"inputs":[],"name":"token1","outputs":[{"internalType":"address","name":"","type":"address"}],"stateMutability":"view","type":"function"},
-    {"inputs":[],"name":"getReserves","outputs":[{"internalType":"uint112","name":"_reserve0","type":"uint112"},{"internalType":"uint112","name":"_reserve1","type":"uint112"},{"internalType":"uint32","name":"_blockTimestampLast","type":"uint32"}],"stateMutability":"view","type":"function"}
-]''')
-
-ERC20_ABI = json.loads('''[
-    {"inputs":[],"name":"symbol","outputs":[{"internalType":"string","name":"","type":"string"}],"stateMutability":"view","type":"function"},
-    {"inputs":[],"name":"decimals","outputs":[{"internalType":"uint8","name":"","type":"uint8"}],"stateMutability":"view","type":"function"}
-]''')
+from typing import List, Tuple, Dict, Optional
+from collections import Counter
+import asyncio
+from .config import BASE_TOKENS
+from .fast_calls import (
+    ALL_PAIRS_LENGTH_SELECTOR, GET_RESERVES_SELECTOR, TOKEN0_SELECTOR, TOKEN1_SELECTOR,
+    decode_address, decode_reserves, decode_uint, encode_all_pairs
+)
+from .metrics import METRICS, Metrics
+from .multicall import Multicall
+from .pair_registry import PairRegistry
+from .reserves import ReserveSnapshot
+from .token_store import TokenStore
+from .venues import Venue, load_venues, sort_tokens
+
 
 class DexScanner:
-    def __init__(self, w3, uniswap_factory_address: str, sushiswap_factory_address: str):
+    def __init__(
+        self,
+        w3,
+        venues: Optional[List[Venue]] = None,
+        multicall: Optional[Multicall] = None,
+        registry: Optional[PairRegistry] = None,
+        token_store: Optional[TokenStore] = None,
+        metrics: Optional[Metrics] = None
+    ):
         self.w3 = w3
-        self.uniswap_factory = w3.eth.contract(address=uniswap_factory_address, abi=FACTORY_ABI)
-        self.sushiswap_factory = w3.eth.contract(address=sushiswap_factory_address, abi=FACTORY_ABI)
-        self.known_tokens: Dict[str, Dict] = {}
+        self.venues = venues or load_venues()
+        self.multicall = multicall or Multicall(w3)
+        self.registry = registry or PairRegistry()
+        self.token_store = token_store or TokenStore(self.multicall)
+        self.metrics = metrics or METRICS
         self.common_pairs: List[Tuple[str, str]] = []
+        # Adresse de la paire pour chaque couple (token0, token1) dans l'ordre du contrat, par DEX
+        # (même ordre que self.venues)
+        self.pair_addresses: List[Dict[Tuple[str, str], str]] = [{} for _ in self.venues]
+        # Paires communes de chaque token
+        self.pairs_by_token: Dict[str, List[Tuple[str, str]]] = {}
 
     async def get_token_info(self, token_address: str) -> Dict:
         """Récupère les informations d'un token (symbole, décimales)"""
-        if token_address in self.known_tokens:
-            return self.known_tokens[token_address]
+        token_info = self.token_store.get(token_address)
+        if token_info is not None:
+            return token_info
 
-        token_contract = self.w3.eth.contract(address=token_address, abi=ERC20_ABI)
         try:
-            symbol = await token_contract.functions.symbol().call()
-            decimals = await token_contract.functions.decimals().call()
-            token_info = {"symbol": symbol, "decimals": decimals}
-            self.known_tokens[token_address] = token_info
-            return token_info
+            return (await self.token_store.fetch([token_address]))[token_address]
         except Exception as e:
             print(f"Erreur lors de la récupération des infos du token {token_address}: {e}")
             return None
 
+    async def prefetch_tokens(self, pairs: List[Tuple[str, str]]):
+        """Charge en lot les métadonnées de tous les tokens des paires données"""
+        try:
+            await self.token_store.fetch({token for pair in pairs for token in pair})
+        except Exception as e:
+            print(f"Erreur lors du préchargement des infos de tokens: {e}")
+
+    async def _call(self, address: str, data: bytes, block_identifier='latest') -> bytes:
+        """eth_call brut, sans construction de contrat ni décodage ABI générique"""
+        return bytes(await self.w3.eth.call({'to': address, 'data': data}, block_identifier))
+
     async def get_pair_tokens(self, pair_address: str) -> Tuple[str, str]:
         """Récupère les adresses des tokens d'une paire"""
-        pair_contract = self.w3.eth.contract(address=pair_address, abi=PAIR_ABI)
-        token0 = await pair_contract.functions.token0().call()
-        token1 = await pair_contract.functions.token1().call()
+        token0 = decode_address(await self._call(pair_address, TOKEN0_SELECTOR))
+        token1 = decode_address(await self._call(pair_address, TOKEN1_SELECTOR))
         return token0, token1
 
+    async def _fetch_pair_addresses(self, factory_address: str, start: int, end: int) -> List[Optional[str]]:
+        """Récupère allPairs(i) pour i dans [start, end) par appels groupés"""
+        calls = [(factory_address, encode_all_pairs(i)) for i in range(start, end)]
+        results = await self.multicall.aggregate(calls)
+        return [decode_address(data) if data else None for data in results]
+
+    async def _fetch_pairs_tokens(self, pair_addresses: List[str]) -> List[Optional[Tuple[str, str]]]:
+        """Récupère token0/token1 de plusieurs paires par appels groupés"""
+        calls = []
+        for pair_address in pair_addresses:
+            calls.append((pair_address, TOKEN0_SELECTOR))
+            calls.append((pair_address, TOKEN1_SELECTOR))
+        results = await self.multicall.aggregate(calls)
+
+        tokens = []
+        for i in range(0, len(results), 2):
+            if results[i] and results[i + 1]:
+                tokens.append((decode_address(results[i]), decode_address(results[i + 1])))
+            else:
+                tokens.append(None)
+        return tokens
+
+    async def _sync_factory(self, factory_address: str, max_pairs: int) -> List[Tuple[str, str, str]]:
+        """
+        Complète le registre d'une factory jusqu'à max_pairs paires.
+        Seuls les indices au-delà des paires déjà connues sont récupérés.
+        """
+        length = decode_uint(await self._call(factory_address, ALL_PAIRS_LENGTH_SELECTOR))
+        target = min(length, max_pairs)
+        start = self.registry.known_count(factory_address)
+
+        if start < target:
+            pair_addresses = await self._fetch_pair_addresses(factory_address, start, target)
+            # On ne conserve que le préfixe contigu pour garder les indices cohérents
+            if None in pair_addresses:
+                pair_addresses = pair_addresses[:pair_addresses.index(None)]
+
+            tokens = await self._fetch_pairs_tokens(pair_addresses)
+            new_pairs = []
+            for pair_address, pair_tokens in zip(pair_addresses, tokens):
+                if pair_tokens is None:
+                    break
+                new_pairs.append((pair_address, pair_tokens[0], pair_tokens[1]))
+
+            self.registry.extend(factory_address, new_pairs)
+            self.registry.save()
+
+        return self.registry.get_pairs(factory_address, target)
+
     async def scan_dex_pairs(self, max_pairs: int = 1000) -> List[Tuple[str, str]]:
-        """Scan les paires communes entre Uniswap et Sushiswap"""
-        uni_pairs = set()
-        sushi_pairs = set()
-
-        # Scan Uniswap pairs
-        uni_length = min(await self.uniswap_factory.functions.allPairsLength().call(), max_pairs)
-        for i in range(uni_length):
-            pair_address = await self.uniswap_factory.functions.allPairs(i).call()
-            tokens = await self.get_pair_tokens(pair_address)
-            uni_pairs.add(tuple(sorted([tokens[0], tokens[1]])))
-
-        # Scan Sushiswap pairs
-        sushi_length = min(await self.sushiswap_factory.functions.allPairsLength().call(), max_pairs)
-        for i in range(sushi_length):
-            pair_address = await self.sushiswap_factory.functions.allPairs(i).call()
-            tokens = await self.get_pair_tokens(pair_address)
-            sushi_pairs.add(tuple(sorted([tokens[0], tokens[1]])))
-
-        # Find common pairs
-        self.common_pairs = list(uni_pairs.intersection(sushi_pairs))
+        """Scan les paires listées sur au moins deux des DEX suivis"""
+        with self.metrics.timer('scan'):
+            # Les factories sont synchronisées en parallèle : le coût croît linéairement avec leur nombre
+            entries = await asyncio.gather(*(
+                self._sync_factory(venue.factory, max_pairs) for venue in self.venues
+            ))
+
+        self.pair_addresses = [
+            {(token0, token1): pair_address for pair_address, token0, token1 in venue_entries}
+            for venue_entries in entries
+        ]
+        self._index_pairs()
+        # Les métadonnées sont chargées en lot pour que l'évaluation ne les attende jamais
+        await self._load_tokens()
+        return self.common_pairs
+
+    async def discover_pairs(self, tokens: List[str], base_tokens: Optional[List[str]] = None) -> List[Tuple[str, str]]:
+        """
+        Découverte ciblée, sans parcourir allPairs : les adresses des paires token × token de base
+        sont calculées localement par CREATE2 sur chaque DEX, puis leur existence est vérifiée
+        par un seul lot de getReserves (une adresse sans code renvoie des données vides).
+        Les DEX sans init_code_hash sont ignorés.
+        """
+        with self.metrics.timer('discover'):
+            tokens = [Web3.to_checksum_address(token) for token in tokens]
+            base_tokens = [Web3.to_checksum_address(token) for token in base_tokens or BASE_TOKENS]
+            candidates = []
+            seen = set()
+            for token in tokens:
+                for base in base_tokens:
+                    pair = sort_tokens(token, base)
+                    if pair[0] == pair[1] or pair in seen:
+                        continue
+                    seen.add(pair)
+                    for venue_index, venue in enumerate(self.venues):
+                        # Checksum calculé seulement pour les paires qui existent
+                        pair_address = venue.pair_address(*pair, checksum=False)
+                        if pair_address is not None:
+                            candidates.append((venue_index, pair, pair_address))
+            results = await self.multicall.aggregate(
+                [(pair_address, GET_RESERVES_SELECTOR) for _, _, pair_address in candidates]
+            )
+
+        self.pair_addresses = [{} for _ in self.venues]
+        for (venue_index, pair, pair_address), data in zip(candidates, results):
+            if data:
+                self.pair_addresses[venue_index][pair] = Web3.to_checksum_address(pair_address)
+        self._index_pairs()
+        await self._load_tokens()
         return self.common_pairs
 
+    def _index_pairs(self):
+        """Paires communes à au moins deux DEX, et index de ces paires par token"""
+        listings = Counter(pair for addresses in self.pair_addresses for pair in addresses)
+        self.common_pairs = [pair for pair, count in listings.items() if count >= 2]
+        self._index_tokens()
+
+    async def _load_tokens(self):
+        """Charge les métadonnées des paires communes et écarte celles dont un token est illisible"""
+        await self.prefetch_tokens(self.common_pairs)
+        known = [
+            pair for pair in self.common_pairs
+            if self.token_store.get(pair[0]) is not None and self.token_store.get(pair[1]) is not None
+        ]
+        if len(known) < len(self.common_pairs):
+            print(f"{len(self.common_pairs) - len(known)} paires ignorées : métadonnées de token illisibles")
+            self.common_pairs = known
+            self._index_tokens()
+
+    def _index_tokens(self):
+        self.pairs_by_token = {}
+        for pair in self.common_pairs:
+            for token in pair:
+                self.pairs_by_token.setdefault(token, []).append(pair)
+
+    def pairs_of(self, token: str) -> List[Tuple[str, str]]:
+        """Paires communes contenant le token"""
+        return self.pairs_by_token.get(Web3.to_checksum_address(token), [])
+
     async def get_reserves(self, pair_address: str) -> Tuple[int, int]:
         """Récupère les réserves d'une paire"""
-        pair_contract = self.w3.eth.contract(address=pair_address, abi=PAIR_ABI)
-        reserves = await pair_contract.functions.getReserves().call()
-        return reserves[0], reserves[1]
\ No newline at end of file
+        return decode_reserves(await self._call(pair_address, GET_RESERVES_SELECTOR))
+
+    async def get_reserves_batch(self, pairs: List[Tuple[str, str]], block_number: int) -> ReserveSnapshot:
+        """
+        Récupère les réserves de toutes les paires sur chaque DEX où elles sont listées,
+        figées sur un même bloc, en un minimum d'appels groupés
+        """
+        calls = []
+        slots = []
+        for i, pair in enumerate(pairs):
+            for venue, addresses in enumerate(self.pair_addresses):
+                pair_address = addresses.get(pair)
+                if pair_address is not None:
+                    calls.append((pair_address, GET_RESERVES_SELECTOR))
+                    slots.append((i, venue))
+        with self.metrics.timer('reserves', block_number):
+            results = await self.multicall.aggregate(calls, block_identifier=block_number)
+
+        snapshot = ReserveSnapshot(block_number, pairs, len(self.venues))
+        for (i, venue), data in zip(slots, results):
+            if data:
+                snapshot.set_reserves(i, venue, *decode_reserves(data))
+        return snapshot
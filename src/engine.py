@@ -0,0 +1,527 @@
+"""
+Moteur d'arbitrage sans interface graphique.
+
+Le moteur tourne seul dans une boucle asyncio : mise à jour des réserves à chaque bloc à partir
+des événements Sync (ReserveCache), filtrage vectorisé des paires modifiées, calcul exact,
+recherche des cycles passant par les pools modifiés (TokenGraph), analyse des frais et, en mode
+automatique, exécution. L'interface graphique (src/main.py)
+n'est qu'un client facultatif : elle reçoit des instantanés d'état regroupés et limités en
+fréquence par SnapshotPublisher, si bien que son rendu n'a aucun effet sur la latence de
+détection et que le moteur se déploie sans affichage.
+
+    python -m src.engine
+    python -m src.engine --auto --max-pairs 5000 --snapshot-rate 2
+    python -m src.engine --workers 8    # évaluation répartie sur 8 processus
+"""
+from typing import Dict, List, Optional, Set, Tuple
+import argparse
+import asyncio
+import time
+import numpy as np
+from web3 import Web3
+from .arbitrage_logic import ArbitrageLogic, PairUsdPrices
+from .config import (
+    AUTO_EXECUTE, FULL_EVALUATION_FEE_MOVE, MAX_IN_FLIGHT, MAX_OPPORTUNITY_AGE_BLOCKS, METRICS_ENABLED, METRICS_PORT,
+    MIN_PROFIT_PERCENTAGE, MIN_VOLUME_USDT, MULTICALL_CHUNK_SIZE, MULTICALL_CONCURRENCY, PAIR_REGISTRY_PATH, PRIVATE_KEY,
+    SHARD_WORKERS, SNAPSHOT_PORT, SNAPSHOT_RATE, STABLECOINS, TOKEN_METADATA_PATH, WETH_ADDRESS
+)
+from .dex_scanner import DexScanner
+from .fee_oracle import BlockFeeOracle
+from .metrics import METRICS, Metrics, MetricsServer
+from .multicall import Multicall
+from .pair_registry import PairRegistry
+from .reserve_cache import ReserveCache
+from .reserves import ReserveSnapshot
+from .scheduler import OpportunityScheduler, opportunity_key
+from .sharded_engine import ShardedEngine
+from .snapshot_stream import SnapshotPublisher
+from .stats_manager import StatsManager
+from .token_graph import TokenGraph
+from .token_store import TokenStore
+from .trade_executor import TradeExecutor
+from .trading_logic import TradingLogic
+from .venues import Venue, load_venues
+from .web3_client import Web3Client
+
+# Nombre d'opportunités transmises dans chaque instantané
+SNAPSHOT_OPPORTUNITIES = 50
+
+
+class ArbitrageEngine:
+    """
+    Boucle de détection et d'exécution, indépendante de tout affichage.
+
+        engine = ArbitrageEngine(w3, auto_execute=False)
+        await engine.setup(max_pairs=1000)
+        accepted = await engine.process_block(block_number)
+    """
+
+    def __init__(
+        self,
+        w3,
+        auto_execute: bool = AUTO_EXECUTE,
+        private_key: Optional[str] = PRIVATE_KEY,
+        venues: Optional[List[Venue]] = None,
+        publisher: Optional[SnapshotPublisher] = None,
+        metrics: Optional[Metrics] = None,
+        workers: int = SHARD_WORKERS
+    ):
+        self.w3 = w3
+        self.venues = venues or load_venues()
+        self.metrics = metrics or METRICS
+        multicall = Multicall(w3, chunk_size=MULTICALL_CHUNK_SIZE, concurrency=MULTICALL_CONCURRENCY)
+        self.scanner = DexScanner(
+            w3, self.venues, multicall,
+            PairRegistry(PAIR_REGISTRY_PATH), TokenStore(multicall, TOKEN_METADATA_PATH),
+            self.metrics
+        )
+        self.logic = ArbitrageLogic(MIN_VOLUME_USDT, MIN_PROFIT_PERCENTAGE, self.metrics, self.venues)
+        self.stats = StatsManager()
+        # Réserves tenues à jour par les événements Sync ; le prix de l'ETH y est lu si WETH/USDT est suivie
+        self.reserve_cache = ReserveCache(w3, metrics=self.metrics)
+        fee_oracle = BlockFeeOracle(w3, reserve_source=self.reserve_cache, metrics=self.metrics)
+        # Sans clé privée le moteur reste en mode observation
+        self.executor = TradeExecutor(w3, private_key, self.metrics, self.venues, fee_oracle) if private_key else None
+        self.auto_execute = auto_execute and self.executor is not None
+        self.trading = TradingLogic(w3, self.executor, self.stats, fee_oracle, self.metrics, self.venues)
+        self.scheduler = OpportunityScheduler(
+            self.trading, MAX_IN_FLIGHT, MAX_OPPORTUNITY_AGE_BLOCKS, self._on_execution, self.metrics
+        )
+        self.publisher = publisher
+        # Évaluation répartie sur workers processus (ShardedEngine), dans ce processus si 0
+        self.workers = workers
+        self.sharded: Optional[ShardedEngine] = None
+        # Paires évaluées à chaque bloc : paires communes dont un token a un prix USD
+        self.pairs: List[Tuple[str, str]] = []
+        self.decimals = np.zeros((0, 2), dtype=np.int64)
+        self.usd_prices = PairUsdPrices([])
+        # Adresse de pool (minuscules) -> (index de la paire, index du DEX)
+        self.pools: Dict[str, Tuple[int, int]] = {}
+        # Pools suivis sur tous les DEX, pour les cycles de 3 ou 4 sauts
+        self.token_graph = TokenGraph()
+        self.stablecoins = {token.lower() for token in STABLECOINS}
+        # Réserves du dernier bloc traité, mises à jour pool par pool au bloc suivant
+        self.snapshot: Optional[ReserveSnapshot] = None
+        # (base fee, prix de l'ETH) de la dernière évaluation de toutes les paires
+        self.full_evaluation_fees: Optional[Tuple[int, float]] = None
+        self.full_evaluation_fee_move = FULL_EVALUATION_FEE_MOVE
+        self.block_number: Optional[int] = None
+        self.opportunities: List[Dict] = []
+        self.last_execution: Optional[Dict] = None
+
+    async def setup(self, max_pairs: int = 1000, full_scan: bool = False):
+        """
+        Découvre les paires communes et charge les décimales de leurs tokens. Avec une liste de
+        tokens préférés, seules leurs paires avec les tokens de base sont cherchées (par CREATE2),
+        sauf si full_scan demande le parcours de allPairs. Les paires sans stablecoin ni WETH,
+        dont le profit ne peut pas être valorisé en USD, ne sont pas suivies.
+        """
+        preferred = self.stats.get_preferred_tokens()
+        if preferred and not full_scan:
+            pairs = await self.scanner.discover_pairs(preferred)
+        else:
+            pairs = await self.scanner.scan_dex_pairs(max_pairs)
+        valued = PairUsdPrices(pairs).valued()
+        pairs = [pair for pair, has_usd in zip(pairs, valued.tolist()) if has_usd]
+        if len(pairs) < len(valued):
+            print(f"{len(valued) - len(pairs)} paires ignorées : aucun prix USD")
+        self.pairs = pairs
+        self.usd_prices = PairUsdPrices(pairs)
+        token_store = self.scanner.token_store
+        self.decimals = np.array([
+            [token_store.get(token0)['decimals'], token_store.get(token1)['decimals']]
+            for token0, token1 in pairs
+        ], dtype=np.int64).reshape(-1, 2)
+        self._index_pools()
+        # Nouvelles paires : le prochain bloc relit toutes les réserves et réinitialise le cache
+        self.snapshot = None
+        if self.executor is not None:
+            # Calldata de chaque route possible préparée avant le premier bloc, même en mode manuel
+            await self.executor.warm(
+                (venue.name, token0, token1)
+                for venue, addresses in zip(self.venues, self.scanner.pair_addresses)
+                for token0, token1 in self.pairs if (token0, token1) in addresses
+            )
+        if self.workers:
+            if self.sharded is not None:
+                self.sharded.stop()
+            self.sharded = ShardedEngine(
+                self.trading, self.workers, self.logic.min_volume_usdt, self.logic.min_profit_percent,
+                self.venues, self.metrics
+            )
+            self.sharded.start(self.pairs, self.decimals.tolist(), self.scanner.pair_addresses)
+
+    def _index_pools(self):
+        """Indexe les pools de chaque paire suivie sur chaque DEX et construit leur graphe de tokens"""
+        self.pools = {}
+        self.token_graph = TokenGraph()
+        for venue, addresses in enumerate(self.scanner.pair_addresses):
+            for i, pair in enumerate(self.pairs):
+                pool = addresses.get(pair)
+                if pool is not None:
+                    self.pools[pool.lower()] = (i, venue)
+                    self.token_graph.add_pool(pool.lower(), *pair, venue=self.venues[venue])
+
+    async def process_block(self, block_number: int) -> List[Dict]:
+        """
+        Évalue les paires et les cycles modifiés au bloc donné (tous si les frais ou le prix de
+        l'ETH ont trop varié) et retourne les opportunités retenues
+        """
+        fee_oracle = self.trading.fee_oracle
+        fee_oracle.on_new_block(block_number)
+        snapshot, changed = await self._read_reserves(block_number)
+        # Le prix de l'ETH du bloc valorise en USD les paires en WETH, lu dans le cache une fois à jour
+        fees = await fee_oracle.get(block_number)
+        if changed is not None and self._fees_moved(fees):
+            # Le coût du gas ou la valeur USD des paires inchangées a trop varié : toutes sont réévaluées
+            changed = None
+        if changed is None:
+            self.full_evaluation_fees = (fees['base_fee'], fees['eth_price_usdt'])
+        cycles = self._find_cycles(snapshot, changed)
+        indices = None if changed is None else sorted({
+            self.pools[address][0] for address in changed if address in self.pools
+        })
+        if self.sharded is not None:
+            # Filtrage réparti entre les processus de travail, calcul exact et analyse dans ce processus
+            accepted = [self._describe(decision) for decision in await self.sharded.process_snapshot(snapshot, indices)]
+        else:
+            accepted = await self._evaluate(snapshot, self.usd_prices.prices(fees['eth_price_usdt']), indices)
+        accepted += await self._evaluate_cycles(snapshot, cycles, fees['eth_price_usdt'])
+        accepted.sort(key=lambda decision: decision['net_profit_usdt'], reverse=True)
+        for _ in accepted:
+            self.stats.add_opportunity_found()
+
+        self.block_number = block_number
+        self.opportunities = accepted
+        # Exécutions ordonnancées hors du chemin de détection, vérifiées sur les réserves de ce bloc
+        if self.auto_execute:
+            self.scheduler.submit(accepted, snapshot, block_number)
+        if self.publisher is not None:
+            self.publisher.notify()
+        return accepted
+
+    def _find_cycles(self, snapshot: ReserveSnapshot, changed: Optional[Set[str]]) -> List[Dict]:
+        """
+        Met le graphe des tokens à jour avec les réserves du bloc et retourne les cycles profitables :
+        seulement ceux passant par les pools modifiés, tous lors d'une évaluation complète
+        """
+        graph = self.token_graph
+        min_profit_percent = self.logic.min_profit_percent
+        if changed is None:
+            for address, (i, venue) in self.pools.items():
+                graph.update_pool(address, snapshot.reserves_of(i, venue))
+            return graph.find_cycles(min_profit_percent=min_profit_percent)
+        cache = self.reserve_cache
+        changed_pools = {address: cache.get(address) for address in changed if address in self.pools}
+        return graph.update_and_find_cycles(changed_pools, min_profit_percent=min_profit_percent)
+
+    async def _evaluate_cycles(self, snapshot: ReserveSnapshot, cycles: List[Dict], eth_price_usdt: float) -> List[Dict]:
+        """
+        Taille, valorise et analyse les cycles exécutables : ceux dont tous les pools sont sur un
+        même DEX, que le chemin multi-pools de son routeur exécute en une transaction. Le cycle
+        part de son premier token de prix USD (stablecoin ou WETH).
+        """
+        block_number = snapshot.block_number
+        token_store = self.scanner.token_store
+        opportunities = []
+        for cycle in cycles:
+            owners = [self.pools[pool] for pool in cycle['pools']]
+            venues = {venue for _, venue in owners}
+            if len(venues) > 1:
+                continue
+            venue = self.venues[venues.pop()]
+            tokens = cycle['tokens'][:-1]
+            prices = [self._token_usd(token, eth_price_usdt) for token in tokens]
+            start = next((k for k, price in enumerate(prices) if price is not None), None)
+            if start is None:
+                continue
+            tokens = tokens[start:] + tokens[:start]
+            owners = owners[start:] + owners[:start]
+            pools = cycle['pools'][start:] + cycle['pools'][:start]
+
+            hops, path = [], []
+            for token_in, (i, v) in zip(tokens, owners):
+                token0, token1 = snapshot.pairs[i]
+                reserve0, reserve1 = snapshot.reserves_of(i, v)
+                zero_for_one = token_in == token0
+                hops.append((venue.name, token0, token1, zero_for_one))
+                reserve_in, reserve_out = (reserve0, reserve1) if zero_for_one else (reserve1, reserve0)
+                path.append((reserve_in, reserve_out, venue.fee_numerator, venue.fee_denominator))
+            opportunity = self.logic.find_cycle_opportunity(path, token_store.get(tokens[0])['decimals'], prices[start])
+            if opportunity is None:
+                continue
+            opportunities.append(self._describe({
+                **opportunity,
+                'token0': tokens[0],
+                'token1': tokens[1],
+                'tokens': tokens + [tokens[0]],
+                'pools': pools,
+                'hops': hops,
+                'venue': venue.name,
+                'buy_venue': venue.name,
+                'sell_venue': venue.name,
+                'profit_percent': cycle['profit_percent'],
+                'block_number': block_number
+            }))
+
+        decisions = await asyncio.gather(*(self.trading.analyze_opportunity(opportunity) for opportunity in opportunities))
+        return [decision for decision in decisions if decision is not None]
+
+    def _token_usd(self, token: str, eth_price_usdt: float) -> Optional[float]:
+        """Prix USD d'une unité entière de token : 1 pour un stablecoin, le prix de l'ETH pour WETH"""
+        token = token.lower()
+        if token == WETH_ADDRESS.lower():
+            return eth_price_usdt
+        if token in self.stablecoins:
+            return 1.0
+        return None
+
+    def _fees_moved(self, fees: Dict) -> bool:
+        """Vérifie si la base fee ou le prix de l'ETH s'est écarté de la dernière évaluation complète"""
+        if self.full_evaluation_fees is None:
+            return True
+        current = (fees['base_fee'], fees['eth_price_usdt'])
+        return any(
+            abs(value - reference) > self.full_evaluation_fee_move * abs(reference)
+            for value, reference in zip(current, self.full_evaluation_fees)
+        )
+
+    async def _read_reserves(self, block_number: int) -> Tuple[ReserveSnapshot, Optional[Set[str]]]:
+        """
+        Réserves du bloc : seules les pools dont ReserveCache a vu un événement Sync (ou qu'une
+        réorganisation a restaurées) sont mises à jour. Toutes les réserves ne sont relues par
+        multicall qu'au premier bloc et après une réorganisation plus profonde que les checkpoints.
+        Retourne l'instantané et les adresses des pools modifiées (None : toutes les paires).
+        """
+        cache = self.reserve_cache
+        if self.snapshot is not None and not cache.needs_reseed:
+            changed = await cache.sync_to(block_number)
+            if not cache.needs_reseed:
+                snapshot = self.snapshot.copy(block_number)
+                for address in changed:
+                    owner = self.pools.get(address)
+                    if owner is not None:
+                        snapshot.set_reserves(*owner, *cache.get(address))
+                self.snapshot = snapshot
+                return snapshot, changed
+
+        snapshot, block = await asyncio.gather(
+            self.scanner.get_reserves_batch(self.pairs, block_number), self.w3.eth.get_block(block_number)
+        )
+        cache.seed_from_snapshot(snapshot, self.scanner.pair_addresses, block['hash'])
+        self.snapshot = snapshot
+        return snapshot, None
+
+    async def _evaluate(self, snapshot, usd_prices: np.ndarray, indices: Optional[List[int]] = None) -> List[Dict]:
+        """
+        Filtrage vectorisé, calcul exact et analyse dans ce processus des paires d'index indices
+        (toutes les paires du bloc si None)
+        """
+        block_number = snapshot.block_number
+        if indices is None:
+            indices = np.arange(len(snapshot))
+            reserves = snapshot.as_array()
+        else:
+            indices = np.array(indices, dtype=np.int64)
+            reserves = np.array(
+                [snapshot.venue_reserves(i) for i in indices.tolist()], dtype=np.float64
+            ).reshape(-1, snapshot.n_venues, 2)
+        candidates = self.logic.find_arbitrage_opportunities_batch(
+            reserves, self.decimals[indices, 0], self.decimals[indices, 1], block_number, usd_prices[indices]
+        )
+
+        opportunities = []
+        for i in indices[candidates['indices']].tolist():
+            token0, token1 = snapshot.pairs[i]
+            decimals0, decimals1 = int(self.decimals[i, 0]), int(self.decimals[i, 1])
+            opportunity = self.logic.find_arbitrage_opportunity(
+                snapshot.venue_reserves(i), decimals0, decimals1, block_number, tuple(usd_prices[i].tolist())
+            )
+            if opportunity is None:
+                continue
+            opportunities.append(self._describe({
+                **opportunity,
+                'token0': token0,
+                'token1': token1,
+                'block_number': block_number
+            }))
+
+        decisions = await asyncio.gather(*(self.trading.analyze_opportunity(opportunity) for opportunity in opportunities))
+        accepted = [decision for decision in decisions if decision is not None]
+        accepted.sort(key=lambda decision: decision['net_profit_usdt'], reverse=True)
+        return accepted
+
+    def _describe(self, opportunity: Dict) -> Dict:
+        """Ajoute les symboles des tokens pour l'affichage et le journal des trades"""
+        token0, token1 = opportunity['token0'], opportunity['token1']
+        token_store = self.scanner.token_store
+        return {
+            **opportunity,
+            'token0_symbol': token_store.get(token0)['symbol'],
+            'token1_symbol': token_store.get(token1)['symbol'],
+            'token_pair': (token0, token1)
+        }
+
+    def _on_execution(self, opportunity: Dict, result: Dict):
+        self.last_execution = {
+            'ts': time.time(),
+            'pair': f"{opportunity['token0_symbol']}/{opportunity['token1_symbol']}",
+            **result
+        }
+        if not result['success']:
+            print(f"Erreur lors de l'exécution de l'arbitrage: {result['error']}")
+        if self.publisher is not None:
+            self.publisher.notify()
+
+    def handle_command(self, command: Dict):
+        """
+        Commande d'un client du flux d'instantanés :
+        set_auto_execute (enabled), add_preferred_token / remove_preferred_token (token), et en mode
+        manuel execute (key, clé d'une opportunité du dernier instantané). Les tokens préférés filtrent
+        aussitôt les opportunités ; la découverte des paires ne les prend en compte qu'au prochain setup.
+        """
+        name = command.get('command')
+        if name == 'set_auto_execute':
+            enabled = bool(command['enabled'])
+            if enabled and self.executor is None:
+                print("Erreur lors du passage en mode automatique: PRIVATE_KEY non définie")
+                return
+            self.auto_execute = enabled
+        elif name in ('add_preferred_token', 'remove_preferred_token'):
+            token = command['token']
+            if not Web3.is_address(token):
+                print(f"Erreur lors de la mise à jour des tokens préférés: adresse invalide {token}")
+                return
+            if name == 'add_preferred_token':
+                self.stats.add_preferred_token(token)
+            else:
+                self.stats.remove_preferred_token(token)
+        elif name == 'execute':
+            self.execute_manually(tuple(command['key']))
+        else:
+            print(f"Erreur lors du traitement de la commande: commande inconnue {name}")
+
+    def execute_manually(self, key: Tuple[str, ...]):
+        """Confie au scheduler une opportunité du dernier bloc choisie par un client"""
+        if self.executor is None:
+            print("Erreur lors de l'exécution manuelle: PRIVATE_KEY non définie")
+            return
+        opportunity = next((opportunity for opportunity in self.opportunities if opportunity_key(opportunity) == key), None)
+        if opportunity is None:
+            print("Erreur lors de l'exécution manuelle: opportunité absente du dernier bloc")
+            return
+        self.scheduler.submit([opportunity], self.snapshot, self.block_number)
+
+    def mode(self) -> str:
+        """Automatique, manuel (exécution sur commande d'un client) ou observation sans clé privée"""
+        if self.auto_execute:
+            return 'automatique'
+        return 'manuel' if self.executor is not None else 'observation'
+
+    def state(self) -> Dict:
+        """État courant du moteur, construit à la demande par SnapshotPublisher"""
+        stats = self.stats.stats
+        return {
+            'ts': time.time(),
+            'block': self.block_number,
+            'auto_execute': self.auto_execute,
+            'mode': self.mode(),
+            'can_execute': self.executor is not None,
+            'preferred_tokens': sorted(self.stats.get_preferred_tokens()),
+            'venues': [venue.name for venue in self.venues],
+            'pairs': len(self.pairs),
+            'opportunities': [
+                {
+                    'key': opportunity_key(opportunity),
+                    'pair': f"{opportunity['token0_symbol']}/{opportunity['token1_symbol']}",
+                    'token0': opportunity['token0'],
+                    'token1': opportunity['token1'],
+                    'buy_venue': opportunity['buy_venue'],
+                    'sell_venue': opportunity['sell_venue'],
+                    'profit_percent': opportunity['profit_percent'],
+                    'volume_usdt': opportunity['volume_usdt'],
+                    'net_profit_usdt': opportunity['net_profit_usdt'],
+                    'gas_cost_usdt': opportunity['gas_cost_usdt']
+                }
+                for opportunity in self.opportunities[:SNAPSHOT_OPPORTUNITIES]
+            ],
+            'scheduled': len(self.scheduler),
+            'last_execution': self.last_execution,
+            'stats': {
+                'total_pnl': stats['total_pnl'],
+                'opportunities_found': stats['opportunities_found'],
+                'opportunities_taken': stats['opportunities_taken'],
+                'total_volume': stats['total_volume'],
+                'pnl_24h': self.stats.get_pnl_last(86400),
+                'trades': list(stats['trades'])
+            },
+            'metrics': self.metrics.snapshot()
+        }
+
+    async def run(self, poll_interval: float = 1.0):
+        """Traite chaque nouveau bloc jusqu'à l'annulation de la tâche"""
+        last_block = None
+        while True:
+            try:
+                block_number = await self.w3.eth.block_number
+                if block_number != last_block:
+                    await self.process_block(block_number)
+                    last_block = block_number
+            except Exception as e:
+                print(f"Erreur lors du traitement du bloc: {e}")
+            await asyncio.sleep(poll_interval)
+
+    async def close(self):
+        if self.sharded is not None:
+            self.sharded.stop()
+        await self.scheduler.close()
+        if self.executor is not None:
+            await self.executor.stop()
+        self.stats.journal.close()
+
+
+async def _serve(args):
+    client = Web3Client()
+    engine = ArbitrageEngine(client.w3, auto_execute=args.auto or AUTO_EXECUTE, workers=args.workers)
+    publisher = SnapshotPublisher(
+        engine.state, port=args.snapshot_port, max_rate=args.snapshot_rate, on_command=engine.handle_command
+    )
+    engine.publisher = publisher
+    metrics_server = MetricsServer(engine.metrics, port=args.metrics_port) if METRICS_ENABLED else None
+    try:
+        await publisher.start()
+        if metrics_server is not None:
+            await metrics_server.start()
+        await engine.setup(args.max_pairs, args.full_scan)
+        print(f"Moteur démarré : {len(engine.pairs)} paires sur {len(engine.venues)} DEX, "
+              f"mode {engine.mode()}, "
+              f"évaluation sur {engine.workers or 1} processus, "
+              f"instantanés sur le port {args.snapshot_port}")
+        await engine.run(args.poll_interval)
+    finally:
+        await engine.close()
+        await publisher.stop()
+        if metrics_server is not None:
+            await metrics_server.stop()
+        await client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Moteur d'arbitrage sans interface graphique")
+    parser.add_argument('--auto', action='store_true', help="Exécute la meilleure opportunité de chaque bloc (PRIVATE_KEY requise)")
+    parser.add_argument('--max-pairs', type=int, default=1000, help="Paires lues au plus par factory")
+    parser.add_argument('--workers', type=int, default=SHARD_WORKERS, help="Processus d'évaluation (0 : dans le processus du moteur)")
+    parser.add_argument('--full-scan', action='store_true', help="Parcourt allPairs même avec des tokens préférés")
+    parser.add_argument('--poll-interval', type=float, default=1.0, help="Intervalle de scrutation des blocs, en secondes")
+    parser.add_argument('--snapshot-port', type=int, default=SNAPSHOT_PORT)
+    parser.add_argument('--snapshot-rate', type=float, default=SNAPSHOT_RATE, help="Instantanés par seconde au plus")
+    parser.add_argument('--metrics-port', type=int, default=METRICS_PORT)
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        print("Moteur arrêté")
+
+
+if __name__ == '__main__':
+    main()
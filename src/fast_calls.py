@@ -0,0 +1,100 @@
+from typing import Dict, List, Optional, Tuple
+from functools import lru_cache
+from eth_utils import keccak, to_checksum_address
+
+# Sélecteurs précalculés des lectures fréquentes
+GET_RESERVES_SELECTOR = keccak(text='getReserves()')[:4]
+TOKEN0_SELECTOR = keccak(text='token0()')[:4]
+TOKEN1_SELECTOR = keccak(text='token1()')[:4]
+ALL_PAIRS_SELECTOR = keccak(text='allPairs(uint256)')[:4]
+ALL_PAIRS_LENGTH_SELECTOR = keccak(text='allPairsLength()')[:4]
+SYMBOL_SELECTOR = keccak(text='symbol()')[:4]
+DECIMALS_SELECTOR = keccak(text='decimals()')[:4]
+AGGREGATE3_SELECTOR = keccak(text='aggregate3((address,bool,bytes)[])')[:4]
+SWAP_EXACT_TOKENS_SELECTOR = keccak(text='swapExactTokensForTokens(uint256,uint256,address[],address,uint256)')[:4]
+
+WORD = 32
+
+
+def encode_uint(value: int) -> bytes:
+    return value.to_bytes(WORD, 'big')
+
+
+def encode_all_pairs(index: int) -> bytes:
+    """Calldata de allPairs(index)"""
+    return ALL_PAIRS_SELECTOR + encode_uint(index)
+
+
+def decode_uint(data: bytes) -> int:
+    return int.from_bytes(data[:WORD], 'big')
+
+
+@lru_cache(maxsize=65536)
+def _checksum(raw_address: bytes) -> str:
+    return to_checksum_address(raw_address)
+
+
+def decode_address(data: bytes) -> str:
+    """Décode une adresse ABI (12 octets de padding puis 20 octets)"""
+    return _checksum(bytes(data[12:WORD]))
+
+
+def decode_reserves(data: bytes) -> Tuple[int, int]:
+    """Décode (reserve0, reserve1) d'un retour getReserves()"""
+    return int.from_bytes(data[0:WORD], 'big'), int.from_bytes(data[WORD:2 * WORD], 'big')
+
+
+def encode_aggregate3(calls: List[Tuple[str, bytes]]) -> bytes:
+    """
+    Encode aggregate3((address,bool,bytes)[]) avec allowFailure à vrai pour chaque appel.
+    Chaque élément est un tuple dynamique : adresse, booléen, offset des données (0x60),
+    longueur puis données complétées à un multiple de 32 octets.
+    """
+    heads = []
+    tails = []
+    offset = WORD * len(calls)
+    for target, data in calls:
+        heads.append(encode_uint(offset))
+        padding = (-len(data)) % WORD
+        element = b''.join((
+            bytes(12) + bytes.fromhex(target[2:]),
+            encode_uint(1),
+            encode_uint(3 * WORD),
+            encode_uint(len(data)),
+            data,
+            bytes(padding)
+        ))
+        tails.append(element)
+        offset += len(element)
+    return b''.join([AGGREGATE3_SELECTOR, encode_uint(WORD), encode_uint(len(calls))] + heads + tails)
+
+
+def decode_aggregate3(raw: bytes) -> List[Optional[bytes]]:
+    """Décode le retour (bool,bytes)[] de aggregate3 : les données de chaque appel, ou None en cas d'échec"""
+    raw = bytes(raw)
+    array_start = decode_uint(raw[0:WORD]) + WORD
+    count = int.from_bytes(raw[array_start - WORD:array_start], 'big')
+    results: List[Optional[bytes]] = []
+    for i in range(count):
+        element = array_start + int.from_bytes(raw[array_start + i * WORD:array_start + (i + 1) * WORD], 'big')
+        success = raw[element + WORD - 1]
+        data_start = element + int.from_bytes(raw[element + WORD:element + 2 * WORD], 'big')
+        length = int.from_bytes(raw[data_start:data_start + WORD], 'big')
+        results.append(raw[data_start + WORD:data_start + WORD + length] if success else None)
+    return results
+
+
+class ContractCache:
+    """Objets contrat web3 construits une seule fois par adresse et par ABI"""
+
+    def __init__(self, w3):
+        self.w3 = w3
+        self.contracts: Dict[Tuple[str, int], object] = {}
+
+    def get(self, address: str, abi: List[Dict]):
+        key = (address, id(abi))
+        contract = self.contracts.get(key)
+        if contract is None:
+            contract = self.w3.eth.contract(address=address, abi=abi)
+            self.contracts[key] = contract
+        return contract
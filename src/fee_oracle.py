@@ -0,0 +1,97 @@
+from typing import Dict, Optional
+import asyncio
+from .config import WETH_USDT_PAIR
+from .fast_calls import GET_RESERVES_SELECTOR, decode_reserves
+from .metrics import METRICS, Metrics
+
+
+class BlockFeeOracle:
+    """
+    Frais EIP-1559 et prix ETH/USDT calculés une seule fois par bloc.
+    Tous les candidats d'un même bloc partagent la même valeur, invalidée au bloc suivant.
+    """
+
+    def __init__(
+        self,
+        w3,
+        reserve_source=None,
+        weth_usdt_pair: str = WETH_USDT_PAIR,
+        weth_is_token0: bool = True,
+        priority_percentile: int = 50,
+        metrics: Optional[Metrics] = None
+    ):
+        self.w3 = w3
+        # Toute source exposant block_number et get(adresse de paire) -> réserves, par exemple un
+        # ReserveCache ; elle n'est lue que si elle est au bloc demandé
+        self.reserve_source = reserve_source
+        self.weth_usdt_pair = weth_usdt_pair
+        self.weth_is_token0 = weth_is_token0
+        self.priority_percentile = priority_percentile
+        self.current_block: Optional[int] = None
+        self.block_number: Optional[int] = None
+        self.fees: Optional[Dict] = None
+        self.pending: Optional[asyncio.Task] = None
+        self.pending_block: Optional[int] = None
+        self.metrics = metrics or METRICS
+
+    def on_new_block(self, block_number: int):
+        """Signale un nouvel en-tête de bloc : la valeur en cache devient obsolète"""
+        self.current_block = block_number
+
+    async def get(self, block_number: Optional[int] = None) -> Dict:
+        """Retourne les frais du bloc, calculés au plus une fois même avec des appels concurrents"""
+        if block_number is None:
+            block_number = self.current_block
+        if block_number is None:
+            block_number = await self.w3.eth.block_number
+            self.current_block = block_number
+
+        if self.block_number == block_number and self.fees is not None:
+            return self.fees
+        if self.pending is None or self.pending_block != block_number or self.pending.done():
+            self.pending = asyncio.create_task(self._compute(block_number))
+            self.pending_block = block_number
+        return await asyncio.shield(self.pending)
+
+    async def _compute(self, block_number: int) -> Dict:
+        with self.metrics.timer('fees', block_number):
+            fee_history, eth_price = await asyncio.gather(
+                self.w3.eth.fee_history(1, block_number, [self.priority_percentile]),
+                self._get_eth_price(block_number)
+            )
+        # baseFeePerGas contient aussi la base fee du bloc suivant, celle que paiera la transaction
+        base_fee = fee_history['baseFeePerGas'][-1]
+        priority_fee = fee_history['reward'][0][0]
+        fees = {
+            'block_number': block_number,
+            'base_fee': base_fee,
+            'priority_fee': priority_fee,
+            'gas_price': base_fee + priority_fee,
+            'eth_price_usdt': eth_price
+        }
+        if self.block_number is None or block_number >= self.block_number:
+            self.block_number = block_number
+            self.fees = fees
+        return fees
+
+    async def _get_eth_price(self, block_number: int) -> float:
+        """
+        Prix de l'ETH en USDT à partir des réserves de la paire WETH/USDT au bloc donné : celles
+        de reserve_source si elle suit la paire et se trouve à ce bloc, sinon un getReserves
+        figé sur le bloc
+        """
+        reserves = None
+        source = self.reserve_source
+        if source is not None and source.block_number == block_number:
+            reserves = source.get(self.weth_usdt_pair)
+        if reserves is None:
+            data = await self.w3.eth.call(
+                {'to': self.weth_usdt_pair, 'data': GET_RESERVES_SELECTOR},
+                block_number
+            )
+            reserves = decode_reserves(data)
+
+        weth_reserve, usdt_reserve = reserves if self.weth_is_token0 else reserves[::-1]
+        if weth_reserve == 0:
+            return 0.0
+        return (usdt_reserve / 10**6) / (weth_reserve / 10**18)
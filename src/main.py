@@ -1,14 +1,199 @@
+"""
+Interface graphique, client facultatif du moteur sans interface.
+
+Le moteur se lance à part (python -m src.engine) ; la fenêtre se connecte à son flux
+d'instantanés et n'affiche que le dernier reçu, à fréquence bornée. Fermer ou ralentir
+l'interface n'a aucun effet sur la détection. Le mode automatique ou manuel, les tokens préférés
+et l'exécution manuelle d'une opportunité sont envoyés au moteur comme commandes sur la même
+connexion.
+
+    python -m src.engine &
+    python -m src.main
+"""
+import json
 import sys
-import asyncio
 from datetime import datetime
-from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
-    QPushButton, QLabel, QLineEdit, QTableWidget, QTableWidgetItem, 
-    QCheckBox, QGroupBox, QHBoxLayout, QMessageBox, QTabWidget)
-from PyQt6.QtCore import Qt, QTimer
-from PyQt6.QtGui import QFont, QColor
-from web3_client import Web3Client
-from dex_scanner import DexScanner
-from arbitrage_logic import ArbitrageLogic
-from stats_manager import StatsManager
-
-# Le reste du code reste identique...
\ No newline at end of file
+from typing import Dict, List, Optional
+from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QPushButton,
+    QLabel, QLineEdit, QTableWidget, QTableWidgetItem, QCheckBox, QGroupBox, QHBoxLayout)
+from PyQt6.QtCore import QTimer
+from PyQt6.QtGui import QFont
+from PyQt6.QtNetwork import QAbstractSocket, QTcpSocket
+from .config import SNAPSHOT_PORT, SNAPSHOT_RATE
+
+COLUMNS = ('Paire', 'Achat', 'Vente', 'Profit %', 'Volume USDT', 'Gas USDT', 'Profit net USDT')
+
+
+class MainWindow(QMainWindow):
+    def __init__(self, host: str = '127.0.0.1', port: int = SNAPSHOT_PORT):
+        super().__init__()
+        self.host = host
+        self.port = port
+        self.buffer = b''
+        # Dernier instantané reçu, pas encore affiché
+        self.pending: Optional[Dict] = None
+        # Clé de l'opportunité affichée à chaque ligne du tableau, pour l'exécution manuelle
+        self.row_keys: List[List[str]] = []
+
+        self.setWindowTitle("Bot d'Arbitrage DEX")
+        self.resize(1000, 600)
+        central = QWidget()
+        layout = QVBoxLayout(central)
+
+        status = QGroupBox("Moteur")
+        status_layout = QHBoxLayout(status)
+        self.connection_label = QLabel("Déconnecté")
+        self.block_label = QLabel("Bloc : -")
+        self.pairs_label = QLabel("Paires : -")
+        self.mode_label = QLabel("Mode : -")
+        for label in (self.connection_label, self.block_label, self.pairs_label, self.mode_label):
+            status_layout.addWidget(label)
+        layout.addWidget(status)
+
+        stats = QGroupBox("Statistiques")
+        stats_layout = QHBoxLayout(stats)
+        self.pnl_label = QLabel("PnL total : -")
+        self.pnl_24h_label = QLabel("PnL 24h : -")
+        self.found_label = QLabel("Opportunités : -")
+        self.taken_label = QLabel("Trades : -")
+        for label in (self.pnl_label, self.pnl_24h_label, self.found_label, self.taken_label):
+            label.setFont(QFont('Arial', 11))
+            stats_layout.addWidget(label)
+        layout.addWidget(stats)
+
+        settings = QGroupBox("Paramètres")
+        settings_layout = QHBoxLayout(settings)
+        self.auto_checkbox = QCheckBox("Mode automatique")
+        self.auto_checkbox.setEnabled(False)
+        self.auto_checkbox.toggled.connect(
+            lambda enabled: self._send({'command': 'set_auto_execute', 'enabled': enabled})
+        )
+        settings_layout.addWidget(self.auto_checkbox)
+        self.token_input = QLineEdit()
+        self.token_input.setPlaceholderText("Adresse du token (0x...)")
+        settings_layout.addWidget(self.token_input)
+        add_button = QPushButton("Ajouter aux préférés")
+        add_button.clicked.connect(lambda: self._send_token('add_preferred_token'))
+        remove_button = QPushButton("Retirer des préférés")
+        remove_button.clicked.connect(lambda: self._send_token('remove_preferred_token'))
+        settings_layout.addWidget(add_button)
+        settings_layout.addWidget(remove_button)
+        layout.addWidget(settings)
+        self.preferred_label = QLabel("Tokens préférés : aucun")
+        self.preferred_label.setWordWrap(True)
+        layout.addWidget(self.preferred_label)
+
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        layout.addWidget(self.table)
+        # Mode manuel : l'opportunité sélectionnée est confiée au scheduler du moteur
+        self.execute_button = QPushButton("Exécuter l'opportunité sélectionnée")
+        self.execute_button.setEnabled(False)
+        self.execute_button.clicked.connect(self._execute_selected)
+        layout.addWidget(self.execute_button)
+        self.execution_label = QLabel("Dernière exécution : -")
+        layout.addWidget(self.execution_label)
+        self.setCentralWidget(central)
+
+        self.socket = QTcpSocket(self)
+        self.socket.connected.connect(lambda: self.connection_label.setText("Connecté"))
+        self.socket.disconnected.connect(self._on_disconnected)
+        self.socket.readyRead.connect(self._on_ready_read)
+
+        # Rendu borné à SNAPSHOT_RATE images par seconde, quel que soit le débit reçu
+        self.render_timer = QTimer(self)
+        self.render_timer.timeout.connect(self._render)
+        self.render_timer.start(int(1000 / SNAPSHOT_RATE))
+        # Reconnexion tant que le moteur n'est pas joignable
+        self.reconnect_timer = QTimer(self)
+        self.reconnect_timer.timeout.connect(self._connect)
+        self.reconnect_timer.start(2000)
+        self._connect()
+
+    def _connect(self):
+        if self.socket.state() == QAbstractSocket.SocketState.UnconnectedState:
+            self.socket.connectToHost(self.host, self.port)
+
+    def _send(self, command: Dict):
+        if self.socket.state() == QAbstractSocket.SocketState.ConnectedState:
+            self.socket.write((json.dumps(command) + '\n').encode())
+
+    def _send_token(self, command: str):
+        token = self.token_input.text().strip()
+        if token:
+            self._send({'command': command, 'token': token})
+            self.token_input.clear()
+
+    def _execute_selected(self):
+        row = self.table.currentRow()
+        if 0 <= row < len(self.row_keys):
+            self._send({'command': 'execute', 'key': self.row_keys[row]})
+
+    def _on_disconnected(self):
+        self.connection_label.setText("Déconnecté")
+        self.buffer = b''
+
+    def _on_ready_read(self):
+        # Seule la dernière ligne complète compte : les instantanés intermédiaires sont ignorés
+        self.buffer += bytes(self.socket.readAll())
+        *lines, self.buffer = self.buffer.split(b'\n')
+        for line in reversed(lines):
+            if line:
+                try:
+                    self.pending = json.loads(line)
+                except ValueError as e:
+                    print(f"Erreur lors de la lecture de l'instantané: {e}")
+                    continue
+                break
+
+    def _render(self):
+        state, self.pending = self.pending, None
+        if state is None:
+            return
+        self.block_label.setText(f"Bloc : {state['block']}")
+        self.pairs_label.setText(f"Paires : {state['pairs']} sur {', '.join(state['venues'])}")
+        self.mode_label.setText(f"Mode : {state['mode']}")
+        # Mise à jour sans renvoyer de commande au moteur
+        self.auto_checkbox.blockSignals(True)
+        self.auto_checkbox.setChecked(state['auto_execute'])
+        self.auto_checkbox.setEnabled(state['can_execute'])
+        self.auto_checkbox.blockSignals(False)
+        self.execute_button.setEnabled(state['can_execute'] and not state['auto_execute'])
+        preferred = state['preferred_tokens']
+        self.preferred_label.setText(f"Tokens préférés : {', '.join(preferred) if preferred else 'aucun'}")
+
+        stats = state['stats']
+        self.pnl_label.setText(f"PnL total : {stats['total_pnl']:.2f} USDT")
+        self.pnl_24h_label.setText(f"PnL 24h : {stats['pnl_24h']['pnl_usdt']:.2f} USDT")
+        self.found_label.setText(f"Opportunités : {stats['opportunities_found']}")
+        self.taken_label.setText(f"Trades : {stats['opportunities_taken']}")
+
+        opportunities = state['opportunities']
+        self.row_keys = [opportunity['key'] for opportunity in opportunities]
+        self.table.setRowCount(len(opportunities))
+        for row, opportunity in enumerate(opportunities):
+            values = (
+                opportunity['pair'], opportunity['buy_venue'], opportunity['sell_venue'],
+                f"{opportunity['profit_percent']:.2f}", f"{opportunity['volume_usdt']:,.0f}",
+                f"{opportunity['gas_cost_usdt']:.2f}", f"{opportunity['net_profit_usdt']:.2f}"
+            )
+            for column, value in enumerate(values):
+                self.table.setItem(row, column, QTableWidgetItem(value))
+
+        execution = state.get('last_execution')
+        if execution:
+            when = datetime.fromtimestamp(execution['ts']).strftime('%H:%M:%S')
+            outcome = execution.get('trade_result', {}).get('tx_hash') if execution['success'] else execution['error']
+            self.execution_label.setText(f"Dernière exécution : {when} {execution['pair']} ({outcome})")
+
+
+def main():
+    app = QApplication(sys.argv)
+    window = MainWindow()
+    window.show()
+    sys.exit(app.exec())
+
+
+if __name__ == '__main__':
+    main()
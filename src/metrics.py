@@ -0,0 +1,244 @@
+from typing import Dict, List, Optional, Tuple
+from bisect import bisect_left
+from collections import deque
+import time
+from aiohttp import web
+from .config import METRICS_ENABLED
+
+# Bornes des histogrammes de latence, en secondes
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Familles de métriques : nom -> (label, description)
+COUNTERS = {
+    'rpc_requests_total': ('method', "Requêtes JSON-RPC envoyées"),
+    'rpc_request_bytes_total': ('method', "Octets de requêtes JSON-RPC envoyés"),
+    'rpc_response_bytes_total': ('method', "Octets de réponses JSON-RPC reçus"),
+    'rpc_errors_total': ('method', "Requêtes JSON-RPC en échec (réseau ou limite de débit)"),
+    'gas_estimates_total': ('result', "Estimations de gas : hit (cache), miss (sur le chemin critique), refresh (tâche de fond)"),
+    'scheduler_events_total': ('event', "Ordonnanceur : queued, deduplicated, stale, executed"),
+    'opportunities_total': ('stage', "Entonnoir des opportunités : screened, found, analyzed, valid, submitted, mined"),
+}
+GAUGES = {
+    'queue_depth': ('queue', "Profondeur des files d'attente"),
+    'last_block': ('source', "Dernier bloc traité"),
+}
+HISTOGRAMS = {
+    'stage_seconds': ('stage', "Durée des étapes du traitement d'un bloc"),
+    'rpc_seconds': ('method', "Latence des requêtes JSON-RPC"),
+}
+
+FUNNEL_STAGES = ('screened', 'found', 'analyzed', 'valid', 'submitted', 'mined')
+
+
+class Histogram:
+    """Histogramme à bornes fixes au format Prometheus (comptes non cumulés en interne)"""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimation d'un quantile par la borne supérieure du bucket qui le contient"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return self.buckets[i] if i < len(self.buckets) else float('inf')
+        return float('inf')
+
+
+class _Timer:
+    __slots__ = ('metrics', 'stage', 'block_number', 'start')
+
+    def __init__(self, metrics: 'Metrics', stage: str, block_number: Optional[int]):
+        self.metrics = metrics
+        self.stage = stage
+        self.block_number = block_number
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe_stage(self.stage, time.perf_counter() - self.start, self.block_number)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    """
+    Instrumentation du chemin critique : durées par étape et par bloc, requêtes RPC
+    par méthode, profondeur des files et entonnoir des opportunités. Chaque mesure coûte
+    un accès dictionnaire ; désactivée, elle se réduit à un test de booléen.
+    """
+
+    def __init__(self, enabled: bool = True, recent_blocks: int = 32):
+        self.enabled = enabled
+        self.counters: Dict[str, Dict[str, float]] = {name: {} for name in COUNTERS}
+        self.gauges: Dict[str, Dict[str, float]] = {name: {} for name in GAUGES}
+        self.histograms: Dict[str, Dict[str, Histogram]] = {name: {} for name in HISTOGRAMS}
+        # Durées par étape des derniers blocs : (numéro de bloc, {étape: secondes})
+        self.blocks: deque = deque(maxlen=recent_blocks)
+        self.started_at = time.time()
+
+    def inc(self, name: str, label: str, amount: float = 1):
+        if not self.enabled:
+            return
+        family = self.counters[name]
+        family[label] = family.get(label, 0) + amount
+
+    def set_gauge(self, name: str, label: str, value: float):
+        if self.enabled:
+            self.gauges[name][label] = value
+
+    def observe(self, name: str, label: str, value: float):
+        if not self.enabled:
+            return
+        family = self.histograms[name]
+        histogram = family.get(label)
+        if histogram is None:
+            histogram = family[label] = Histogram()
+        histogram.observe(value)
+
+    def observe_stage(self, stage: str, seconds: float, block_number: Optional[int] = None):
+        """Enregistre la durée d'une étape, rattachée à son bloc si connu"""
+        if not self.enabled:
+            return
+        self.observe('stage_seconds', stage, seconds)
+        if block_number is not None:
+            if not self.blocks or self.blocks[-1][0] != block_number:
+                self.blocks.append((block_number, {}))
+                self.gauges['last_block']['processed'] = block_number
+            durations = self.blocks[-1][1]
+            durations[stage] = durations.get(stage, 0.0) + seconds
+
+    def timer(self, stage: str, block_number: Optional[int] = None):
+        """Chronomètre une étape : with metrics.timer('reserves', block_number): ..."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, stage, block_number)
+
+    def record_rpc(self, method: str, request_bytes: int, response_bytes: int, seconds: float):
+        if not self.enabled:
+            return
+        self.inc('rpc_requests_total', method)
+        self.inc('rpc_request_bytes_total', method, request_bytes)
+        self.inc('rpc_response_bytes_total', method, response_bytes)
+        self.observe('rpc_seconds', method, seconds)
+
+    def funnel(self, stage: str, amount: int = 1):
+        """Fait avancer des opportunités dans l'entonnoir (voir FUNNEL_STAGES)"""
+        self.inc('opportunities_total', stage, amount)
+
+    def snapshot(self) -> Dict:
+        """Vue compacte pour l'interface : totaux, p50/p99 par étape et derniers blocs"""
+        return {
+            'uptime': time.time() - self.started_at,
+            'funnel': {stage: self.counters['opportunities_total'].get(stage, 0) for stage in FUNNEL_STAGES},
+            'stages': {
+                stage: {
+                    'count': histogram.count,
+                    'mean_ms': histogram.sum / histogram.count * 1000 if histogram.count else 0.0,
+                    'p50_ms': histogram.quantile(0.5) * 1000,
+                    'p99_ms': histogram.quantile(0.99) * 1000
+                }
+                for stage, histogram in self.histograms['stage_seconds'].items()
+            },
+            'rpc': {
+                method: {
+                    'requests': count,
+                    'bytes_out': self.counters['rpc_request_bytes_total'].get(method, 0),
+                    'bytes_in': self.counters['rpc_response_bytes_total'].get(method, 0),
+                    'errors': self.counters['rpc_errors_total'].get(method, 0)
+                }
+                for method, count in self.counters['rpc_requests_total'].items()
+            },
+            'queues': dict(self.gauges['queue_depth']),
+            'blocks': [
+                {'block': block_number, **{stage: seconds * 1000 for stage, seconds in durations.items()}}
+                for block_number, durations in self.blocks
+            ]
+        }
+
+    def render_prometheus(self, prefix: str = 'arb_') -> str:
+        """Export au format texte Prometheus"""
+        lines: List[str] = []
+        for name, (label, description) in COUNTERS.items():
+            lines.append(f"# HELP {prefix}{name} {description}")
+            lines.append(f"# TYPE {prefix}{name} counter")
+            for value, total in sorted(self.counters[name].items()):
+                lines.append(f'{prefix}{name}{{{label}="{value}"}} {total}')
+        for name, (label, description) in GAUGES.items():
+            lines.append(f"# HELP {prefix}{name} {description}")
+            lines.append(f"# TYPE {prefix}{name} gauge")
+            for value, current in sorted(self.gauges[name].items()):
+                lines.append(f'{prefix}{name}{{{label}="{value}"}} {current}')
+        for name, (label, description) in HISTOGRAMS.items():
+            lines.append(f"# HELP {prefix}{name} {description}")
+            lines.append(f"# TYPE {prefix}{name} histogram")
+            for value, histogram in sorted(self.histograms[name].items()):
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{prefix}{name}_bucket{{{label}="{value}",le="{bound}"}} {cumulative}')
+                lines.append(f'{prefix}{name}_bucket{{{label}="{value}",le="+Inf"}} {histogram.count}')
+                lines.append(f'{prefix}{name}_sum{{{label}="{value}"}} {histogram.sum}')
+                lines.append(f'{prefix}{name}_count{{{label}="{value}"}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+
+# Instance partagée par défaut par tous les composants
+METRICS = Metrics(enabled=METRICS_ENABLED)
+
+
+class MetricsServer:
+    """Expose /metrics (Prometheus) et /snapshot (JSON) sur un port local"""
+
+    def __init__(self, metrics: Metrics = METRICS, host: str = '127.0.0.1', port: int = 9108):
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self.runner: Optional[web.AppRunner] = None
+
+    async def _prometheus(self, request: web.Request) -> web.Response:
+        return web.Response(text=self.metrics.render_prometheus(), content_type='text/plain', charset='utf-8')
+
+    async def _snapshot(self, request: web.Request) -> web.Response:
+        return web.json_response(self.metrics.snapshot())
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get('/metrics', self._prometheus)
+        app.router.add_get('/snapshot', self._snapshot)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, self.host, self.port).start()
+
+    async def stop(self):
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
@@ -0,0 +1,38 @@
+from typing import List, Optional, Tuple
+import asyncio
+from .config import MULTICALL3_ADDRESS
+from .fast_calls import decode_aggregate3, encode_aggregate3
+
+
+class Multicall:
+    """Regroupe des appels eth_call en requêtes Multicall3 aggregate3"""
+
+    def __init__(self, w3, address: str = MULTICALL3_ADDRESS, chunk_size: int = 500, concurrency: int = 4):
+        self.w3 = w3
+        self.address = address
+        self.chunk_size = chunk_size
+        self.semaphore = asyncio.Semaphore(concurrency)
+
+    def encode_aggregate3(self, calls: List[Tuple[str, bytes]]) -> bytes:
+        """Encode un lot d'appels (cible, calldata) pour aggregate3"""
+        return encode_aggregate3(calls)
+
+    async def _aggregate_chunk(self, calls: List[Tuple[str, bytes]], block_identifier) -> List[Optional[bytes]]:
+        """Exécute un lot d'appels en un seul eth_call"""
+        async with self.semaphore:
+            raw = await self.w3.eth.call(
+                {'to': self.address, 'data': self.encode_aggregate3(calls)},
+                block_identifier
+            )
+        return decode_aggregate3(raw)
+
+    async def aggregate(self, calls: List[Tuple[str, bytes]], block_identifier='latest') -> List[Optional[bytes]]:
+        """
+        Exécute tous les appels par lots de chunk_size, au plus concurrency lots en parallèle.
+        Retourne les données brutes de chaque appel, ou None en cas d'échec.
+        """
+        chunks = [calls[i:i + self.chunk_size] for i in range(0, len(calls), self.chunk_size)]
+        chunk_results = await asyncio.gather(
+            *(self._aggregate_chunk(chunk, block_identifier) for chunk in chunks)
+        )
+        return [result for chunk in chunk_results for result in chunk]
@@ -0,0 +1,50 @@
+from typing import Dict, List, Tuple
+import json
+import os
+
+
+class PairRegistry:
+    """Registre persistant des paires découvertes par factory (index allPairs -> paire, token0, token1)"""
+
+    def __init__(self, path: str = 'pair_registry.json'):
+        self.path = path
+        self.factories: Dict[str, Dict] = {}
+        self.load()
+
+    def load(self):
+        """Charge le registre depuis le fichier"""
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r') as f:
+                    self.factories = json.load(f)
+        except Exception as e:
+            print(f"Erreur lors du chargement du registre de paires: {e}")
+            self.factories = {}
+
+    def save(self):
+        """Sauvegarde le registre de manière atomique (fichier temporaire puis remplacement)"""
+        try:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self.factories, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Erreur lors de la sauvegarde du registre de paires: {e}")
+
+    def _entry(self, factory_address: str) -> Dict:
+        return self.factories.setdefault(factory_address.lower(), {'pairs': []})
+
+    def known_count(self, factory_address: str) -> int:
+        """Nombre de paires déjà connues (indices contigus depuis 0)"""
+        return len(self._entry(factory_address)['pairs'])
+
+    def get_pairs(self, factory_address: str, limit: int = None) -> List[Tuple[str, str, str]]:
+        """Retourne les paires connues (adresse, token0, token1) dans l'ordre de allPairs"""
+        pairs = self._entry(factory_address)['pairs']
+        if limit is not None:
+            pairs = pairs[:limit]
+        return [tuple(pair) for pair in pairs]
+
+    def extend(self, factory_address: str, new_pairs: List[Tuple[str, str, str]]):
+        """Ajoute les paires suivant les indices déjà connus"""
+        self._entry(factory_address)['pairs'].extend(list(pair) for pair in new_pairs)
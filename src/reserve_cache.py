@@ -0,0 +1,169 @@
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from collections import deque
+from contextlib import nullcontext
+import asyncio
+from eth_utils import keccak
+from .metrics import METRICS, Metrics
+
+# Sync(uint112 reserve0, uint112 reserve1), émis par chaque paire UniswapV2 à chaque mise à jour
+SYNC_TOPIC = '0x' + keccak(text='Sync(uint112,uint112)').hex()
+
+
+class ReserveCache:
+    """
+    Réserves en mémoire de toutes les paires suivies, initialisées une fois puis
+    mises à jour bloc par bloc à partir des événements Sync.
+    Un checkpoint par bloc (hash + réserves précédentes des paires modifiées) permet
+    d'annuler les blocs orphelins lors d'une réorganisation. Au-delà de max_reorg_retries
+    réorganisations dans un même appel à sync_to (endpoints en désaccord sur la chaîne),
+    le cache demande une réinitialisation au lieu de boucler.
+    """
+
+    def __init__(
+        self,
+        w3,
+        max_checkpoints: int = 64,
+        address_chunk_size: int = 1000,
+        max_reorg_retries: int = 8,
+        metrics: Optional[Metrics] = None
+    ):
+        self.w3 = w3
+        self.address_chunk_size = address_chunk_size
+        self.max_reorg_retries = max_reorg_retries
+        self.reserves: Dict[str, Tuple[int, int]] = {}
+        self.block_number: Optional[int] = None
+        self.block_hash: Optional[bytes] = None
+        self.checkpoints = deque(maxlen=max_checkpoints)
+        self.needs_reseed = False
+        self.metrics = metrics or METRICS
+
+    def seed(self, reserves: Dict[str, Tuple[int, int]], block_number: int, block_hash: bytes):
+        """Initialise le cache avec des réserves lues au bloc donné (adresse de paire -> réserves)"""
+        self.reserves = {address.lower(): tuple(values) for address, values in reserves.items()}
+        self.block_number = block_number
+        self.block_hash = bytes(block_hash)
+        self.checkpoints.clear()
+        self.needs_reseed = False
+
+    def seed_from_snapshot(self, snapshot, pair_addresses: List[Dict], block_hash: bytes):
+        """
+        Initialise le cache à partir d'un ReserveSnapshot de DexScanner.get_reserves_batch,
+        pair_addresses étant DexScanner.pair_addresses (une table paire -> adresse par DEX)
+        """
+        reserves = {}
+        for i, pair in enumerate(snapshot.pairs):
+            for venue, addresses in enumerate(pair_addresses):
+                pair_address = addresses.get(pair)
+                if pair_address is not None:
+                    reserves[pair_address] = snapshot.reserves_of(i, venue)
+        self.seed(reserves, snapshot.block_number, block_hash)
+
+    def get(self, pair_address: str) -> Optional[Tuple[int, int]]:
+        """Retourne les réserves connues d'une paire"""
+        return self.reserves.get(pair_address.lower())
+
+    def tracked_addresses(self) -> List[str]:
+        return list(self.reserves)
+
+    def apply_logs(self, block_number: int, block_hash: bytes, logs: Iterable[Dict]) -> Set[str]:
+        """
+        Applique les événements Sync d'un bloc et enregistre son checkpoint.
+        Peut aussi être appelé directement avec des logs reçus par abonnement websocket.
+        Retourne les adresses des paires modifiées.
+        """
+        previous: Dict[str, Tuple[int, int]] = {}
+        for log in sorted(logs, key=lambda log: log['logIndex']):
+            address = log['address'].lower()
+            if address not in self.reserves:
+                continue
+            data = bytes(log['data'])
+            if address not in previous:
+                previous[address] = self.reserves[address]
+            self.reserves[address] = (
+                int.from_bytes(data[0:32], 'big'),
+                int.from_bytes(data[32:64], 'big')
+            )
+
+        self.checkpoints.append((self.block_number, self.block_hash, previous))
+        self.block_number = block_number
+        self.block_hash = bytes(block_hash)
+        return set(previous)
+
+    def rollback_last(self) -> Set[str]:
+        """Annule le dernier bloc appliqué et retourne les paires restaurées"""
+        block_number, block_hash, previous = self.checkpoints.pop()
+        self.reserves.update(previous)
+        self.block_number = block_number
+        self.block_hash = block_hash
+        return set(previous)
+
+    async def _get_sync_logs(self, block_hash: bytes) -> List[Dict]:
+        """Récupère les événements Sync d'un bloc, filtrés sur les paires suivies"""
+        addresses = self.tracked_addresses()
+        chunks = [
+            addresses[i:i + self.address_chunk_size]
+            for i in range(0, len(addresses), self.address_chunk_size)
+        ]
+        results = await asyncio.gather(*(
+            self.w3.eth.get_logs({
+                'blockHash': block_hash,
+                'address': [self.w3.to_checksum_address(address) for address in chunk],
+                'topics': [SYNC_TOPIC]
+            })
+            for chunk in chunks
+        ))
+        return [log for logs in results for log in logs]
+
+    async def _handle_reorg(self) -> Set[str]:
+        """Revient au dernier checkpoint encore présent sur la chaîne canonique"""
+        changed = set()
+        while self.checkpoints:
+            canonical = await self.w3.eth.get_block(self.block_number)
+            if bytes(canonical['hash']) == self.block_hash:
+                return changed
+            changed |= self.rollback_last()
+
+        canonical = await self.w3.eth.get_block(self.block_number)
+        if bytes(canonical['hash']) != self.block_hash:
+            print(f"Réorganisation plus profonde que les checkpoints disponibles (bloc {self.block_number})")
+            self.needs_reseed = True
+        return changed
+
+    def _same_endpoint(self):
+        """Lectures d'un même bloc servies par un seul endpoint quand le provider le permet"""
+        pinned = getattr(self.w3.provider, 'pinned', None)
+        return pinned() if pinned is not None else nullcontext()
+
+    async def sync_to(self, block_number: int) -> Set[str]:
+        """
+        Met à jour le cache jusqu'au bloc donné, en gérant les réorganisations.
+        Retourne les adresses des paires modifiées depuis le dernier appel.
+        """
+        changed = set()
+        reorgs = 0
+        with self.metrics.timer('sync', block_number):
+            while not self.needs_reseed and self.block_number < block_number:
+                # En-tête, vérification de la chaîne et journaux du bloc lus sur le même endpoint
+                with self._same_endpoint():
+                    block = await self.w3.eth.get_block(self.block_number + 1)
+                    if bytes(block['parentHash']) != self.block_hash:
+                        reorgs += 1
+                        if reorgs > self.max_reorg_retries:
+                            print(f"Chaîne instable après {self.max_reorg_retries} réorganisations (bloc {self.block_number})")
+                            self.needs_reseed = True
+                            break
+                        changed |= await self._handle_reorg()
+                        continue
+
+                    logs = await self._get_sync_logs(block['hash'])
+                changed |= self.apply_logs(block['number'], block['hash'], logs)
+        return changed
+
+    async def run(self, on_block, poll_interval: float = 1.0):
+        """Suit les nouveaux blocs et appelle on_block(numéro, paires modifiées) pour chacun"""
+        while not self.needs_reseed:
+            latest = await self.w3.eth.block_number
+            if latest > self.block_number:
+                changed = await self.sync_to(latest)
+                await on_block(self.block_number, changed)
+            await asyncio.sleep(poll_interval)
@@ -0,0 +1,61 @@
+from typing import Dict, List, Tuple
+import numpy as np
+
+
+class ReserveSnapshot:
+    """
+    Réserves d'un ensemble de paires sur chaque DEX suivi, toutes lues au même bloc.
+    Les réserves sont stockées à plat (reserve0, reserve1, reserve0, ...) dans une liste
+    d'entiers : la paire i sur le DEX v occupe les positions 2*(i*V+v) et 2*(i*V+v)+1.
+    """
+
+    __slots__ = ('block_number', 'pairs', 'index', 'n_venues', 'reserves')
+
+    def __init__(self, block_number: int, pairs: List[Tuple[str, str]], n_venues: int = 2):
+        self.block_number = block_number
+        self.pairs = list(pairs)
+        self.index: Dict[Tuple[str, str], int] = {pair: i for i, pair in enumerate(self.pairs)}
+        self.n_venues = n_venues
+        # Les paires absentes d'un DEX ou sans réserves lisibles restent à (0, 0)
+        self.reserves: List[int] = [0] * (2 * n_venues * len(self.pairs))
+
+    def __len__(self) -> int:
+        return len(self.pairs)
+
+    def copy(self, block_number: int) -> 'ReserveSnapshot':
+        """Copie des réserves rattachée à un autre bloc, avant d'y appliquer ses mises à jour"""
+        snapshot = ReserveSnapshot.__new__(ReserveSnapshot)
+        snapshot.block_number = block_number
+        # Paires et index ne changent pas d'un bloc à l'autre : ils sont partagés
+        snapshot.pairs = self.pairs
+        snapshot.index = self.index
+        snapshot.n_venues = self.n_venues
+        snapshot.reserves = list(self.reserves)
+        return snapshot
+
+    def set_reserves(self, i: int, venue: int, reserve0: int, reserve1: int):
+        position = 2 * (i * self.n_venues + venue)
+        self.reserves[position] = reserve0
+        self.reserves[position + 1] = reserve1
+
+    def reserves_of(self, i: int, venue: int) -> Tuple[int, int]:
+        position = 2 * (i * self.n_venues + venue)
+        return self.reserves[position], self.reserves[position + 1]
+
+    def venue_reserves(self, i: int) -> List[Tuple[int, int]]:
+        """Réserves de la paire i sur chaque DEX, dans l'ordre des DEX"""
+        start = 2 * i * self.n_venues
+        flat = self.reserves[start:start + 2 * self.n_venues]
+        return list(zip(flat[0::2], flat[1::2]))
+
+    def is_complete(self, i: int) -> bool:
+        """Vérifie qu'au moins deux DEX ont des réserves non nulles pour la paire i"""
+        return sum(reserve0 > 0 and reserve1 > 0 for reserve0, reserve1 in self.venue_reserves(i)) >= 2
+
+    def get(self, pair: Tuple[str, str]) -> List[Tuple[int, int]]:
+        """Retourne les réserves d'une paire sur chaque DEX"""
+        return self.venue_reserves(self.index[pair])
+
+    def as_array(self) -> np.ndarray:
+        """Retourne les réserves sous forme d'un tableau float64 (N, V, 2)"""
+        return np.array(self.reserves, dtype=np.float64).reshape(-1, self.n_venues, 2)
@@ -0,0 +1,193 @@
+from typing import Any, Dict, List, Optional, Tuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+import asyncio
+import json
+import time
+import aiohttp
+from web3._utils.encoding import Web3JsonEncoder
+from web3.providers.async_base import AsyncJSONBaseProvider
+from .metrics import METRICS, Metrics
+
+# Lectures pouvant être partagées entre appelants identiques en vol
+COALESCABLE_METHODS = {
+    'eth_blockNumber', 'eth_call', 'eth_chainId', 'eth_estimateGas', 'eth_feeHistory',
+    'eth_gasPrice', 'eth_getBalance', 'eth_getBlockByHash', 'eth_getBlockByNumber',
+    'eth_getCode', 'eth_getLogs', 'eth_getTransactionCount', 'eth_getTransactionReceipt',
+    'eth_maxPriorityFeePerGas', 'net_version', 'web3_clientVersion'
+}
+
+# Codes JSON-RPC signalant une limite de débit du fournisseur : on bascule sur un autre endpoint
+RATE_LIMIT_ERROR_CODES = {-32005, 429}
+
+# Endpoint retenu pour les requêtes du contexte courant (voir PooledAsyncProvider.pinned)
+_PINNED_ENDPOINT: ContextVar[Optional[List]] = ContextVar('pinned_endpoint', default=None)
+
+
+class RateLimiter:
+    """Seau à jetons : au plus rate requêtes par seconde, avec des rafales de burst requêtes"""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class RpcEndpoint:
+    """Endpoint JSON-RPC avec sa latence moyenne (EWMA), sa limite de débit et son état de santé"""
+
+    def __init__(self, url: str, requests_per_second: float, smoothing: float = 0.2):
+        self.url = url
+        self.limiter = RateLimiter(requests_per_second)
+        self.smoothing = smoothing
+        self.latency: Optional[float] = None
+        self.failures = 0
+        self.down_until = 0.0
+
+    def record_success(self, latency: float):
+        self.failures = 0
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += self.smoothing * (latency - self.latency)
+
+    def record_failure(self, cooldown: float):
+        self.failures += 1
+        # Mise à l'écart exponentielle, plafonnée à 8 fois le délai de base
+        self.down_until = time.monotonic() + cooldown * min(2 ** (self.failures - 1), 8)
+
+    def is_available(self) -> bool:
+        return time.monotonic() >= self.down_until
+
+
+class PooledAsyncProvider(AsyncJSONBaseProvider):
+    """
+    Provider web3 asynchrone multi-endpoints : session HTTP keep-alive partagée, routage
+    vers l'endpoint le plus rapide, bascule automatique en cas d'échec, limite de débit
+    par endpoint et mutualisation des lectures identiques en vol.
+    """
+
+    def __init__(
+        self,
+        endpoint_urls: List[str],
+        requests_per_second: float = 25.0,
+        max_connections: int = 32,
+        timeout: float = 10.0,
+        failure_cooldown: float = 5.0,
+        metrics: Optional[Metrics] = None
+    ):
+        super().__init__()
+        self.endpoints = [RpcEndpoint(url, requests_per_second) for url in endpoint_urls]
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.failure_cooldown = failure_cooldown
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.in_flight: Dict[Tuple[str, str], asyncio.Task] = {}
+        self.coalesced = 0
+        self.metrics = metrics or METRICS
+
+    def __str__(self) -> str:
+        return f"Pooled RPC connection {[endpoint.url for endpoint in self.endpoints]}"
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={'Content-Type': 'application/json'}
+            )
+        return self.session
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    @contextmanager
+    def pinned(self):
+        """
+        Dans ce bloc, les requêtes de la tâche courante (et des tâches qu'elle lance) vont toutes
+        au premier endpoint qui répond, sans bascule ni mutualisation : des lectures liées, comme
+        un en-tête de bloc puis ses journaux, viennent ainsi d'un même nœud. Une panne de cet
+        endpoint est remontée à l'appelant, qui recommence l'ensemble des lectures.
+        """
+        token = _PINNED_ENDPOINT.set([None])
+        try:
+            yield
+        finally:
+            _PINNED_ENDPOINT.reset(token)
+
+    def ranked_endpoints(self) -> List[RpcEndpoint]:
+        """Endpoints disponibles du plus rapide au plus lent, puis ceux mis à l'écart"""
+        available = [endpoint for endpoint in self.endpoints if endpoint.is_available()]
+        # Un endpoint jamais mesuré passe en premier pour obtenir une première latence
+        available.sort(key=lambda endpoint: -1.0 if endpoint.latency is None else endpoint.latency)
+        down = sorted(
+            (endpoint for endpoint in self.endpoints if not endpoint.is_available()),
+            key=lambda endpoint: endpoint.down_until
+        )
+        return available + down
+
+    async def _send(self, endpoint: RpcEndpoint, method: str, request_data: bytes) -> Dict:
+        await endpoint.limiter.acquire()
+        start = time.perf_counter()
+        async with self._get_session().post(endpoint.url, data=request_data) as response:
+            response.raise_for_status()
+            raw_response = await response.read()
+        latency = time.perf_counter() - start
+        endpoint.record_success(latency)
+        self.metrics.record_rpc(method, len(request_data), len(raw_response), latency)
+        return self.decode_rpc_response(raw_response)
+
+    async def _request(self, method: str, params: Any) -> Dict:
+        request_data = self.encode_rpc_request(method, params)
+        last_error: Optional[Exception] = None
+        pinned = _PINNED_ENDPOINT.get()
+        endpoints = self.ranked_endpoints() if pinned is None or pinned[0] is None else [pinned[0]]
+        for endpoint in endpoints:
+            try:
+                response = await self._send(endpoint, method, request_data)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                endpoint.record_failure(self.failure_cooldown)
+                self.metrics.inc('rpc_errors_total', method)
+                last_error = e
+                continue
+            error = response.get('error')
+            if isinstance(error, dict) and error.get('code') in RATE_LIMIT_ERROR_CODES:
+                endpoint.record_failure(self.failure_cooldown)
+                self.metrics.inc('rpc_errors_total', method)
+                last_error = ConnectionError(f"{endpoint.url}: {error.get('message')}")
+                continue
+            if pinned is not None:
+                pinned[0] = endpoint
+            return response
+        raise last_error or ConnectionError("Aucun endpoint RPC configuré")
+
+    async def make_request(self, method: str, params: Any) -> Dict:
+        if method not in COALESCABLE_METHODS or _PINNED_ENDPOINT.get() is not None:
+            return await self._request(method, params)
+
+        key = (method, json.dumps(params, cls=Web3JsonEncoder, sort_keys=True))
+        task = self.in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._request(method, params))
+            self.in_flight[key] = task
+            task.add_done_callback(lambda _: self.in_flight.pop(key, None))
+            self.metrics.set_gauge('queue_depth', 'rpc_in_flight', len(self.in_flight))
+        else:
+            self.coalesced += 1
+        # shield : l'annulation d'un appelant n'annule pas la requête partagée
+        return await asyncio.shield(task)
@@ -0,0 +1,161 @@
+"""
+Ordonnancement des exécutions d'arbitrage.
+
+Les opportunités retenues attendent dans un tas trié par profit net. Une seule entrée est
+gardée par paire et par sens (par cycle pour les arbitrages multi-sauts), les entrées trop
+anciennes sont écartées, deux exécutions ne touchent jamais le même pool en même temps et le
+nombre d'exécutions en vol est borné.
+"""
+from typing import Callable, Dict, List, Optional, Set, Tuple
+import asyncio
+import heapq
+from .metrics import METRICS, Metrics
+
+# Paire et sens d'un arbitrage : (token0, token1, DEX d'achat, DEX de vente) ;
+# pour un cycle de TokenGraph, ('cycle', pool, pool, ...)
+OpportunityKey = Tuple[str, ...]
+# Pool touché par une exécution : (DEX, token0, token1)
+Pool = Tuple[str, str, str]
+
+
+def opportunity_key(opportunity: Dict) -> OpportunityKey:
+    if 'hops' in opportunity:
+        return ('cycle', *opportunity['pools'])
+    return (opportunity['token0'], opportunity['token1'], opportunity['buy_venue'], opportunity['sell_venue'])
+
+
+def opportunity_pools(opportunity: Dict) -> Tuple[Pool, ...]:
+    if 'hops' in opportunity:
+        # Saut d'un cycle : (DEX, token0, token1, sens)
+        return tuple((venue, token0, token1) for venue, token0, token1, _ in opportunity['hops'])
+    token0, token1 = opportunity['token0'], opportunity['token1']
+    return (opportunity['buy_venue'], token0, token1), (opportunity['sell_venue'], token0, token1)
+
+
+class OpportunityScheduler:
+    """
+    File de priorité devant TradingLogic.execute_opportunity.
+
+        scheduler = OpportunityScheduler(trading, max_in_flight=2, max_age_blocks=2)
+        scheduler.submit(accepted, snapshot, block_number)   # à chaque bloc, sans attendre les exécutions
+    """
+
+    def __init__(
+        self,
+        trading_logic,
+        max_in_flight: int = 2,
+        max_age_blocks: int = 2,
+        on_result: Optional[Callable[[Dict, Dict], None]] = None,
+        metrics: Optional[Metrics] = None
+    ):
+        self.trading = trading_logic
+        self.max_in_flight = max_in_flight
+        # Une opportunité détectée plus de max_age_blocks blocs avant le bloc courant est écartée
+        self.max_age_blocks = max_age_blocks
+        # Appelée avec (opportunité, résultat) à la fin de chaque exécution
+        self.on_result = on_result
+        self.metrics = metrics or METRICS
+        # Tas de (-profit net, numéro d'insertion, clé) ; les entrées remplacées y restent jusqu'à leur sortie
+        self.heap: List[Tuple[float, int, OpportunityKey]] = []
+        self.entries: Dict[OpportunityKey, Tuple[int, Dict]] = {}
+        self.sequence = 0
+        self.busy_pools: Set[Pool] = set()
+        self.tasks: Set[asyncio.Task] = set()
+        self.block_number: Optional[int] = None
+        # Dernier instantané de réserves, pour la vérification des prix avant exécution
+        self.snapshot = None
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def submit(self, opportunities: List[Dict], snapshot=None, block_number: Optional[int] = None):
+        """
+        Ajoute les opportunités du bloc block_number, écarte les anciennes et lance les exécutions
+        possibles. Le bloc courant avance à chaque appel, même sans opportunité, pour que les
+        entrées en attente vieillissent ; sans block_number il suit les blocs des opportunités.
+        """
+        if snapshot is not None:
+            self.snapshot = snapshot
+        self._advance(block_number)
+        for opportunity in opportunities:
+            self._advance(opportunity['block_number'])
+            key = opportunity_key(opportunity)
+            current = self.entries.get(key)
+            if current is not None:
+                self.metrics.inc('scheduler_events_total', 'deduplicated')
+                previous = current[1]
+                # Un bloc plus récent remplace toujours l'entrée ; au même bloc, le meilleur profit l'emporte
+                if (previous['block_number'], previous['net_profit_usdt']) >= (opportunity['block_number'], opportunity['net_profit_usdt']):
+                    continue
+            self.sequence += 1
+            self.entries[key] = (self.sequence, opportunity)
+            heapq.heappush(self.heap, (-opportunity['net_profit_usdt'], self.sequence, key))
+            self.metrics.inc('scheduler_events_total', 'queued')
+        self._evict_stale()
+        self._dispatch()
+
+    def _advance(self, block_number: Optional[int]):
+        if block_number is not None and (self.block_number is None or block_number > self.block_number):
+            self.block_number = block_number
+
+    def _is_stale(self, opportunity: Dict) -> bool:
+        return self.block_number - opportunity['block_number'] > self.max_age_blocks
+
+    def _evict_stale(self):
+        if self.block_number is None:
+            return
+        stale = [key for key, (_, opportunity) in self.entries.items() if self._is_stale(opportunity)]
+        for key in stale:
+            del self.entries[key]
+        if stale:
+            self.metrics.inc('scheduler_events_total', 'stale', len(stale))
+        # Le tas est reconstruit quand les entrées périmées y dominent
+        if len(self.heap) > 2 * len(self.entries) + 64:
+            self.heap = [item for item in self.heap if self.entries.get(item[2], (None,))[0] == item[1]]
+            heapq.heapify(self.heap)
+
+    def _dispatch(self):
+        """Lance les meilleures opportunités dont les pools sont libres, dans la limite max_in_flight"""
+        blocked = []
+        while self.heap and len(self.tasks) < self.max_in_flight:
+            item = heapq.heappop(self.heap)
+            entry = self.entries.get(item[2])
+            if entry is None or entry[0] != item[1]:
+                continue
+            opportunity = entry[1]
+            pools = opportunity_pools(opportunity)
+            if any(pool in self.busy_pools for pool in pools):
+                # Le pool est pris par une exécution en vol : l'opportunité attend sa fin
+                blocked.append(item)
+                continue
+            del self.entries[item[2]]
+            self.busy_pools.update(pools)
+            task = asyncio.create_task(self._execute(opportunity, pools))
+            self.tasks.add(task)
+        for item in blocked:
+            heapq.heappush(self.heap, item)
+        self.metrics.set_gauge('queue_depth', 'scheduler', len(self.entries))
+        self.metrics.set_gauge('queue_depth', 'executions', len(self.tasks))
+
+    async def _execute(self, opportunity: Dict, pools: Tuple[Pool, ...]):
+        try:
+            result = await self.trading.execute_opportunity(opportunity, self.snapshot)
+        except Exception as e:
+            result = {'success': False, 'error': str(e)}
+        finally:
+            self.busy_pools.difference_update(pools)
+            self.tasks.discard(asyncio.current_task())
+        self.metrics.inc('scheduler_events_total', 'executed')
+        if self.on_result is not None:
+            self.on_result(opportunity, result)
+        # Une place s'est libérée : les entrées devenues trop anciennes pendant l'exécution sont écartées
+        self._evict_stale()
+        self._dispatch()
+
+    async def close(self):
+        """Annule les exécutions en vol"""
+        for task in list(self.tasks):
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks.clear()
+        self.busy_pools.clear()
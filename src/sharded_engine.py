@@ -0,0 +1,322 @@
+"""
+Moteur d'évaluation réparti sur plusieurs processus.
+
+Les paires communes sont découpées en plages contiguës, une par processus de travail. La copie
+float64 (N, V, 2) des réserves qui sert au filtrage vectorisé est en mémoire partagée : le
+coordinateur y écrit sur place les lignes modifiées et marque les paires concernées, puis
+n'envoie que le numéro de bloc (et le prix de l'ETH) aux processus dont la plage a changé. Chacun
+filtre ses paires marquées et ne renvoie que les index des paires retenues ; le calcul exact en
+entiers, sur les réserves exactes tenues par le coordinateur, et l'analyse par TradingLogic
+restent dans le coordinateur.
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+from multiprocessing import shared_memory
+import asyncio
+import multiprocessing
+import os
+import queue
+import time
+import numpy as np
+from .arbitrage_logic import ArbitrageLogic, PairUsdPrices
+from .config import SHARD_WORKERS
+from .metrics import METRICS, Metrics
+from .reserves import ReserveSnapshot
+from .venues import Venue, load_venues
+
+# Mise à jour de réserves : (index global de la paire, index du DEX, reserve0, reserve1)
+ReserveUpdate = Tuple[int, int, int, int]
+
+
+def _shared_views(buffer, n_pairs: int, n_venues: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Réserves float64 (N, V, 2) puis indicateur de modification (N,) dans un même segment partagé"""
+    screen = np.ndarray((n_pairs, n_venues, 2), dtype=np.float64, buffer=buffer)
+    dirty = np.ndarray((n_pairs,), dtype=np.uint8, buffer=buffer, offset=screen.nbytes)
+    return screen, dirty
+
+
+def _worker_main(
+    shard: int,
+    venues: List[Venue],
+    min_volume_usdt: float,
+    min_profit_percent: float,
+    first: int,
+    pairs: List[Dict],
+    shared_name: str,
+    n_pairs: int,
+    inbox,
+    outbox
+):
+    """
+    Boucle d'un processus de travail, propriétaire des paires d'index first à first + len(pairs)
+    (tokens et décimales dans pairs). Chaque message de inbox est (bloc, prix de l'ETH en USDT) :
+    les paires marquées de la plage sont filtrées sur les réserves partagées, leur marque effacée,
+    et un message (partition, bloc, index globaux des paires retenues, paires filtrées, durée)
+    part dans outbox.
+    """
+    logic = ArbitrageLogic(min_volume_usdt, min_profit_percent, Metrics(enabled=False), venues)
+    pair_usd_prices = PairUsdPrices((pair['token0'], pair['token1']) for pair in pairs)
+    decimals0 = np.array([pair['decimals0'] for pair in pairs], dtype=np.int64)
+    decimals1 = np.array([pair['decimals1'] for pair in pairs], dtype=np.int64)
+    shared = shared_memory.SharedMemory(name=shared_name)
+    screen, dirty = _shared_views(shared.buf, n_pairs, len(venues))
+    screen, dirty = screen[first:first + len(pairs)], dirty[first:first + len(pairs)]
+
+    try:
+        while True:
+            message = inbox.get()
+            if message is None:
+                break
+            block_number, eth_price_usdt = message
+            start = time.perf_counter()
+            local = np.flatnonzero(dirty)
+            dirty[local] = 0
+            usd_prices = pair_usd_prices.prices(eth_price_usdt)
+            result = logic.find_arbitrage_opportunities_batch(
+                screen[local], decimals0[local], decimals1[local], usd_prices=usd_prices[local]
+            )
+            survivors = first + local[result['indices']]
+            outbox.put((shard, block_number, survivors, len(local), time.perf_counter() - start))
+    finally:
+        del screen, dirty
+        shared.close()
+
+
+class ShardedEngine:
+    """
+    Coordinateur du moteur multi-processus.
+
+        engine = ShardedEngine(trading, workers=8)
+        engine.start(scanner.common_pairs, decimals, scanner.pair_addresses)
+        decisions = await engine.process_snapshot(snapshot)
+        decisions = await engine.process_snapshot(snapshot, indices)   # paires modifiées seulement
+        decisions = await engine.process_reserves(block_number, {adresse: réserves, ...})
+    """
+
+    def __init__(
+        self,
+        trading_logic=None,
+        workers: Optional[int] = None,
+        min_volume_usdt: float = 25000,
+        min_profit_percent: float = 0.0,
+        venues: Optional[List[Venue]] = None,
+        metrics: Optional[Metrics] = None
+    ):
+        self.trading = trading_logic
+        self.workers = workers or SHARD_WORKERS or os.cpu_count() or 1
+        self.venues = venues or load_venues()
+        self.metrics = metrics or METRICS
+        # Calcul exact des paires retenues, dans le coordinateur
+        self.logic = ArbitrageLogic(min_volume_usdt, min_profit_percent, self.metrics, self.venues)
+        # Processus lancés par spawn : le processus parent (boucle asyncio, interface) n'est pas dupliqué
+        self.context = multiprocessing.get_context('spawn')
+        self.processes: List = []
+        self.inboxes: List = []
+        self.outbox = None
+        self.shared: Optional[shared_memory.SharedMemory] = None
+        self.screen = np.zeros((0, len(self.venues), 2), dtype=np.float64)
+        self.dirty = np.zeros(0, dtype=np.uint8)
+        # Début de la plage de chaque partition, suivi du nombre de paires
+        self.bounds = np.zeros(1, dtype=np.int64)
+        # Réserves exactes de toutes les paires, pour le calcul final
+        self.snapshot = ReserveSnapshot(0, [], len(self.venues))
+        self.pair_usd_prices = PairUsdPrices([])
+        self.decimals = np.zeros((0, 2), dtype=np.int64)
+        # Adresse de pool (minuscules) -> (index global de la paire, index du DEX)
+        self.pools: Dict[str, Tuple[int, int]] = {}
+
+    @property
+    def min_volume_usdt(self) -> float:
+        return self.logic.min_volume_usdt
+
+    @property
+    def min_profit_percent(self) -> float:
+        return self.logic.min_profit_percent
+
+    def start(
+        self,
+        pairs: List[Tuple[str, str]],
+        decimals: Iterable[Tuple[int, int]],
+        pair_addresses: Optional[List[Dict[Tuple[str, str], str]]] = None
+    ):
+        """
+        Découpe les paires en plages contiguës, alloue la mémoire partagée et lance les processus.
+        decimals donne (décimales token0, décimales token1) par paire ; pair_addresses
+        (DexScanner.pair_addresses) permet d'aiguiller les réserves par adresse de pool avec
+        process_reserves.
+        """
+        pairs = list(pairs)
+        n_pairs, n_venues = len(pairs), len(self.venues)
+        self.decimals = np.array([[int(d0), int(d1)] for d0, d1 in decimals], dtype=np.int64).reshape(-1, 2)
+        self.pair_usd_prices = PairUsdPrices(pairs)
+        self.snapshot = ReserveSnapshot(0, pairs, n_venues)
+        self.pools = {}
+        for venue, addresses in enumerate(pair_addresses or []):
+            for i, pair in enumerate(pairs):
+                pool = addresses.get(pair)
+                if pool is not None:
+                    self.pools[pool.lower()] = (i, venue)
+
+        size = n_pairs * n_venues * 2 * 8 + n_pairs
+        self.shared = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        self.screen, self.dirty = _shared_views(self.shared.buf, n_pairs, n_venues)
+        self.screen[:] = 0.0
+        self.dirty[:] = 0
+        self.bounds = np.array([n_pairs * shard // self.workers for shard in range(self.workers + 1)], dtype=np.int64)
+
+        self.outbox = self.context.Queue()
+        for shard in range(self.workers):
+            first, last = int(self.bounds[shard]), int(self.bounds[shard + 1])
+            shard_pairs = [
+                {
+                    'token0': pairs[i][0], 'token1': pairs[i][1],
+                    'decimals0': int(self.decimals[i, 0]), 'decimals1': int(self.decimals[i, 1])
+                }
+                for i in range(first, last)
+            ]
+            inbox = self.context.Queue()
+            process = self.context.Process(
+                target=_worker_main,
+                args=(
+                    shard, self.venues, self.min_volume_usdt, self.min_profit_percent,
+                    first, shard_pairs, self.shared.name, n_pairs, inbox, self.outbox
+                ),
+                daemon=True
+            )
+            process.start()
+            self.inboxes.append(inbox)
+            self.processes.append(process)
+
+    def stop(self):
+        for inbox in self.inboxes:
+            inbox.put(None)
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self.processes, self.inboxes = [], []
+        if self.shared is not None:
+            self.screen = np.zeros((0, len(self.venues), 2), dtype=np.float64)
+            self.dirty = np.zeros(0, dtype=np.uint8)
+            self.shared.close()
+            self.shared.unlink()
+            self.shared = None
+
+    def write(self, updates: Iterable[ReserveUpdate]):
+        """Applique des mises à jour de réserves par pool : réserves exactes et copie partagée"""
+        updates = list(updates)
+        if not updates:
+            return
+        for i, venue, reserve0, reserve1 in updates:
+            self.snapshot.set_reserves(i, venue, reserve0, reserve1)
+        # Conversion en float64 de toutes les mises à jour en une fois, index compris (< 2**53)
+        values = np.array(updates, dtype=np.float64)
+        rows = values[:, 0].astype(np.int64)
+        self.screen[rows, values[:, 1].astype(np.int64)] = values[:, 2:4]
+        self.dirty[rows] = 1
+
+    def write_snapshot(self, snapshot, indices: Optional[Iterable[int]] = None):
+        """
+        Reprend les réserves d'un ReserveSnapshot (mêmes paires, dans le même ordre, que start),
+        de toutes les paires ou des seules paires d'index indices
+        """
+        self.snapshot = snapshot.copy(snapshot.block_number)
+        if indices is None:
+            self.screen[:] = snapshot.as_array()
+            self.dirty[:] = 1
+            return
+        rows = np.fromiter(indices, dtype=np.int64)
+        if len(rows):
+            self.screen[rows] = np.array(
+                [snapshot.venue_reserves(i) for i in rows.tolist()], dtype=np.float64
+            ).reshape(-1, snapshot.n_venues, 2)
+            self.dirty[rows] = 1
+
+    async def evaluate(
+        self,
+        block_number: int,
+        updates: Iterable[ReserveUpdate] = (),
+        min_profit_usdt: float = 0.0,
+        eth_price_usdt: float = float('nan')
+    ) -> List[Dict]:
+        """
+        Applique les mises à jour du bloc, fait filtrer les paires modifiées par les partitions
+        concernées puis calcule exactement les paires retenues. Retourne les candidats dont le
+        profit attendu dépasse min_profit_usdt, classés par profit attendu décroissant. Sans prix
+        de l'ETH, seules les paires en stablecoin sont valorisées.
+        """
+        self.write(updates)
+        changed = np.flatnonzero(self.dirty)
+        shards = np.unique(np.searchsorted(self.bounds, changed, side='right') - 1).tolist()
+        for shard in shards:
+            self.inboxes[shard].put((block_number, eth_price_usdt))
+
+        loop = asyncio.get_running_loop()
+        survivors: List[np.ndarray] = []
+        screened = 0
+        pending = len(shards)
+        while pending:
+            try:
+                reply = await loop.run_in_executor(None, self.outbox.get, True, 1.0)
+            except queue.Empty:
+                # Un processus arrêté ne répondra jamais : on échoue plutôt que d'attendre indéfiniment
+                stopped = [shard for shard, process in enumerate(self.processes) if not process.is_alive()]
+                if stopped:
+                    raise RuntimeError(f"Processus de travail arrêtés : partitions {stopped}")
+                continue
+            shard, reply_block, shard_survivors, shard_screened, seconds = reply
+            self.metrics.observe_stage('shard', seconds)
+            if reply_block != block_number:
+                continue
+            survivors.append(shard_survivors)
+            screened += shard_screened
+            pending -= 1
+        self.metrics.funnel('screened', screened)
+
+        usd_prices = self.pair_usd_prices.prices(eth_price_usdt)
+        pairs = self.snapshot.pairs
+        candidates = []
+        for i in sorted(np.concatenate(survivors).tolist()) if survivors else []:
+            opportunity = self.logic.find_arbitrage_opportunity(
+                self.snapshot.venue_reserves(i), int(self.decimals[i, 0]), int(self.decimals[i, 1]),
+                block_number, tuple(usd_prices[i].tolist())
+            )
+            if opportunity is not None and opportunity['expected_profit_usdt'] > min_profit_usdt:
+                candidates.append({
+                    **opportunity,
+                    'pair_index': i,
+                    'token0': pairs[i][0],
+                    'token1': pairs[i][1],
+                    'block_number': block_number
+                })
+        self.metrics.funnel('found', len(candidates))
+        candidates.sort(key=lambda candidate: candidate['expected_profit_usdt'], reverse=True)
+        return candidates
+
+    async def process_block(self, block_number: int, updates: Iterable[ReserveUpdate] = ()) -> List[Dict]:
+        """
+        Évalue un bloc puis fait analyser les candidats par TradingLogic, meilleurs profits nets
+        d'abord. Les candidats qui ne couvrent pas le gas du bloc sont écartés avant l'analyse.
+        """
+        fees = await self.trading.fee_oracle.get(block_number)
+        with self.metrics.timer('sharded', block_number):
+            candidates = await self.evaluate(
+                block_number, updates, self.trading.estimate_gas_cost_usdt(fees), fees['eth_price_usdt']
+            )
+        decisions = await asyncio.gather(*(self.trading.analyze_opportunity(candidate) for candidate in candidates))
+        accepted = [decision for decision in decisions if decision is not None]
+        accepted.sort(key=lambda decision: decision['net_profit_usdt'], reverse=True)
+        return accepted
+
+    async def process_snapshot(self, snapshot, indices: Optional[Iterable[int]] = None) -> List[Dict]:
+        """Traite un ReserveSnapshot (mêmes paires, dans le même ordre, que start), limité aux paires indices"""
+        self.write_snapshot(snapshot, indices)
+        return await self.process_block(snapshot.block_number)
+
+    async def process_reserves(self, block_number: int, reserves: Dict[str, Tuple[int, int]]) -> List[Dict]:
+        """Traite les réserves modifiées d'un bloc, par adresse de pool (par exemple depuis ReserveCache)"""
+        updates = []
+        for address, (reserve0, reserve1) in reserves.items():
+            owner = self.pools.get(address.lower())
+            if owner is not None:
+                updates.append((owner[0], owner[1], reserve0, reserve1))
+        return await self.process_block(block_number, updates)
@@ -0,0 +1,193 @@
+"""
+Diffusion de l'état du moteur aux clients locaux (interface graphique, supervision).
+
+Le protocole est une ligne JSON par instantané sur une connexion TCP locale. Les instantanés
+sont regroupés et limités en fréquence : le moteur signale seulement qu'un nouvel état existe,
+l'état n'est construit et sérialisé qu'au plus SNAPSHOT_RATE fois par seconde, et un client
+trop lent perd des instantanés au lieu de ralentir le moteur.
+
+Un client peut envoyer des commandes sur la même connexion, une ligne JSON chacune, par exemple
+{"command": "set_auto_execute", "enabled": true} (voir ArbitrageEngine.handle_command).
+
+    python -m src.snapshot_stream     # affiche les instantanés d'un moteur en cours d'exécution
+    python -m src.snapshot_stream --set-auto off --add-token 0x...
+"""
+from typing import AsyncIterator, Callable, Dict, List, Optional, Set
+import argparse
+import asyncio
+import json
+import time
+from .config import SNAPSHOT_PORT, SNAPSHOT_RATE
+
+
+class SnapshotPublisher:
+    """Serveur d'instantanés : notify() est O(1), la construction et l'envoi se font à part, à fréquence bornée"""
+
+    def __init__(
+        self,
+        source: Callable[[], Dict],
+        host: str = '127.0.0.1',
+        port: int = SNAPSHOT_PORT,
+        max_rate: float = SNAPSHOT_RATE,
+        max_buffer: int = 1 << 20,
+        on_command: Optional[Callable[[Dict], None]] = None
+    ):
+        # source() construit l'état courant ; elle n'est appelée qu'au moment d'un envoi
+        self.source = source
+        # Appelée avec chaque commande reçue d'un client
+        self.on_command = on_command
+        self.host = host
+        self.port = port
+        self.interval = 1.0 / max_rate
+        # Au-delà de max_buffer octets en attente d'envoi, le client est considéré comme lent
+        self.max_buffer = max_buffer
+        self.clients: Set[asyncio.StreamWriter] = set()
+        self.dirty = asyncio.Event()
+        self.last_line: Optional[bytes] = None
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.pump_task: Optional[asyncio.Task] = None
+        self.sent = 0
+        self.dropped = 0
+
+    def notify(self):
+        """Signale un nouvel état ; les notifications rapprochées donnent un seul instantané"""
+        self.dirty.set()
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.pump_task = asyncio.create_task(self._pump())
+
+    async def stop(self):
+        if self.pump_task is not None:
+            self.pump_task.cancel()
+            try:
+                await self.pump_task
+            except asyncio.CancelledError:
+                pass
+            self.pump_task = None
+        for writer in list(self.clients):
+            writer.close()
+        self.clients.clear()
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        # Un nouveau client reçoit tout de suite le dernier instantané connu
+        if self.last_line is not None:
+            writer.write(self.last_line)
+        self.clients.add(writer)
+        try:
+            # Les clients n'envoient que des commandes : la fin de lecture signale la déconnexion
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                self._dispatch_command(line)
+        except (ConnectionError, ValueError, asyncio.CancelledError):
+            pass
+        finally:
+            self.clients.discard(writer)
+            writer.close()
+
+    def _dispatch_command(self, line: bytes):
+        if not line.strip() or self.on_command is None:
+            return
+        try:
+            command = json.loads(line)
+            self.on_command(command)
+        except Exception as e:
+            print(f"Erreur lors du traitement de la commande: {e}")
+        # L'effet de la commande est visible au prochain instantané
+        self.notify()
+
+    async def _pump(self):
+        while True:
+            await self.dirty.wait()
+            self.dirty.clear()
+            try:
+                self.last_line = (json.dumps(self.source(), default=str) + '\n').encode()
+            except Exception as e:
+                print(f"Erreur lors de la construction de l'instantané: {e}")
+                await asyncio.sleep(self.interval)
+                continue
+            for writer in list(self.clients):
+                if writer.is_closing():
+                    self.clients.discard(writer)
+                elif writer.transport.get_write_buffer_size() > self.max_buffer:
+                    self.dropped += 1
+                else:
+                    writer.write(self.last_line)
+                    self.sent += 1
+            await asyncio.sleep(self.interval)
+
+
+async def subscribe(host: str = '127.0.0.1', port: int = SNAPSHOT_PORT) -> AsyncIterator[Dict]:
+    """Client minimal : produit les instantanés reçus d'un SnapshotPublisher"""
+    reader, writer = await asyncio.open_connection(host, port, limit=1 << 24)
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            yield json.loads(line)
+    finally:
+        writer.close()
+
+
+async def send_command(command: Dict, host: str = '127.0.0.1', port: int = SNAPSHOT_PORT):
+    """Envoie une commande au moteur sans attendre d'instantané"""
+    _, writer = await asyncio.open_connection(host, port)
+    writer.write((json.dumps(command) + '\n').encode())
+    await writer.drain()
+    writer.close()
+    await writer.wait_closed()
+
+
+async def _watch(args):
+    async for state in subscribe(args.host, args.port):
+        opportunities = state.get('opportunities', [])
+        best = opportunities[0] if opportunities else None
+        summary = (
+            f"{best['pair']} {best['buy_venue']} -> {best['sell_venue']} {best['net_profit_usdt']:.2f} USDT"
+            if best else "aucune"
+        )
+        print(f"[{time.strftime('%H:%M:%S')}] bloc {state.get('block')}, {state.get('pairs')} paires, "
+              f"{len(opportunities)} opportunités, meilleure : {summary}")
+
+
+def _commands(args) -> List[Dict]:
+    commands = []
+    if args.set_auto is not None:
+        commands.append({'command': 'set_auto_execute', 'enabled': args.set_auto == 'on'})
+    for token in args.add_token:
+        commands.append({'command': 'add_preferred_token', 'token': token})
+    for token in args.remove_token:
+        commands.append({'command': 'remove_preferred_token', 'token': token})
+    return commands
+
+
+async def _send(args, commands: List[Dict]):
+    for command in commands:
+        await send_command(command, args.host, args.port)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Affiche les instantanés d'un moteur en cours d'exécution")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=SNAPSHOT_PORT)
+    parser.add_argument('--set-auto', choices=('on', 'off'), help="Passe le moteur en mode automatique ou manuel")
+    parser.add_argument('--add-token', action='append', default=[], help="Ajoute un token préféré")
+    parser.add_argument('--remove-token', action='append', default=[], help="Retire un token préféré")
+    args = parser.parse_args()
+    commands = _commands(args)
+    try:
+        # Avec des commandes, le client les envoie puis s'arrête ; sinon il suit les instantanés
+        asyncio.run(_send(args, commands) if commands else _watch(args))
+    except (ConnectionError, KeyboardInterrupt) as e:
+        print(f"Flux d'instantanés interrompu: {e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+from typing import Dict, List, Optional
+from collections import deque
+from datetime import datetime
+import json
+import os
+import time
+
+
+class StatsJournal:
+    """
+    Stockage des statistiques en journal append-only (JSONL) avec fsync groupé.
+    Les agrégats sont tenus en mémoire et le journal est compacté périodiquement
+    dans un instantané écrit de manière atomique. Chaque événement porte un numéro
+    de séquence : après un arrêt brutal, seuls les événements postérieurs à
+    l'instantané sont rejoués et une dernière ligne tronquée est ignorée.
+    """
+
+    def __init__(
+        self,
+        journal_path: str = 'stats_journal.jsonl',
+        snapshot_path: str = 'stats.json',
+        fsync_every: int = 100,
+        fsync_interval: float = 1.0,
+        compact_every: int = 50000,
+        bucket_seconds: int = 60,
+        recent_trades: int = 100
+    ):
+        self.journal_path = journal_path
+        self.snapshot_path = snapshot_path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.compact_every = compact_every
+        self.bucket_seconds = bucket_seconds
+        self.stats = {
+            'total_pnl': 0.0,
+            'opportunities_found': 0,
+            'opportunities_taken': 0,
+            'total_volume': 0.0,
+            'trades': deque(maxlen=recent_trades),
+            'preferred_tokens': set()
+        }
+        # PnL, volume et nombre de trades par tranche de bucket_seconds
+        self.pnl_buckets: Dict[int, List[float]] = {}
+        self.sequence = 0
+        self.unsynced = 0
+        self.last_fsync = time.monotonic()
+        self.events_since_compact = 0
+        self.load()
+        self._truncate_torn_tail()
+        self.file = open(self.journal_path, 'a')
+
+    def load(self):
+        """Charge l'instantané puis rejoue les événements du journal qui le suivent"""
+        self.stats.update(total_pnl=0.0, opportunities_found=0, opportunities_taken=0, total_volume=0.0)
+        self.stats['trades'].clear()
+        self.stats['preferred_tokens'].clear()
+        self.pnl_buckets = {}
+        self.sequence = 0
+        self.events_since_compact = 0
+        try:
+            if os.path.exists(self.snapshot_path):
+                with open(self.snapshot_path, 'r') as f:
+                    self._load_snapshot(json.load(f))
+        except Exception as e:
+            print(f"Erreur lors du chargement des stats: {e}")
+
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, 'r') as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    # Ligne tronquée par un arrêt pendant l'écriture
+                    continue
+                if event.get('seq', 0) > self.sequence:
+                    self._apply(event)
+                    self.sequence = event['seq']
+                    self.events_since_compact += 1
+
+    def _truncate_torn_tail(self):
+        """Coupe une dernière ligne tronquée pour que le prochain événement commence sur une ligne neuve"""
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, 'rb+') as f:
+            end = f.seek(0, os.SEEK_END)
+            position = end
+            while position > 0:
+                step = min(4096, position)
+                f.seek(position - step)
+                chunk = f.read(step)
+                newline = chunk.rfind(b'\n')
+                if newline >= 0:
+                    position = position - step + newline + 1
+                    break
+                position -= step
+            if position < end:
+                f.truncate(position)
+
+    def _load_snapshot(self, saved: Dict):
+        for key in ('total_pnl', 'opportunities_found', 'opportunities_taken', 'total_volume'):
+            if key in saved:
+                self.stats[key] = saved[key]
+        self.stats['preferred_tokens'].update(saved.get('preferred_tokens', []))
+        self.sequence = saved.get('sequence', 0)
+        self.pnl_buckets = {int(bucket): values for bucket, values in saved.get('pnl_buckets', {}).items()}
+        trades = saved.get('trades', [])
+        if 'pnl_buckets' not in saved:
+            # Ancien format stats.json : l'historique complet des trades est converti en tranches
+            for trade in trades:
+                timestamp = datetime.fromisoformat(trade['timestamp']).timestamp()
+                self._add_to_bucket(timestamp, trade['profit_usdt'], trade['volume_usdt'])
+        self.stats['trades'].extend(trades)
+
+    def _add_to_bucket(self, timestamp: float, profit: float, volume: float):
+        bucket = self.pnl_buckets.setdefault(int(timestamp // self.bucket_seconds), [0.0, 0.0, 0])
+        bucket[0] += profit
+        bucket[1] += volume
+        bucket[2] += 1
+
+    def _apply(self, event: Dict):
+        """Met à jour les agrégats en mémoire à partir d'un événement"""
+        event_type = event['type']
+        if event_type == 'opportunity':
+            self.stats['opportunities_found'] += 1
+        elif event_type == 'trade':
+            self.stats['opportunities_taken'] += 1
+            self.stats['total_pnl'] += event['profit_usdt']
+            self.stats['total_volume'] += event['volume_usdt']
+            self._add_to_bucket(event['ts'], event['profit_usdt'], event['volume_usdt'])
+            self.stats['trades'].append({
+                'timestamp': datetime.fromtimestamp(event['ts']).isoformat(),
+                'pair': event['pair'],
+                'profit_usdt': event['profit_usdt'],
+                'volume_usdt': event['volume_usdt'],
+                'profit_percent': event['profit_percent']
+            })
+        elif event_type == 'preferred_add':
+            self.stats['preferred_tokens'].add(event['token'])
+        elif event_type == 'preferred_remove':
+            self.stats['preferred_tokens'].discard(event['token'])
+
+    def record(self, event: Dict):
+        """Ajoute un événement au journal et l'applique aux agrégats (O(1))"""
+        self.sequence += 1
+        event['seq'] = self.sequence
+        self._apply(event)
+        self.file.write(json.dumps(event, separators=(',', ':')) + '\n')
+        self.unsynced += 1
+        self.events_since_compact += 1
+
+        if self.unsynced >= self.fsync_every or time.monotonic() - self.last_fsync >= self.fsync_interval:
+            self.sync()
+        if self.events_since_compact >= self.compact_every:
+            self.compact()
+
+    def sync(self):
+        """Force l'écriture sur disque des événements en attente"""
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.unsynced = 0
+        self.last_fsync = time.monotonic()
+
+    def compact(self):
+        """Écrit un instantané atomique des agrégats puis vide le journal"""
+        try:
+            self.sync()
+            save_data = {
+                'total_pnl': self.stats['total_pnl'],
+                'opportunities_found': self.stats['opportunities_found'],
+                'opportunities_taken': self.stats['opportunities_taken'],
+                'total_volume': self.stats['total_volume'],
+                'trades': list(self.stats['trades']),
+                'preferred_tokens': list(self.stats['preferred_tokens']),
+                'pnl_buckets': self.pnl_buckets,
+                'sequence': self.sequence
+            }
+            tmp_path = f"{self.snapshot_path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(save_data, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+
+            # L'instantané couvre tous les événements : le journal peut repartir de zéro
+            self.file.close()
+            self.file = open(self.journal_path, 'w')
+            self.events_since_compact = 0
+        except Exception as e:
+            print(f"Erreur lors de la compaction des stats: {e}")
+
+    def close(self):
+        self.compact()
+        self.file.close()
+
+    def get_pnl(self, start: Optional[float] = None, end: Optional[float] = None) -> Dict:
+        """PnL, volume et nombre de trades entre deux timestamps (résolution bucket_seconds)"""
+        first = None if start is None else int(start // self.bucket_seconds)
+        last = None if end is None else int(end // self.bucket_seconds)
+        pnl, volume, trades = 0.0, 0.0, 0
+        for bucket, values in self.pnl_buckets.items():
+            if (first is None or bucket >= first) and (last is None or bucket <= last):
+                pnl += values[0]
+                volume += values[1]
+                trades += values[2]
+        return {'pnl_usdt': pnl, 'volume_usdt': volume, 'trades': trades}
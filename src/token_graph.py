@@ -0,0 +1,206 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from math import exp, inf, log
+from .amm_math import FEE_DENOMINATOR, FEE_NUMERATOR
+from .venues import Venue
+
+
+class TokenGraph:
+    """
+    Graphe orienté des tokens construit à partir des paires des factories.
+    Chaque pool donne deux arêtes (token0 -> token1 et token1 -> token0) de poids
+    -log(taux marginal après les frais de son DEX) : un cycle de poids négatif est un arbitrage.
+    Entre deux tokens, seule l'arête de plus faible poids est utilisée pour un cycle.
+    """
+
+    def __init__(self, fee_numerator: int = FEE_NUMERATOR, fee_denominator: int = FEE_DENOMINATOR):
+        # Frais des pools ajoutés sans DEX
+        self.default_log_fee = log(fee_numerator / fee_denominator)
+        self.token_index: Dict[str, int] = {}
+        self.tokens: List[str] = []
+        # adjacency[a][b] et reverse_adjacency[b][a] partagent la liste des arêtes a -> b
+        self.adjacency: List[Dict[int, List[int]]] = []
+        self.reverse_adjacency: List[Dict[int, List[int]]] = []
+        # Arêtes stockées à plat : l'arête 2*k est token0 -> token1 du pool k, 2*k+1 le sens inverse
+        self.edge_weight: List[float] = []
+        self.pool_index: Dict[str, int] = {}
+        self.pools: List[str] = []
+        self.pool_tokens: List[Tuple[int, int]] = []
+        # log(facteur de frais) du DEX de chaque pool, commun à ses deux arêtes
+        self.pool_log_fee: List[float] = []
+
+    def __len__(self) -> int:
+        return len(self.edge_weight)
+
+    def _get_token(self, token_address: str) -> int:
+        index = self.token_index.get(token_address)
+        if index is None:
+            index = len(self.tokens)
+            self.token_index[token_address] = index
+            self.tokens.append(token_address)
+            self.adjacency.append({})
+            self.reverse_adjacency.append({})
+        return index
+
+    def _weights(self, reserves: Tuple[int, int], log_fee: float) -> Tuple[float, float]:
+        reserve0, reserve1 = reserves
+        if reserve0 <= 0 or reserve1 <= 0:
+            return inf, inf
+        log_ratio = log(reserve1) - log(reserve0)
+        return -(log_fee + log_ratio), -(log_fee - log_ratio)
+
+    def _link(self, source: int, target: int, edge: int):
+        edges = self.adjacency[source].get(target)
+        if edges is None:
+            edges = []
+            self.adjacency[source][target] = edges
+            self.reverse_adjacency[target][source] = edges
+        edges.append(edge)
+
+    def add_pool(
+        self,
+        pool_address: str,
+        token0: str,
+        token1: str,
+        reserves: Tuple[int, int] = (0, 0),
+        venue: Optional[Venue] = None
+    ):
+        """Ajoute un pool du DEX venue, aux frais par défaut du graphe sans DEX (ou met à jour ses réserves s'il est déjà connu)"""
+        if pool_address in self.pool_index:
+            self.update_pool(pool_address, reserves)
+            return
+
+        index0 = self._get_token(token0)
+        index1 = self._get_token(token1)
+        log_fee = self.default_log_fee if venue is None else log(venue.fee_factor)
+        pool = len(self.pools)
+        self.pool_index[pool_address] = pool
+        self.pools.append(pool_address)
+        self.pool_tokens.append((index0, index1))
+        self.pool_log_fee.append(log_fee)
+        self.edge_weight.extend(self._weights(reserves, log_fee))
+        self._link(index0, index1, 2 * pool)
+        self._link(index1, index0, 2 * pool + 1)
+
+    def add_pairs(
+        self,
+        pairs: Iterable[Tuple[str, str, str]],
+        reserves: Optional[Dict[str, Tuple[int, int]]] = None,
+        venue: Optional[Venue] = None
+    ):
+        """Ajoute les paires (adresse, token0, token1) du registre de la factory de venue"""
+        reserves = reserves or {}
+        for pool_address, token0, token1 in pairs:
+            self.add_pool(pool_address, token0, token1, reserves.get(pool_address, (0, 0)), venue)
+
+    def update_pool(self, pool_address: str, reserves: Tuple[int, int]):
+        """Met à jour uniquement les deux arêtes d'un pool"""
+        pool = self.pool_index[pool_address]
+        self.edge_weight[2 * pool], self.edge_weight[2 * pool + 1] = self._weights(reserves, self.pool_log_fee[pool])
+
+    def _best_edge(self, source: int, target: int) -> int:
+        edge_weight = self.edge_weight
+        return min(self.adjacency[source][target], key=edge_weight.__getitem__)
+
+    def _common(self, first: Dict, second: Dict):
+        # Intersection calculée depuis le plus petit des deux dictionnaires
+        if len(first) > len(second):
+            first, second = second, first
+        return [token for token in first if token in second]
+
+    def _search(
+        self,
+        source: int,
+        target: int,
+        min_hops: int,
+        max_hops: int,
+        min_log_profit: float,
+        restrict_to_higher: bool,
+        found: Dict[Tuple, Dict]
+    ):
+        """
+        Relâche tous les cycles de min_hops à max_hops sauts commençant par l'arête source -> target.
+        Le dernier saut vers source est résolu par intersection avec les arêtes entrantes
+        de source, ce qui évite d'explorer un niveau supplémentaire.
+        Avec restrict_to_higher, les tokens intermédiaires ont un index supérieur à la source,
+        si bien que chaque cycle n'est exploré que depuis son plus petit token.
+        """
+        adjacency = self.adjacency
+        incoming = self.reverse_adjacency[source]
+        edge_weight = self.edge_weight
+        best_edge = self._best_edge
+
+        first = best_edge(source, target)
+        first_weight = edge_weight[first]
+        threshold = -min_log_profit
+
+        if min_hops <= 3 <= max_hops:
+            for middle in self._common(adjacency[target], incoming):
+                if middle == source or (restrict_to_higher and middle < source):
+                    continue
+                edges = (first, best_edge(target, middle), best_edge(middle, source))
+                weight = first_weight + edge_weight[edges[1]] + edge_weight[edges[2]]
+                if weight < threshold:
+                    self._record_cycle((source, target, middle), edges, weight, found)
+
+        if max_hops >= 4 and min_hops <= 4:
+            for middle in adjacency[target]:
+                if middle == source or (restrict_to_higher and middle < source):
+                    continue
+                second = best_edge(target, middle)
+                partial_weight = first_weight + edge_weight[second]
+                for last in self._common(adjacency[middle], incoming):
+                    if last == target or (restrict_to_higher and last < source):
+                        continue
+                    edges = (first, second, best_edge(middle, last), best_edge(last, source))
+                    weight = partial_weight + edge_weight[edges[2]] + edge_weight[edges[3]]
+                    if weight < threshold:
+                        self._record_cycle((source, target, middle, last), edges, weight, found)
+
+    def _record_cycle(self, path: Tuple[int, ...], edges: Tuple[int, ...], weight: float, found: Dict[Tuple, Dict]):
+        # Rotation canonique : le cycle commence par son plus petit token
+        start = path.index(min(path))
+        key = edges[start:] + edges[:start]
+        if key in found:
+            return
+        tokens = path[start:] + path[:start]
+        found[key] = {
+            'tokens': [self.tokens[token] for token in tokens + (tokens[0],)],
+            'pools': [self.pools[edge // 2] for edge in key],
+            'profit_percent': (exp(-weight) - 1) * 100
+        }
+
+    def find_cycles(self, min_hops: int = 3, max_hops: int = 4, min_profit_percent: float = 0.0) -> List[Dict]:
+        """Recherche complète des cycles profitables de min_hops à max_hops sauts (3 ou 4)"""
+        min_log_profit = log(1 + min_profit_percent / 100)
+        found: Dict[Tuple, Dict] = {}
+        for source in range(len(self.tokens)):
+            for target in self.adjacency[source]:
+                if target > source:
+                    self._search(source, target, min_hops, max_hops, min_log_profit, True, found)
+        return sorted(found.values(), key=lambda cycle: -cycle['profit_percent'])
+
+    def update_and_find_cycles(
+        self,
+        changed_pools: Dict[str, Tuple[int, int]],
+        min_hops: int = 3,
+        max_hops: int = 4,
+        min_profit_percent: float = 0.0
+    ) -> List[Dict]:
+        """
+        Applique les réserves des pools modifiés dans le bloc puis ne relâche que les
+        cycles qui empruntent une de leurs paires de tokens : tout nouveau cycle profitable
+        passe par une arête modifiée.
+        """
+        changed_links = set()
+        for pool_address, reserves in changed_pools.items():
+            if pool_address not in self.pool_index:
+                continue
+            self.update_pool(pool_address, reserves)
+            token0, token1 = self.pool_tokens[self.pool_index[pool_address]]
+            changed_links.update(((token0, token1), (token1, token0)))
+
+        min_log_profit = log(1 + min_profit_percent / 100)
+        found: Dict[Tuple, Dict] = {}
+        for source, target in changed_links:
+            self._search(source, target, min_hops, max_hops, min_log_profit, False, found)
+        return sorted(found.values(), key=lambda cycle: -cycle['profit_percent'])
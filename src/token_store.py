@@ -0,0 +1,94 @@
+from typing import Dict, Iterable, List, Optional
+import json
+import os
+import time
+from eth_abi import decode
+from .fast_calls import DECIMALS_SELECTOR, SYMBOL_SELECTOR, decode_uint
+
+
+def decode_symbol(data: bytes) -> Optional[str]:
+    """Décode un symbole retourné en string ABI ou en bytes32 (MKR, SAI, ...)"""
+    if not data:
+        return None
+    if len(data) == 32:
+        return data.rstrip(b'\x00').decode('utf-8', errors='replace')
+    try:
+        return decode(['string'], data)[0]
+    except Exception:
+        return data[:32].rstrip(b'\x00').decode('utf-8', errors='replace')
+
+
+class TokenStore:
+    """
+    Cache persistant des métadonnées de tokens (symbole, décimales).
+    Le fichier n'est lu qu'au premier accès, les tokens inconnus sont récupérés
+    par lots via Multicall3 et les échecs sont mémorisés pendant negative_ttl secondes.
+    """
+
+    def __init__(self, multicall, path: str = 'token_metadata.json', negative_ttl: float = 86400):
+        self.multicall = multicall
+        self.path = path
+        self.negative_ttl = negative_ttl
+        self.tokens: Optional[Dict[str, Dict]] = None
+
+    def _loaded(self) -> Dict[str, Dict]:
+        if self.tokens is None:
+            self.tokens = {}
+            try:
+                if os.path.exists(self.path):
+                    with open(self.path, 'r') as f:
+                        self.tokens = json.load(f)
+            except Exception as e:
+                print(f"Erreur lors du chargement des métadonnées de tokens: {e}")
+        return self.tokens
+
+    def save(self):
+        """Sauvegarde le cache de manière atomique"""
+        try:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self._loaded(), f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Erreur lors de la sauvegarde des métadonnées de tokens: {e}")
+
+    def get(self, token_address: str) -> Optional[Dict]:
+        """Retourne les métadonnées en cache sans aucun appel réseau (None si inconnues ou en échec)"""
+        entry = self._loaded().get(token_address.lower())
+        if entry is None or 'failed_at' in entry:
+            return None
+        return entry
+
+    def _needs_fetch(self, token_address: str) -> bool:
+        entry = self._loaded().get(token_address.lower())
+        if entry is None:
+            return True
+        return 'failed_at' in entry and time.time() - entry['failed_at'] > self.negative_ttl
+
+    async def fetch(self, token_addresses: Iterable[str]) -> Dict[str, Optional[Dict]]:
+        """Récupère en un minimum d'appels groupés les tokens absents du cache"""
+        token_addresses = list(token_addresses)
+        missing: List[str] = list(dict.fromkeys(
+            address for address in token_addresses if self._needs_fetch(address)
+        ))
+        if missing:
+            calls = []
+            for address in missing:
+                calls.append((address, SYMBOL_SELECTOR))
+                calls.append((address, DECIMALS_SELECTOR))
+            results = await self.multicall.aggregate(calls)
+
+            tokens = self._loaded()
+            for i, address in enumerate(missing):
+                symbol = decode_symbol(results[2 * i])
+                decimals_data = results[2 * i + 1]
+                if symbol is None or not decimals_data or len(decimals_data) < 32:
+                    tokens[address.lower()] = {'failed_at': time.time()}
+                else:
+                    tokens[address.lower()] = {
+                        'symbol': symbol,
+                        'decimals': decode_uint(decimals_data)
+                    }
+            self.save()
+
+        return {address: self.get(address) for address in token_addresses}
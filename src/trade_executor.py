@@ -1,10 +1,29 @@
 from web3 import Web3
-from typing import Dict
+from typing import Dict, Iterable, List, Optional
 import json
+import time
+from .amm_math import apply_slippage
+from .fast_calls import ContractCache
+from .fee_oracle import BlockFeeOracle
+from .metrics import METRICS, Metrics
+from .tx_pipeline import PendingTransaction, TransactionPipeline
+from .tx_templates import GasEstimateCache, Route, SwapTemplate
+from .venues import Venue, load_venues
+
+# keccak256("Transfer(address,address,uint256)")
+TRANSFER_TOPIC = bytes.fromhex('ddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef')
 
 class TradeExecutor:
-    def __init__(self, w3, private_key: str):
+    def __init__(
+        self,
+        w3,
+        private_key: str,
+        metrics: Optional[Metrics] = None,
+        venues: Optional[List[Venue]] = None,
+        fee_oracle: Optional[BlockFeeOracle] = None
+    ):
         self.w3 = w3
+        self.metrics = metrics or METRICS
         self.account = self.w3.eth.account.from_key(private_key)
         
         # ABIs nécessaires pour les interactions avec les smart contracts
@@ -13,78 +32,127 @@ class TradeExecutor:
             {"inputs":[{"internalType":"uint256","name":"amountIn","type":"uint256"},{"internalType":"uint256","name":"amountOutMin","type":"uint256"},{"internalType":"address[]","name":"path","type":"address[]"},{"internalType":"address","name":"to","type":"address"},{"internalType":"uint256","name":"deadline","type":"uint256"}],"name":"swapExactTokensForTokens","outputs":[{"internalType":"uint256[]","name":"amounts","type":"uint256[]"}],"stateMutability":"nonpayable","type":"function"}
         ]''')
         
-        # Adresses des routeurs
-        self.UNISWAP_ROUTER = "0x7a250d5630B4cF539739dF2C5dAcb4c659F2488D"
-        self.SUSHISWAP_ROUTER = "0xd9e1cE17f2641f24aE83637ab66a2cca9C378B9F"
+        # Adresses des routeurs, par nom de DEX
+        self.routers = {venue.name: venue.router for venue in (venues or load_venues())}
+        self.max_slippage_bps = 100  # 1%
+        self.pipeline = TransactionPipeline(w3, self.account, metrics=self.metrics)
+        self.contracts = ContractCache(w3)
+        # Frais du bloc partagés avec TradingLogic : déjà calculés quand l'opportunité arrive
+        self.fee_oracle = fee_oracle or BlockFeeOracle(w3, metrics=self.metrics)
+        self.gas_estimates = GasEstimateCache(w3, metrics=self.metrics)
+        self.templates: Dict[Route, SwapTemplate] = {}
+        self.chain_id: Optional[int] = None
+        self.deadline_seconds = 300  # 5 minutes
+        self.token_abi = json.loads('''[
+            {"inputs":[{"internalType":"address","name":"spender","type":"address"},{"internalType":"uint256","name":"amount","type":"uint256"}],"name":"approve","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"nonpayable","type":"function"}
+        ]''')
         
+    async def submit_arbitrage(self, opportunity: Dict) -> PendingTransaction:
+        """Construit et diffuse la transaction d'arbitrage sans attendre son inclusion"""
+        with self.metrics.timer('submit', opportunity.get('block_number')):
+            pending = await self._submit_arbitrage(opportunity)
+        self.metrics.funnel('submitted')
+        return pending
+
+    async def warm(self, routes: Iterable[Route] = ()):
+        """
+        Prépare l'exécution hors du chemin critique : identifiant de chaîne, nonce local,
+        calldata des routes connues et rafraîchissement des estimations de gas
+        """
+        if self.chain_id is None:
+            self.chain_id = await self.w3.eth.chain_id
+        await self.pipeline.nonces.sync()
+        for route in routes:
+            self._template(route)
+        self.gas_estimates.start()
+
+    def _template(self, route: Route) -> SwapTemplate:
+        template = self.templates.get(route)
+        if template is None:
+            venue, *path = route
+            template = SwapTemplate(self.routers[venue], path, self.account.address)
+            self.templates[route] = template
+        return template
+
+    async def _submit_arbitrage(self, opportunity: Dict) -> PendingTransaction:
+        amount_in = opportunity['optimal_amount']
+        if 'hops' in opportunity:
+            # Cycle sur un seul DEX : tous les sauts passent par le chemin multi-pools de son routeur,
+            # dans une transaction qui revient au token de départ
+            route = (opportunity['venue'], *opportunity['tokens'])
+            # Jamais moins que le montant engagé : un cycle devenu perdant est annulé par le routeur
+            min_amount_out = max(apply_slippage(opportunity['expected_amount_out'], self.max_slippage_bps), amount_in)
+        else:
+            # Le token0 est d'abord vendu sur le DEX où il est cher
+            route = (opportunity['sell_venue'], opportunity['token0'], opportunity['token1'])
+            # Montant minimal calculé en entiers à partir de getAmountOut, moins la tolérance de slippage
+            min_amount_out = apply_slippage(opportunity['expected_intermediate_amount'], self.max_slippage_bps)
+        template = self._template(route)
+        # Échéance sur l'horloge locale : pas de lecture du dernier bloc
+        deadline = int(time.time()) + self.deadline_seconds
+        transaction = {
+            'from': self.account.address,
+            'to': template.router,
+            'data': template.encode(amount_in, min_amount_out, deadline),
+            'value': 0
+        }
+
+        if self.chain_id is None:
+            self.chain_id = await self.w3.eth.chain_id
+        # Frais EIP-1559 du bloc (en cache dans l'oracle) et gas de la route (en cache par route)
+        fees = await self.fee_oracle.get(opportunity.get('block_number'))
+        gas = await self.gas_estimates.get(route, transaction)
+        transaction.update({
+            'gas': gas,
+            # Marge d'une base fee doublée : la transaction reste valide si la base fee augmente
+            'maxFeePerGas': 2 * fees['base_fee'] + fees['priority_fee'],
+            'maxPriorityFeePerGas': fees['priority_fee'],
+            'chainId': self.chain_id,
+            'type': 2
+        })
+        # Le nonce est attribué localement par le pipeline
+        return await self.pipeline.submit(transaction)
+
     async def execute_arbitrage(self, opportunity: Dict) -> Dict:
-        """Exécute un arbitrage entre Uniswap et Sushiswap"""
+        """
+        Soumet l'opportunité et attend son reçu. Un cycle s'exécute en entier dans la transaction ;
+        pour une paire entre deux DEX seule la vente sur le DEX de vente est soumise.
+        """
         try:
-            # Configuration des contrats
-            uni_router = self.w3.eth.contract(
-                address=self.UNISWAP_ROUTER,
-                abi=self.router_abi
-            )
-            sushi_router = self.w3.eth.contract(
-                address=self.SUSHISWAP_ROUTER,
-                abi=self.router_abi
-            )
-            
-            # Préparation des paramètres de transaction
-            amount_in = opportunity['optimal_amount']
-            min_amount_out = int(amount_in * 1.001)  # 0.1% de slippage minimum
-            deadline = self.w3.eth.get_block('latest').timestamp + 300  # 5 minutes
-            path = [opportunity['token0'], opportunity['token1']]
-            
-            # Sélection du routeur pour l'achat et la vente
-            buy_router = uni_router if opportunity['buy_on_uni'] else sushi_router
-            sell_router = sushi_router if opportunity['buy_on_uni'] else uni_router
-            
-            # Construction des transactions
-            buy_tx = buy_router.functions.swapExactTokensForTokens(
-                amount_in,
-                min_amount_out,
-                path,
-                self.account.address,
-                deadline
-            )
-            
-            # Estimation du gas
-            gas_estimate = buy_tx.estimate_gas({'from': self.account.address})
-            gas_price = self.w3.eth.gas_price
-            
-            # Préparation de la transaction
-            transaction = {
-                'from': self.account.address,
-                'gas': int(gas_estimate * 1.2),  # +20% pour la sécurité
-                'gasPrice': gas_price,
-                'nonce': self.w3.eth.get_transaction_count(self.account.address)
-            }
-            
-            # Signature et envoi de la transaction
-            signed_txn = self.w3.eth.account.sign_transaction(
-                buy_tx.build_transaction(transaction),
-                self.account.key
-            )
-            
-            # Envoi de la transaction
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
+            pending = await self.submit_arbitrage(opportunity)
+            # L'attente du reçu ne bloque pas la boucle d'événements
+            receipt = await pending.future
             
             # Vérification du succès
             if receipt['status'] == 1:
+                self.metrics.funnel('mined')
+                # Gas effectivement payé, au prix de l'ETH du bloc de l'opportunité
+                fees = await self.fee_oracle.get(opportunity.get('block_number'))
+                gas_cost_usdt = receipt['gasUsed'] * receipt['effectiveGasPrice'] * fees['eth_price_usdt'] / 1e18
+                if 'hops' in opportunity:
+                    # Profit réalisé : tokens de départ effectivement reçus par le compte, moins le montant engagé
+                    received = self.received_amount(receipt, opportunity['tokens'][-1])
+                    profit_usdt = (received - opportunity['optimal_amount']) * opportunity['token_price_usdt']
+                else:
+                    # Seule la vente du token0 est soumise : le rachat sur l'autre DEX passe par un autre
+                    # routeur et demanderait un contrat pour être atomique. Aucun profit n'est réalisé par
+                    # cette transaction ; le montant de token1 reçu est retourné tel que lu dans le reçu.
+                    received = self.received_amount(receipt, opportunity['token1'])
+                    profit_usdt = 0.0
                 return {
                     'success': True,
-                    'tx_hash': tx_hash.hex(),
+                    'tx_hash': receipt['transactionHash'].hex(),
                     'gas_used': receipt['gasUsed'],
-                    'gas_price': gas_price,
-                    'profit_usdt': opportunity['expected_profit_usdt']
+                    'gas_price': receipt['effectiveGasPrice'],
+                    'gas_cost_usdt': gas_cost_usdt,
+                    'amount_received': received,
+                    'profit_usdt': profit_usdt
                 }
             else:
                 return {
                     'success': False,
                     'error': 'Transaction failed',
-                    'tx_hash': tx_hash.hex()
+                    'tx_hash': receipt['transactionHash'].hex()
                 }
                 
         except Exception as e:
@@ -93,27 +161,39 @@ class TradeExecutor:
                 'error': str(e)
             }
             
-    def approve_token(self, token_address: str, spender_address: str):
+    def received_amount(self, receipt: Dict, token: str) -> int:
+        """Somme des Transfer du token vers le compte dans les logs du reçu"""
+        recipient = bytes(12) + bytes.fromhex(self.account.address[2:])
+        received = 0
+        for log in receipt['logs']:
+            topics = log['topics']
+            if (
+                len(topics) == 3 and bytes(topics[0]) == TRANSFER_TOPIC
+                and log['address'].lower() == token.lower() and bytes(topics[2]) == recipient
+            ):
+                received += int.from_bytes(bytes(log['data']), 'big')
+        return received
+
+    async def stop(self):
+        """Arrête les tâches de fond (surveillance des reçus, rafraîchissement du gas)"""
+        await self.gas_estimates.stop()
+        await self.pipeline.stop()
+
+    async def approve_token(self, token_address: str, spender_address: str):
         """Approuve un token pour le trading"""
-        token_abi = json.loads('''[
-            {"inputs":[{"internalType":"address","name":"spender","type":"address"},{"internalType":"uint256","name":"amount","type":"uint256"}],"name":"approve","outputs":[{"internalType":"bool","name":"","type":"bool"}],"stateMutability":"nonpayable","type":"function"}
-        ]''')
-        
-        token_contract = self.w3.eth.contract(address=token_address, abi=token_abi)
+        token_contract = self.contracts.get(token_address, self.token_abi)
         
         # Approve pour un montant maximum
         max_amount = Web3.to_wei(2**64 - 1, 'ether')
         
-        tx = token_contract.functions.approve(
+        tx = await token_contract.functions.approve(
             spender_address,
             max_amount
         ).build_transaction({
             'from': self.account.address,
             'gas': 100000,
-            'gasPrice': self.w3.eth.gas_price,
-            'nonce': self.w3.eth.get_transaction_count(self.account.address)
+            'gasPrice': await self.w3.eth.gas_price
         })
         
-        signed_tx = self.w3.eth.account.sign_transaction(tx, self.account.key)
-        tx_hash = self.w3.eth.send_raw_transaction(signed_tx.rawTransaction)
-        return self.w3.eth.wait_for_transaction_receipt(tx_hash)
\ No newline at end of file
+        pending = await self.pipeline.submit(tx)
+        return await pending.future
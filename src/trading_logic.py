@@ -2,18 +2,38 @@ from typing import Dict, List, Optional
 from web3 import Web3
 from decimal import Decimal
 import time
+from .fee_oracle import BlockFeeOracle
+from .metrics import METRICS, Metrics
+from .venues import Venue, load_venues
 
 class TradingLogic:
-    def __init__(self, web3_client, trade_executor, stats_manager):
+    def __init__(
+        self,
+        web3_client,
+        trade_executor,
+        stats_manager,
+        fee_oracle: Optional[BlockFeeOracle] = None,
+        metrics: Optional[Metrics] = None,
+        venues: Optional[List[Venue]] = None
+    ):
         self.w3 = web3_client
         self.executor = trade_executor
         self.stats = stats_manager
+        # Frais et prix ETH/USDT partagés par tous les candidats d'un même bloc
+        self.fee_oracle = fee_oracle or BlockFeeOracle(web3_client)
+        self.metrics = metrics or METRICS
+        # Index et frais des DEX dans les ReserveSnapshot, pour la vérification des prix
+        venues = venues or load_venues()
+        self.venue_index = {venue.name: i for i, venue in enumerate(venues)}
+        self.fee_factors = {venue.name: venue.fee_factor for venue in venues}
         self.MAX_SLIPPAGE = 0.01  # 1%
+        self.ESTIMATED_GAS = 300000  # Estimation pour un arbitrage complet
         self.TRANSACTION_TIMEOUT = 240  # 4 minutes
         self.USDT_ADDRESS = "0xdAC17F958D2ee523a2206206994597C13D831ec7"
         
     async def analyze_opportunity(self, pair_data: Dict) -> Optional[Dict]:
         """Analyse une opportunité d'arbitrage"""
+        self.metrics.funnel('analyzed')
         try:
             # Vérification si les tokens sont dans la liste préférée
             if len(self.stats.get_preferred_tokens()) > 0:
@@ -22,10 +42,9 @@ class TradingLogic:
                     return None
 
             # Calcul du profit net estimé
-            gas_price = await self.w3.eth.get_gas_price()
-            estimated_gas = 300000  # Estimation pour un arbitrage complet
-            gas_cost_eth = gas_price * estimated_gas
-            gas_cost_usdt = await self.get_eth_price_in_usdt() * gas_cost_eth / 1e18
+            with self.metrics.timer('analyze', pair_data.get('block_number')):
+                fees = await self.fee_oracle.get(pair_data.get('block_number'))
+            gas_cost_usdt = self.estimate_gas_cost_usdt(fees)
 
             # Ajout du coût du gas au calcul du profit net
             net_profit_usdt = pair_data['expected_profit_usdt'] - gas_cost_usdt
@@ -33,6 +52,7 @@ class TradingLogic:
             if net_profit_usdt <= 0:
                 return None
 
+            self.metrics.funnel('valid')
             return {
                 **pair_data,
                 'net_profit_usdt': net_profit_usdt,
@@ -45,11 +65,19 @@ class TradingLogic:
             print(f"Erreur lors de l'analyse de l'opportunité: {e}")
             return None
 
-    async def execute_opportunity(self, opportunity: Dict) -> Dict:
-        """Exécute une opportunité d'arbitrage"""
+    def estimate_gas_cost_usdt(self, fees: Dict) -> float:
+        """Coût en USDT du gas d'un arbitrage complet aux frais donnés (gas_price en wei, eth_price_usdt)"""
+        gas_cost_eth = fees['gas_price'] * self.ESTIMATED_GAS
+        return fees['eth_price_usdt'] * gas_cost_eth / 1e18
+
+    async def execute_opportunity(self, opportunity: Dict, snapshot=None) -> Dict:
+        """Exécute une opportunité d'arbitrage après vérification des prix sur snapshot (ReserveSnapshot)"""
         try:
-            # Vérification finale des prix avant exécution
-            current_prices = await self.verify_prices(opportunity)
+            # Vérification finale des prix avant exécution, sur les réserves déjà lues
+            with self.metrics.timer('verify', opportunity.get('block_number')):
+                current_prices = self.verify_prices(opportunity, snapshot)
+            if current_prices is None:
+                return {'success': False, 'error': 'Réserves indisponibles pour vérifier les prix'}
             if not self.is_opportunity_still_valid(opportunity, current_prices):
                 return {'success': False, 'error': 'Prix changés, opportunité non valide'}
 
@@ -66,24 +94,51 @@ class TradingLogic:
         except Exception as e:
             return {'success': False, 'error': str(e)}
 
-    async def verify_prices(self, opportunity: Dict) -> Dict:
-        """Vérifie les prix actuels avant l'exécution"""
-        # Implémentation de la vérification des prix en temps réel
-        uni_price = await self.get_current_price(opportunity['token_pair'], 'uniswap')
-        sushi_price = await self.get_current_price(opportunity['token_pair'], 'sushiswap')
-        
+    def verify_prices(self, opportunity: Dict, snapshot) -> Optional[Dict]:
+        """
+        Prix des DEX d'achat et de vente recalculés sur les réserves de snapshot, sans appel RPC.
+        Les prix sont bruts (reserve1 / reserve0) : seul leur écart relatif est comparé.
+        Pour un cycle, le taux marginal du cycle frais inclus.
+        """
+        if snapshot is None:
+            return None
+        if 'hops' in opportunity:
+            return self.verify_cycle(opportunity, snapshot)
+        pair = (opportunity['token0'], opportunity['token1'])
+        if pair not in snapshot.index:
+            return None
+        venue_reserves = snapshot.get(pair)
+        buy_reserves = venue_reserves[self.venue_index[opportunity['buy_venue']]]
+        sell_reserves = venue_reserves[self.venue_index[opportunity['sell_venue']]]
+        if not all(buy_reserves) or not all(sell_reserves):
+            return None
         return {
-            'uniswap_price': uni_price,
-            'sushiswap_price': sushi_price
+            'buy_price': buy_reserves[1] / buy_reserves[0],
+            'sell_price': sell_reserves[1] / sell_reserves[0]
         }
 
+    def verify_cycle(self, opportunity: Dict, snapshot) -> Optional[Dict]:
+        """Taux marginal d'un cycle (produit des prix nets de frais de ses sauts) sur les réserves de snapshot"""
+        rate = 1.0
+        for venue, token0, token1, zero_for_one in opportunity['hops']:
+            if (token0, token1) not in snapshot.index:
+                return None
+            reserve0, reserve1 = snapshot.get((token0, token1))[self.venue_index[venue]]
+            if not reserve0 or not reserve1:
+                return None
+            price = reserve1 / reserve0 if zero_for_one else reserve0 / reserve1
+            rate *= price * self.fee_factors[venue]
+        return {'cycle_rate': rate}
+
     def is_opportunity_still_valid(self, opportunity: Dict, current_prices: Dict) -> bool:
         """Vérifie si l'opportunité est toujours valide avec les prix actuels"""
         original_profit = opportunity['profit_percent']
-        current_profit = abs(
-            (current_prices['uniswap_price'] - current_prices['sushiswap_price']) /
-            min(current_prices['uniswap_price'], current_prices['sushiswap_price'])
-        ) * 100
+        if 'cycle_rate' in current_prices:
+            current_profit = (current_prices['cycle_rate'] - 1) * 100
+        else:
+            current_profit = (
+                (current_prices['sell_price'] - current_prices['buy_price']) / current_prices['buy_price']
+            ) * 100
 
         # L'opportunité est valide si le profit actuel est au moins 90% du profit original
         return current_profit >= (original_profit * 0.9)
@@ -103,6 +158,6 @@ class TradingLogic:
 
     async def get_eth_price_in_usdt(self) -> float:
         """Récupère le prix actuel de l'ETH en USDT"""
-        # Implémentation de la récupération du prix ETH/USDT
-        # Utilisation d'une paire de référence sur Uniswap ou Sushiswap
-        pass
\ No newline at end of file
+        # Prix dérivé des réserves de la paire WETH/USDT, mis en cache pour le bloc courant
+        fees = await self.fee_oracle.get()
+        return fees['eth_price_usdt']
\ No newline at end of file
@@ -0,0 +1,182 @@
+from typing import Dict, List, Optional
+import asyncio
+import time
+from web3.exceptions import TransactionNotFound
+from .metrics import METRICS, Metrics
+
+
+class NonceManager:
+    """Attribue les nonces localement pour pouvoir garder plusieurs transactions en vol"""
+
+    def __init__(self, w3, address: str):
+        self.w3 = w3
+        self.address = address
+        self.next_nonce: Optional[int] = None
+        self.lock = asyncio.Lock()
+
+    async def sync(self):
+        """Resynchronise le prochain nonce avec le nœud (transactions en attente incluses)"""
+        async with self.lock:
+            self.next_nonce = await self.w3.eth.get_transaction_count(self.address, 'pending')
+
+    async def allocate(self) -> int:
+        """Réserve le prochain nonce"""
+        async with self.lock:
+            if self.next_nonce is None:
+                self.next_nonce = await self.w3.eth.get_transaction_count(self.address, 'pending')
+            nonce = self.next_nonce
+            self.next_nonce += 1
+            return nonce
+
+    async def release(self, nonce: int):
+        """Rend un nonce dont la transaction n'a jamais été diffusée"""
+        async with self.lock:
+            if self.next_nonce == nonce + 1:
+                self.next_nonce = nonce
+            else:
+                # Un trou ne peut pas être comblé localement : on repart de l'état du nœud
+                self.next_nonce = None
+
+
+class PendingTransaction:
+    """Transaction diffusée en attente d'inclusion, avec ses remplacements successifs"""
+
+    def __init__(self, nonce: int, transaction: Dict, future: asyncio.Future):
+        self.nonce = nonce
+        self.transaction = transaction
+        self.future = future
+        self.hashes: List[bytes] = []
+        self.first_sent_at = time.monotonic()
+        self.last_sent_at = self.first_sent_at
+        self.bumps = 0
+
+
+class TransactionPipeline:
+    """
+    Soumission asynchrone des transactions : la diffusion rend la main immédiatement et
+    une tâche de fond surveille les reçus, résout les futures, remplace les transactions
+    bloquées avec un gas plus élevé et détecte celles abandonnées ou remplacées.
+    """
+
+    def __init__(
+        self,
+        w3,
+        account,
+        nonce_manager: Optional[NonceManager] = None,
+        poll_interval: float = 1.0,
+        replace_after: float = 30.0,
+        max_bumps: int = 3,
+        bump_percent: int = 15,
+        timeout: float = 240.0,
+        metrics: Optional[Metrics] = None
+    ):
+        self.w3 = w3
+        self.account = account
+        self.nonces = nonce_manager or NonceManager(w3, account.address)
+        self.poll_interval = poll_interval
+        self.replace_after = replace_after
+        self.max_bumps = max_bumps
+        # Les nœuds exigent au moins +10 % pour accepter un remplacement
+        self.bump_percent = bump_percent
+        self.timeout = timeout
+        self.pending: Dict[int, PendingTransaction] = {}
+        self.watcher: Optional[asyncio.Task] = None
+        self.metrics = metrics or METRICS
+
+    def start(self):
+        """Démarre la surveillance des reçus en tâche de fond"""
+        if self.watcher is None or self.watcher.done():
+            self.watcher = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        """Arrête la surveillance des reçus"""
+        if self.watcher is not None:
+            self.watcher.cancel()
+            try:
+                await self.watcher
+            except asyncio.CancelledError:
+                pass
+            self.watcher = None
+
+    async def submit(self, transaction: Dict) -> PendingTransaction:
+        """
+        Attribue un nonce, signe et diffuse la transaction sans attendre son inclusion.
+        Le reçu est disponible via l'attribut future de la transaction retournée.
+        """
+        self.start()
+        nonce = await self.nonces.allocate()
+        transaction = {**transaction, 'nonce': nonce, 'from': self.account.address}
+        pending = PendingTransaction(nonce, transaction, asyncio.get_running_loop().create_future())
+        try:
+            await self._broadcast(pending)
+        except Exception:
+            await self.nonces.release(nonce)
+            raise
+        self.pending[nonce] = pending
+        self.metrics.set_gauge('queue_depth', 'tx_pending', len(self.pending))
+        return pending
+
+    async def _broadcast(self, pending: PendingTransaction):
+        signed = self.account.sign_transaction(pending.transaction)
+        tx_hash = await self.w3.eth.send_raw_transaction(signed.rawTransaction)
+        pending.hashes.append(bytes(tx_hash))
+        pending.last_sent_at = time.monotonic()
+
+    def _bump_fees(self, transaction: Dict) -> Dict:
+        """Augmente les frais d'une transaction pour remplacer la précédente au même nonce"""
+        bumped = dict(transaction)
+        for field in ('gasPrice', 'maxFeePerGas', 'maxPriorityFeePerGas'):
+            if field in bumped:
+                bumped[field] = bumped[field] * (100 + self.bump_percent) // 100 + 1
+        return bumped
+
+    async def _find_receipt(self, pending: PendingTransaction) -> Optional[Dict]:
+        for tx_hash in pending.hashes:
+            try:
+                return await self.w3.eth.get_transaction_receipt(tx_hash)
+            except TransactionNotFound:
+                continue
+        return None
+
+    async def _check(self, pending: PendingTransaction, confirmed_nonce: int):
+        receipt = await self._find_receipt(pending)
+        if receipt is not None:
+            del self.pending[pending.nonce]
+            self.metrics.set_gauge('queue_depth', 'tx_pending', len(self.pending))
+            if not pending.future.done():
+                pending.future.set_result(receipt)
+            return
+
+        now = time.monotonic()
+        if confirmed_nonce > pending.nonce:
+            # Le nonce est consommé mais par aucune de nos versions : transaction remplacée
+            del self.pending[pending.nonce]
+            self.metrics.set_gauge('queue_depth', 'tx_pending', len(self.pending))
+            if not pending.future.done():
+                pending.future.set_exception(RuntimeError(f"Transaction au nonce {pending.nonce} remplacée"))
+        elif now - pending.first_sent_at > self.timeout:
+            del self.pending[pending.nonce]
+            self.metrics.set_gauge('queue_depth', 'tx_pending', len(self.pending))
+            await self.nonces.sync()
+            if not pending.future.done():
+                pending.future.set_exception(TimeoutError(f"Transaction au nonce {pending.nonce} abandonnée"))
+        elif now - pending.last_sent_at > self.replace_after and pending.bumps < self.max_bumps:
+            pending.transaction = self._bump_fees(pending.transaction)
+            pending.bumps += 1
+            try:
+                await self._broadcast(pending)
+            except Exception as e:
+                print(f"Erreur lors du remplacement de la transaction au nonce {pending.nonce}: {e}")
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            if not self.pending:
+                continue
+            try:
+                confirmed_nonce = await self.w3.eth.get_transaction_count(self.account.address, 'latest')
+                await asyncio.gather(*(
+                    self._check(pending, confirmed_nonce) for pending in list(self.pending.values())
+                ))
+            except Exception as e:
+                print(f"Erreur lors de la surveillance des transactions: {e}")
@@ -0,0 +1,115 @@
+"""
+Préparation des transactions d'arbitrage hors du chemin critique.
+
+Tout ce qui ne dépend pas des montants est calculé à l'avance : calldata du swap dont seuls
+les mots de montants et d'échéance sont remplacés, estimation de gas par route rafraîchie en
+tâche de fond. Au moment de la décision il ne reste qu'à compléter, signer et diffuser.
+"""
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import time
+from .fast_calls import SWAP_EXACT_TOKENS_SELECTOR, WORD, encode_uint
+from .metrics import METRICS, Metrics
+
+# Route d'un arbitrage : (DEX, token vendu, token reçu) ou, pour un cycle, (DEX, token, ..., token de départ)
+Route = Tuple[str, ...]
+
+
+def _encode_address(address: str) -> bytes:
+    return bytes(12) + bytes.fromhex(address[2:])
+
+
+class SwapTemplate:
+    """
+    Calldata de swapExactTokensForTokens(amountIn, amountOutMin, path, to, deadline) pour un
+    routeur, un chemin et un destinataire fixés. La disposition ABI est figée : amountIn et
+    amountOutMin occupent les deux premiers mots, deadline le cinquième, le reste ne change pas.
+    """
+
+    __slots__ = ('router', 'path', 'middle', 'suffix')
+
+    def __init__(self, router: str, path: List[str], recipient: str):
+        self.router = router
+        self.path = list(path)
+        # Offset du tableau path (5 mots de tête), puis destinataire
+        self.middle = encode_uint(5 * WORD) + _encode_address(recipient)
+        self.suffix = encode_uint(len(self.path)) + b''.join(_encode_address(token) for token in self.path)
+
+    def encode(self, amount_in: int, amount_out_min: int, deadline: int) -> bytes:
+        return b''.join((
+            SWAP_EXACT_TOKENS_SELECTOR,
+            encode_uint(amount_in),
+            encode_uint(amount_out_min),
+            self.middle,
+            encode_uint(deadline),
+            self.suffix
+        ))
+
+
+class GasEstimateCache:
+    """
+    Estimations de gas par route, marge de sécurité incluse. Une route inconnue ou trop
+    ancienne est estimée sur le chemin critique ; ensuite une tâche de fond la ré-estime avec
+    la dernière transaction vue avant qu'elle n'expire.
+    """
+
+    def __init__(self, w3, max_age: float = 120.0, margin: float = 1.2, metrics: Optional[Metrics] = None):
+        self.w3 = w3
+        self.max_age = max_age
+        self.margin = margin
+        self.metrics = metrics or METRICS
+        # Route -> (gas, instant de l'estimation, transaction estimée)
+        self.entries: Dict[Route, Tuple[int, float, Dict]] = {}
+        self.refresher: Optional[asyncio.Task] = None
+
+    async def _estimate(self, route: Route, transaction: Dict) -> int:
+        gas = int(await self.w3.eth.estimate_gas(transaction) * self.margin)
+        self.entries[route] = (gas, time.monotonic(), transaction)
+        return gas
+
+    async def get(self, route: Route, transaction: Dict) -> int:
+        """Retourne le gas de la route, estimé seulement si le cache n'a pas de valeur récente"""
+        entry = self.entries.get(route)
+        if entry is not None and time.monotonic() - entry[1] < self.max_age:
+            self.metrics.inc('gas_estimates_total', 'hit')
+            # La transaction la plus récente sert au prochain rafraîchissement
+            self.entries[route] = (entry[0], entry[1], transaction)
+            return entry[0]
+        self.metrics.inc('gas_estimates_total', 'miss')
+        return await self._estimate(route, transaction)
+
+    async def refresh(self):
+        """Ré-estime les routes arrivées à la moitié de leur durée de validité"""
+        now = time.monotonic()
+        stale = [
+            (route, transaction) for route, (_, estimated_at, transaction) in self.entries.items()
+            if now - estimated_at > self.max_age / 2
+        ]
+        results = await asyncio.gather(
+            *(self._estimate(route, transaction) for route, transaction in stale), return_exceptions=True
+        )
+        for (route, _), result in zip(stale, results):
+            if isinstance(result, Exception):
+                # Une estimation qui échoue (réserves déplacées, solde insuffisant) n'invalide pas l'ancienne
+                print(f"Erreur lors du rafraîchissement du gas de {route}: {result}")
+            else:
+                self.metrics.inc('gas_estimates_total', 'refresh')
+
+    async def _run(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            await self.refresh()
+
+    def start(self, interval: Optional[float] = None):
+        """Démarre le rafraîchissement en tâche de fond"""
+        if self.refresher is None or self.refresher.done():
+            self.refresher = asyncio.create_task(self._run(interval or self.max_age / 4))
+
+    async def stop(self):
+        if self.refresher is not None:
+            self.refresher.cancel()
+            try:
+                await self.refresher
+            except asyncio.CancelledError:
+                pass
+            self.refresher = None
@@ -0,0 +1,95 @@
+from typing import Dict, List, Optional, Tuple
+import json
+import os
+from eth_utils import keccak
+from web3 import Web3
+from .amm_math import FEE_DENOMINATOR, FEE_NUMERATOR
+from .config import (
+    SUSHISWAP_FACTORY, SUSHISWAP_INIT_CODE_HASH, SUSHISWAP_ROUTER,
+    UNISWAP_FACTORY, UNISWAP_INIT_CODE_HASH, UNISWAP_ROUTER, VENUES_PATH
+)
+
+
+class Venue:
+    """DEX fork d'UniswapV2 : factory, routeur, frais de swap et hash du code de création des paires"""
+
+    __slots__ = ('name', 'factory', 'router', 'fee_numerator', 'fee_denominator', 'init_code_hash')
+
+    def __init__(
+        self,
+        name: str,
+        factory: str,
+        router: str,
+        fee_numerator: int = FEE_NUMERATOR,
+        fee_denominator: int = FEE_DENOMINATOR,
+        init_code_hash: Optional[str] = None
+    ):
+        self.name = name
+        self.factory = Web3.to_checksum_address(factory)
+        self.router = Web3.to_checksum_address(router)
+        self.fee_numerator = fee_numerator
+        self.fee_denominator = fee_denominator
+        self.init_code_hash = init_code_hash
+
+    @property
+    def fee_factor(self) -> float:
+        """Part du montant d'entrée conservée après frais (0.997 pour 0,3 %)"""
+        return self.fee_numerator / self.fee_denominator
+
+    def pair_address(self, token_a: str, token_b: str, checksum: bool = True) -> Optional[str]:
+        """Adresse CREATE2 de la paire token_a/token_b sur ce DEX, calculée sans appel RPC"""
+        if not self.init_code_hash:
+            return None
+        return compute_pair_address(self.factory, self.init_code_hash, token_a, token_b, checksum)
+
+    def to_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Venue':
+        return cls(**{name: data[name] for name in cls.__slots__ if name in data})
+
+    def __repr__(self) -> str:
+        return f"Venue({self.name!r}, fee={self.fee_numerator}/{self.fee_denominator})"
+
+
+def sort_tokens(token_a: str, token_b: str) -> Tuple[str, str]:
+    """Ordre des tokens dans une paire UniswapV2 : la plus petite adresse est token0"""
+    return (token_a, token_b) if int(token_a, 16) < int(token_b, 16) else (token_b, token_a)
+
+
+def compute_pair_address(factory: str, init_code_hash: str, token_a: str, token_b: str, checksum: bool = True) -> str:
+    """
+    Adresse d'une paire déployée par CREATE2 :
+    keccak256(0xff ++ factory ++ keccak256(token0 ++ token1) ++ init_code_hash)[12:]
+    Sans checksum, l'adresse est rendue en minuscules (le checksum coûte plus que le calcul).
+    """
+    token0, token1 = sort_tokens(token_a, token_b)
+    salt = keccak(bytes.fromhex(token0[2:]) + bytes.fromhex(token1[2:]))
+    digest = keccak(b'\xff' + bytes.fromhex(factory[2:]) + salt + bytes.fromhex(init_code_hash[2:]))
+    return Web3.to_checksum_address(digest[12:]) if checksum else '0x' + digest[12:].hex()
+
+
+DEFAULT_VENUES = [
+    Venue('uniswap', UNISWAP_FACTORY, UNISWAP_ROUTER, init_code_hash=UNISWAP_INIT_CODE_HASH),
+    Venue('sushiswap', SUSHISWAP_FACTORY, SUSHISWAP_ROUTER, init_code_hash=SUSHISWAP_INIT_CODE_HASH),
+]
+
+
+def load_venues(path: str = VENUES_PATH) -> List[Venue]:
+    """
+    Uniswap et Sushiswap, complétés par les DEX du fichier JSON donné (liste d'objets
+    name, factory, router et optionnellement fee_numerator, fee_denominator, init_code_hash).
+    Une entrée du fichier portant le nom d'un DEX par défaut le remplace.
+    L'ordre est stable : il fixe l'index de chaque DEX dans les réserves et les opportunités.
+    """
+    venues = {venue.name: venue for venue in DEFAULT_VENUES}
+    if path and os.path.exists(path):
+        try:
+            with open(path, 'r') as f:
+                for data in json.load(f):
+                    venue = Venue.from_dict(data)
+                    venues[venue.name] = venue
+        except Exception as e:
+            print(f"Erreur lors du chargement des DEX depuis {path}: {e}")
+    return list(venues.values())
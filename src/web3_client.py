@@ -1,20 +1,28 @@
-from web3 import Web3
+from web3 import AsyncWeb3
 from dotenv import load_dotenv
 import os
+from .rpc_transport import PooledAsyncProvider
 
 class Web3Client:
     def __init__(self):
         load_dotenv()
         self.alchemy_url = f"https://eth-mainnet.g.alchemy.com/v2/{os.getenv('ALCHEMY_API_KEY')}"
-        self.w3 = Web3(Web3.HTTPProvider(self.alchemy_url))
+        # Endpoints supplémentaires séparés par des virgules, utilisés en secours ou s'ils sont plus rapides
+        extra_urls = [url.strip() for url in os.getenv('RPC_URLS', '').split(',') if url.strip()]
+        self.provider = PooledAsyncProvider(
+            [self.alchemy_url] + extra_urls,
+            requests_per_second=float(os.getenv('RPC_REQUESTS_PER_SECOND', '25')),
+            max_connections=int(os.getenv('RPC_MAX_CONNECTIONS', '32'))
+        )
+        self.w3 = AsyncWeb3(self.provider)
         
-    def check_connection(self):
+    async def check_connection(self):
         """Vérifie la connexion à Ethereum"""
-        return self.w3.is_connected()
+        return await self.w3.is_connected()
         
-    def get_eth_balance(self, address):
+    async def get_eth_balance(self, address):
         """Récupère le solde ETH d'une adresse"""
-        return self.w3.eth.get_balance(address)
+        return await self.w3.eth.get_balance(address)
         
     async def get_gas_price(self):
         """Récupère le prix du gas actuel"""
@@ -22,4 +30,8 @@ class Web3Client:
 
     async def estimate_gas(self, transaction):
         """Estime le gas nécessaire pour une transaction"""
-        return await self.w3.eth.estimate_gas(transaction)
\ No newline at end of file
+        return await self.w3.eth.estimate_gas(transaction)
+
+    async def close(self):
+        """Ferme les connexions HTTP du pool"""
+        await self.provider.close()
\ No newline at end of file
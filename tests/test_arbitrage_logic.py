@@ -0,0 +1,68 @@
+import numpy as np
+from src.arbitrage_logic import ArbitrageLogic, PairUsdPrices
+from src.config import USDT_ADDRESS, WETH_ADDRESS
+from src.metrics import Metrics
+from src.venues import DEFAULT_VENUES
+
+TOKEN = '0x' + '42' * 20
+# WETH/USDT à 2000 puis 2040 USDT : 2 % d'écart entre les deux DEX
+WETH_USDT = [(1000 * 10**18, 2_000_000 * 10**6), (1000 * 10**18, 2_040_000 * 10**6)]
+# TOKEN/WETH (token0 = TOKEN, 18 décimales) à 0,01 puis 0,0102 WETH
+TOKEN_WETH = [(10**6 * 10**18, 10**4 * 10**18), (10**6 * 10**18, 10_200 * 10**18)]
+
+
+def make_logic(min_volume_usdt: float = 0) -> ArbitrageLogic:
+    return ArbitrageLogic(min_volume_usdt, 0.0, Metrics(enabled=False), DEFAULT_VENUES)
+
+
+def test_pair_usd_prices():
+    usd = PairUsdPrices([(WETH_ADDRESS, USDT_ADDRESS), (TOKEN, WETH_ADDRESS), (TOKEN, '0x' + '43' * 20)])
+    prices = usd.prices(2500.0)
+    assert prices[0].tolist() == [2500.0, 1.0]
+    assert np.isnan(prices[1, 0]) and prices[1, 1] == 2500.0
+    assert np.isnan(prices[2]).all()
+    assert usd.valued().tolist() == [True, True, False]
+
+
+def test_profit_and_volume_are_in_usd():
+    logic = make_logic()
+    opportunity = logic.find_arbitrage_opportunity(WETH_USDT, 18, 6, usd_prices=(2000.0, 1.0))
+    expected = opportunity['expected_profit'] / 10**18 * 2000.0
+    assert abs(opportunity['expected_profit_usdt'] - expected) < 1e-9 * expected
+    assert abs(opportunity['volume_usdt'] - opportunity['optimal_amount'] / 10**18 * 2000.0) < 1e-6
+
+    # Sans prix USD du token0, la valorisation passe par le token1 au prix d'achat
+    opportunity = logic.find_arbitrage_opportunity(TOKEN_WETH, 18, 18, usd_prices=(None, 2000.0))
+    expected = opportunity['expected_profit'] / 10**18 * opportunity['buy_price'] * 2000.0
+    assert abs(opportunity['expected_profit_usdt'] - expected) < 1e-9 * expected
+
+
+def test_pair_without_usd_price_is_skipped():
+    logic = make_logic()
+    assert logic.find_arbitrage_opportunity(TOKEN_WETH, 18, 18, usd_prices=(None, None)) is None
+    result = logic.find_arbitrage_opportunities_batch(
+        np.array([TOKEN_WETH, TOKEN_WETH], dtype=np.float64), np.array([18, 18]), np.array([18, 18]),
+        usd_prices=np.array([[np.nan, np.nan], [np.nan, 2000.0]])
+    )
+    assert result['indices'].tolist() == [1]
+
+
+def test_batch_matches_scalar_in_usd():
+    usd_prices = np.array([[2000.0, 1.0], [np.nan, 2000.0]])
+    reserves = np.array([WETH_USDT, TOKEN_WETH], dtype=np.float64)
+    decimals0, decimals1 = np.array([18, 18]), np.array([6, 18])
+    # Seuil de volume en USD : entre les volumes des deux paires
+    volumes = [
+        make_logic().find_arbitrage_opportunity(pair, int(d0), int(d1), usd_prices=tuple(prices))['volume_usdt']
+        for pair, d0, d1, prices in zip([WETH_USDT, TOKEN_WETH], decimals0, decimals1, usd_prices.tolist())
+    ]
+    logic = make_logic(min_volume_usdt=sum(volumes) / 2)
+    result = logic.find_arbitrage_opportunities_batch(reserves, decimals0, decimals1, usd_prices=usd_prices)
+    kept = [i for i in range(2) if volumes[i] >= logic.min_volume_usdt]
+    assert len(kept) == 1
+    assert result['indices'].tolist() == kept
+    for j, i in enumerate(kept):
+        scalar = logic.find_arbitrage_opportunity(
+            [WETH_USDT, TOKEN_WETH][i], int(decimals0[i]), int(decimals1[i]), usd_prices=tuple(usd_prices[i].tolist())
+        )
+        assert abs(result['expected_profit_usdt'][j] - scalar['expected_profit_usdt']) < 1e-6 * scalar['expected_profit_usdt']
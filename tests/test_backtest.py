@@ -0,0 +1,64 @@
+import numpy as np
+from src.arbitrage_logic import ArbitrageLogic
+from src.backtest import Backtester, SyncHistory, SyncHistoryWriter
+from src.config import USDT_ADDRESS, WETH_ADDRESS
+from src.metrics import Metrics
+from src.trading_logic import TradingLogic
+
+# (token0, token1, décimales1, liquidité par pool en unités de token1)
+PAIRS = [
+    ('T0', USDT_ADDRESS, 6, 10_000_000),   # grande pool cotée en USDT
+    ('T1', USDT_ADDRESS, 6, 50_000),       # petite pool cotée en USDT
+    ('T2', WETH_ADDRESS, 18, 500),         # pool moyenne cotée en WETH
+    ('T3', 'T4', 18, 10_000_000),          # aucun prix USD
+]
+
+
+def write_history(directory: str, n_blocks: int = 50) -> SyncHistory:
+    """Chaque bloc décale de 2 % le prix d'une des deux pools de chaque paire"""
+    pairs = [
+        {'token0': token0, 'token1': token1, 'decimals0': 18, 'decimals1': decimals1, 'pools': [f'U{i}', f'S{i}']}
+        for i, (token0, token1, decimals1, _) in enumerate(PAIRS)
+    ]
+    reserve0 = np.repeat([1e6 * 1e18] * len(PAIRS), 2)
+    reserve1 = np.repeat([liquidity * 10.0 ** decimals1 for _, _, decimals1, liquidity in PAIRS], 2)
+    writer = SyncHistoryWriter(directory, pairs)
+    writer.append(np.zeros(len(reserve0)), np.arange(len(reserve0)), reserve0, reserve1)
+    rng = np.random.default_rng(5)
+    for block in range(1, n_blocks + 1):
+        pools = np.arange(len(PAIRS)) * 2 + rng.integers(0, 2, size=len(PAIRS))
+        move = rng.choice([0.98, 1.02], size=len(PAIRS))
+        writer.append(np.full(len(PAIRS), block), pools, reserve0[pools], reserve1[pools] * move)
+    writer.close()
+    return SyncHistory(directory)
+
+
+def make_backtester(min_volume_usdt: float = 0) -> Backtester:
+    logic = ArbitrageLogic(min_volume_usdt, 0.5, metrics=Metrics(enabled=False))
+    trading = TradingLogic(None, None, None, metrics=Metrics(enabled=False))
+    return Backtester(logic, trading, gas_price_gwei=1.0, eth_price_usdt=2000.0)
+
+
+def test_volume_and_profit_are_in_usd(tmp_path):
+    backtester = make_backtester()
+    report = backtester.run(write_history(str(tmp_path)))
+    events = report['events']
+    assert report['unpriced_pairs'] == 1
+    assert set(events['pair'].tolist()) == {0, 1, 2}
+    # Volumes à l'échelle de la liquidité en USD de chaque paire : 10 M, 50 k et 1 M (500 WETH à 2000 USDT)
+    volume = {pair: events['volume_usdt'][events['pair'] == pair].max() for pair in (0, 1, 2)}
+    assert 1e4 < volume[0] < 1e6
+    assert 1 < volume[1] < 1e3
+    assert 1e3 < volume[2] < 1e5
+    assert (events['net_profit_usdt'] < volume[0]).all()
+
+
+def test_volume_threshold_changes_accepted_set(tmp_path):
+    backtester = make_backtester()
+    events = backtester.run(write_history(str(tmp_path)))['events']
+    rows = backtester.sweep(events, [0.5], [0, 1_000, 10_000, 1_000_000])
+    trades = [row['trades'] for row in rows]
+    assert trades[0] > trades[1] > trades[2] > trades[3] == 0
+    # Au-dessus du volume de la petite paire, seules les autres restent acceptées
+    accepted = (events['volume_usdt'] >= 1_000) & (events['net_profit_usdt'] > 0)
+    assert 1 not in set(events['pair'][accepted].tolist())
@@ -0,0 +1,129 @@
+import asyncio
+from src.config import USDC_ADDRESS, WETH_ADDRESS
+from src.engine import ArbitrageEngine
+from src.metrics import Metrics
+from src.reserves import ReserveSnapshot
+from src.scheduler import opportunity_key, opportunity_pools
+from src.snapshot_stream import SnapshotPublisher, send_command
+from src.venues import DEFAULT_VENUES
+
+TOKEN_X = '0x' + '11' * 20
+DECIMALS = {USDC_ADDRESS: 6, WETH_ADDRESS: 18, TOKEN_X: 18}
+# Pool de chaque paire sur le premier DEX
+POOLS = {
+    (USDC_ADDRESS, WETH_ADDRESS): '0x' + 'a1' * 20,
+    (TOKEN_X, WETH_ADDRESS): '0x' + 'a2' * 20,
+    (TOKEN_X, USDC_ADDRESS): '0x' + 'a3' * 20,
+}
+
+
+class StubTokens:
+    def get(self, token):
+        return {'decimals': DECIMALS[token], 'symbol': token[-4:]}
+
+
+class StubFees:
+    async def get(self, block_number=None):
+        return {'base_fee': 10**10, 'gas_price': 2 * 10**10, 'priority_fee': 10**9, 'eth_price_usdt': 2000.0}
+
+
+def fair_reserves(x_usdc_price=1.0):
+    """1 WETH = 2000 USDC = 2000 X ; le pool X/USDC cote X à x_usdc_price USDC"""
+    return {
+        (USDC_ADDRESS, WETH_ADDRESS): (10_000_000 * 10**6, 5_000 * 10**18),
+        (TOKEN_X, WETH_ADDRESS): (10_000_000 * 10**18, 5_000 * 10**18),
+        (TOKEN_X, USDC_ADDRESS): (10_000_000 * 10**18, int(10_000_000 * x_usdc_price) * 10**6),
+    }
+
+
+def make_engine(tmp_path, monkeypatch, reserves):
+    monkeypatch.chdir(tmp_path)
+    engine = ArbitrageEngine(None, private_key=None, venues=DEFAULT_VENUES[:2], metrics=Metrics(enabled=False))
+    engine.pairs = list(POOLS)
+    engine.scanner.token_store = StubTokens()
+    engine.scanner.pair_addresses = [dict(POOLS), {}]
+    engine.trading.fee_oracle = StubFees()
+    engine._index_pools()
+    snapshot = ReserveSnapshot(100, engine.pairs, 2)
+    for i, pair in enumerate(engine.pairs):
+        snapshot.set_reserves(i, 0, *reserves[pair])
+    engine.reserve_cache.seed({POOLS[pair]: reserves[pair] for pair in engine.pairs}, 100, bytes(32))
+    return engine, snapshot
+
+
+def test_cycle_on_one_venue_reaches_the_scheduler(tmp_path, monkeypatch):
+    # X vaut 1 USDC sur X/WETH mais 1,03 USDC sur X/USDC : USDC -> WETH -> X -> USDC
+    engine, snapshot = make_engine(tmp_path, monkeypatch, fair_reserves(1.03))
+
+    async def scenario():
+        cycles = engine._find_cycles(snapshot, None)
+        return cycles, await engine._evaluate_cycles(snapshot, cycles, 2000.0)
+
+    cycles, accepted = asyncio.run(scenario())
+    assert len(cycles) == 1
+    assert len(accepted) == 1
+    opportunity = accepted[0]
+    # Le cycle part du premier token valorisé en USD et y revient
+    assert opportunity['tokens'][0] == opportunity['tokens'][-1] == opportunity['token0']
+    assert opportunity['tokens'][0] in (USDC_ADDRESS, WETH_ADDRESS)
+    assert [hop[0] for hop in opportunity['hops']] == ['uniswap'] * 3
+    assert opportunity['expected_amount_out'] > opportunity['optimal_amount']
+    assert opportunity['net_profit_usdt'] > 0
+
+    # Trois pools verrouillés par le scheduler, et la vérification des prix sur l'instantané passe
+    assert len(opportunity_pools(opportunity)) == 3
+    assert opportunity_key(opportunity)[0] == 'cycle'
+    prices = engine.trading.verify_prices(opportunity, snapshot)
+    assert engine.trading.is_opportunity_still_valid(opportunity, prices)
+    engine.stats.journal.close()
+
+
+def test_cycles_follow_reserve_cache_updates(tmp_path, monkeypatch):
+    engine, snapshot = make_engine(tmp_path, monkeypatch, fair_reserves())
+    cache = engine.reserve_cache
+    x_usdc = POOLS[(TOKEN_X, USDC_ADDRESS)]
+    assert engine._find_cycles(snapshot, None) == []
+
+    # Un Sync sur X/USDC ouvre le cycle : seule la pool modifiée est transmise au graphe
+    reserves = (10_000_000 * 10**18, 10_400_000 * 10**6)
+    changed = cache.apply_logs(101, bytes(32), [{
+        'address': x_usdc, 'data': b''.join(value.to_bytes(32, 'big') for value in reserves), 'logIndex': 0
+    }])
+    cycles = engine._find_cycles(snapshot, changed)
+    assert [set(cycle['pools']) for cycle in cycles] == [set(POOLS.values())]
+
+    # Le retour au prix juste le referme
+    changed = cache.apply_logs(102, bytes(32), [{
+        'address': x_usdc, 'data': b''.join(value.to_bytes(32, 'big') for value in fair_reserves()[(TOKEN_X, USDC_ADDRESS)]),
+        'logIndex': 0
+    }])
+    assert engine._find_cycles(snapshot, changed) == []
+    engine.stats.journal.close()
+
+
+def test_commands_over_snapshot_socket_update_engine(tmp_path, monkeypatch):
+    engine, _ = make_engine(tmp_path, monkeypatch, fair_reserves())
+
+    async def scenario():
+        publisher = SnapshotPublisher(engine.state, port=0, on_command=engine.handle_command)
+        await publisher.start()
+        port = publisher.server.sockets[0].getsockname()[1]
+        try:
+            await send_command({'command': 'add_preferred_token', 'token': TOKEN_X}, port=port)
+            await send_command({'command': 'add_preferred_token', 'token': 'pas une adresse'}, port=port)
+            # Sans clé privée le moteur reste en observation
+            await send_command({'command': 'set_auto_execute', 'enabled': True}, port=port)
+            for _ in range(50):
+                if engine.stats.get_preferred_tokens():
+                    break
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.05)
+        finally:
+            await publisher.stop()
+
+    asyncio.run(scenario())
+    state = engine.state()
+    assert state['preferred_tokens'] == [TOKEN_X.lower()]
+    assert not state['auto_execute']
+    assert state['mode'] == 'observation'
+    engine.stats.journal.close()
@@ -0,0 +1,53 @@
+import asyncio
+from src.fast_calls import encode_uint
+from src.fee_oracle import BlockFeeOracle
+from src.metrics import Metrics
+
+
+class FakeEth:
+    """Réserves WETH/USDT par bloc servies par eth_call, frais constants"""
+
+    def __init__(self, reserves_by_block):
+        self.reserves_by_block = reserves_by_block
+        self.calls = []
+
+    async def call(self, transaction, block_identifier):
+        self.calls.append(block_identifier)
+        reserve0, reserve1 = self.reserves_by_block[block_identifier]
+        return encode_uint(reserve0) + encode_uint(reserve1) + encode_uint(0)
+
+    async def fee_history(self, block_count, newest_block, percentiles):
+        return {'baseFeePerGas': [10 * 10**9, 10 * 10**9], 'reward': [[10**9]]}
+
+
+class FakeWeb3:
+    def __init__(self, reserves_by_block):
+        self.eth = FakeEth(reserves_by_block)
+
+
+class StaticSource:
+    def __init__(self, block_number, reserves):
+        self.block_number = block_number
+        self.reserves = reserves
+
+    def get(self, pair_address):
+        return self.reserves
+
+
+def test_eth_price_uses_source_only_at_its_block():
+    async def scenario():
+        # 1000 WETH contre 2 000 000 USDT au bloc 100, 2 500 000 USDT au bloc 101
+        w3 = FakeWeb3({100: (1000 * 10**18, 2_000_000 * 10**6), 101: (1000 * 10**18, 2_500_000 * 10**6)})
+        source = StaticSource(101, (1000 * 10**18, 2_500_000 * 10**6))
+        oracle = BlockFeeOracle(w3, reserve_source=source, metrics=Metrics(enabled=False))
+
+        fees = await oracle.get(101)
+        assert fees['eth_price_usdt'] == 2500.0
+        assert w3.eth.calls == []
+
+        # Bloc antérieur à celui de la source : lecture figée sur le bloc demandé
+        fees = await oracle.get(100)
+        assert fees['eth_price_usdt'] == 2000.0
+        assert w3.eth.calls == [100]
+
+    asyncio.run(scenario())
@@ -0,0 +1,243 @@
+import asyncio
+from web3 import AsyncWeb3
+from benchmarks.mock_rpc import MockRpcServer
+from src.metrics import Metrics
+from src.reserve_cache import SYNC_TOPIC, ReserveCache
+from src.rpc_transport import PooledAsyncProvider
+
+POOL_A = '0x' + 'aa' * 20
+POOL_B = '0x' + 'bb' * 20
+UNTRACKED = '0x' + 'cc' * 20
+
+
+def block_hash(number, fork=0):
+    return '0x' + f'{fork:02x}{number:062x}'
+
+
+def sync_log(address, reserve0, reserve1, log_index, number, fork):
+    return {
+        'address': address,
+        'topics': [SYNC_TOPIC],
+        'data': '0x' + f'{reserve0:064x}{reserve1:064x}',
+        'blockNumber': hex(number),
+        'blockHash': block_hash(number, fork),
+        'logIndex': hex(log_index),
+        'transactionHash': '0x' + f'{number:032x}{log_index:032x}',
+        'transactionIndex': '0x0',
+        'removed': False
+    }
+
+
+def decoded_log(address, reserve0, reserve1, log_index):
+    """Événement Sync tel que le retourne web3 (ou un abonnement websocket)"""
+    return {'address': address, 'data': bytes.fromhex(f'{reserve0:064x}{reserve1:064x}'), 'logIndex': log_index}
+
+
+class StubChain:
+    """Chaîne servie par MockRpcServer : en-têtes de blocs et événements Sync prédéfinis"""
+
+    def __init__(self):
+        # Numéro -> bloc canonique ; les blocs orphelins restent consultables par leur hash
+        self.canonical = {}
+        self.by_hash = {}
+        # Numéro -> nombre de réponses restantes avec un parentHash incohérent (endpoint en retard)
+        self.bad_parents = {}
+
+    def add_block(self, number, sync_logs=(), fork=0, parent_fork=None):
+        parent_fork = fork if parent_fork is None else parent_fork
+        block = {
+            'number': number,
+            'hash': block_hash(number, fork),
+            'parentHash': block_hash(number - 1, parent_fork),
+            'logs': [sync_log(address, r0, r1, i, number, fork) for i, (address, r0, r1) in enumerate(sync_logs)]
+        }
+        self.canonical[number] = block
+        self.by_hash[block['hash']] = block
+
+    def eth_get_block_by_number(self, params):
+        block = self.canonical[int(params[0], 16)]
+        parent = block['parentHash']
+        if self.bad_parents.get(block['number'], 0) > 0:
+            self.bad_parents[block['number']] -= 1
+            parent = block_hash(block['number'] - 1, fork=0xee)
+        return {
+            'number': hex(block['number']),
+            'hash': block['hash'],
+            'parentHash': parent,
+            'timestamp': hex(1_700_000_000 + 12 * block['number']),
+            'gasLimit': hex(30_000_000),
+            'gasUsed': hex(15_000_000),
+            'transactions': []
+        }
+
+    def eth_get_logs(self, params):
+        query = params[0]
+        addresses = {address.lower() for address in query['address']}
+        block = self.by_hash[query['blockHash']]
+        return [log for log in block['logs'] if log['address'] in addresses and log['topics'][0] in query['topics']]
+
+    def server(self):
+        return MockRpcServer({
+            'eth_getBlockByNumber': self.eth_get_block_by_number,
+            'eth_getLogs': self.eth_get_logs,
+        })
+
+
+def seeded_cache(w3=None, max_checkpoints=64):
+    cache = ReserveCache(w3, max_checkpoints=max_checkpoints, metrics=Metrics(enabled=False))
+    cache.seed({POOL_A: (1000, 2000), POOL_B: (10, 20)}, 100, bytes.fromhex(block_hash(100)[2:]))
+    return cache
+
+
+def run_with_chain(chain, scenario):
+    """Exécute scenario(w3) contre la chaîne servie en local"""
+    server = chain.server()
+    url = server.start_in_thread()
+
+    async def main():
+        provider = PooledAsyncProvider([url], requests_per_second=10**6)
+        try:
+            return await scenario(AsyncWeb3(provider))
+        finally:
+            await provider.close()
+
+    try:
+        return asyncio.run(main())
+    finally:
+        server.stop_thread()
+
+
+def test_apply_logs_keeps_last_sync_and_ignores_untracked_pools():
+    cache = seeded_cache()
+    logs = [decoded_log(POOL_A, 1200, 1700, 1), decoded_log(POOL_A, 1100, 1800, 0), decoded_log(UNTRACKED, 5, 5, 2)]
+    changed = cache.apply_logs(101, bytes.fromhex(block_hash(101)[2:]), logs)
+
+    assert changed == {POOL_A}
+    # Les événements sont appliqués dans l'ordre des logIndex : le dernier Sync donne les réserves
+    assert cache.get(POOL_A) == (1200, 1700)
+    assert cache.get(POOL_B) == (10, 20)
+    assert cache.get(UNTRACKED) is None
+    assert cache.block_number == 101
+
+
+def test_rollback_last_restores_previous_block():
+    cache = seeded_cache()
+    cache.apply_logs(101, bytes.fromhex(block_hash(101)[2:]), [decoded_log(POOL_B, 11, 19, 0)])
+
+    assert cache.rollback_last() == {POOL_B}
+    assert cache.get(POOL_B) == (10, 20)
+    assert cache.block_number == 100
+    assert cache.block_hash == bytes.fromhex(block_hash(100)[2:])
+    assert not cache.checkpoints
+
+
+def test_sync_to_applies_sync_logs_from_rpc():
+    chain = StubChain()
+    chain.add_block(100)
+    chain.add_block(101, [(POOL_A, 1100, 1900), (UNTRACKED, 1, 1)])
+    chain.add_block(102)
+    chain.add_block(103, [(POOL_B, 12, 18), (POOL_A, 1050, 1950)])
+
+    async def scenario(w3):
+        cache = seeded_cache(w3)
+        changed = await cache.sync_to(103)
+        return cache, changed
+
+    cache, changed = run_with_chain(chain, scenario)
+    assert changed == {POOL_A, POOL_B}
+    assert cache.get(POOL_A) == (1050, 1950)
+    assert cache.get(POOL_B) == (12, 18)
+    assert cache.block_number == 103
+    assert len(cache.checkpoints) == 3
+
+
+def test_reorg_rolls_back_to_common_ancestor():
+    chain = StubChain()
+    chain.add_block(100)
+    chain.add_block(101, [(POOL_A, 1100, 1900)])
+    chain.add_block(102, [(POOL_B, 12, 18)])
+    chain.add_block(103, [(POOL_A, 1200, 1800)])
+
+    async def scenario(w3):
+        cache = seeded_cache(w3)
+        await cache.sync_to(103)
+        # Les blocs 102 et 103 deviennent orphelins : la branche canonique repart du bloc 101
+        chain.add_block(102, [(POOL_A, 1150, 1850)], fork=1, parent_fork=0)
+        chain.add_block(103, fork=1)
+        chain.add_block(104, fork=1)
+        changed = await cache.sync_to(104)
+        return cache, changed
+
+    cache, changed = run_with_chain(chain, scenario)
+    # POOL_B, modifiée seulement sur la branche orpheline, retrouve ses réserves du bloc 101
+    assert changed == {POOL_A, POOL_B}
+    assert cache.get(POOL_A) == (1150, 1850)
+    assert cache.get(POOL_B) == (10, 20)
+    assert cache.block_number == 104
+    assert cache.block_hash == bytes.fromhex(block_hash(104, 1)[2:])
+    assert not cache.needs_reseed
+
+
+def test_reorg_deeper_than_checkpoints_requires_reseed():
+    chain = StubChain()
+    chain.add_block(100)
+    chain.add_block(101, [(POOL_A, 1100, 1900)])
+    chain.add_block(102, [(POOL_B, 12, 18)])
+    chain.add_block(103)
+
+    async def scenario(w3):
+        cache = seeded_cache(w3, max_checkpoints=2)
+        await cache.sync_to(103)
+        # Le bloc 101 est remplacé, mais seuls les checkpoints des blocs 102 et 103 sont conservés
+        chain.add_block(101, fork=1, parent_fork=0)
+        chain.add_block(102, fork=1)
+        chain.add_block(103, fork=1)
+        chain.add_block(104, fork=1)
+        await cache.sync_to(104)
+        return cache
+
+    cache = run_with_chain(chain, scenario)
+    assert cache.needs_reseed
+    # Le cache s'arrête au plus ancien checkpoint au lieu d'appliquer la nouvelle branche
+    assert cache.block_number == 101
+    assert not cache.checkpoints
+
+
+def test_inconsistent_parent_once_is_retried():
+    chain = StubChain()
+    chain.add_block(100)
+    chain.add_block(101, [(POOL_A, 1100, 1900)])
+    chain.add_block(102, [(POOL_B, 12, 18)])
+    # Le premier en-tête du bloc 102 annonce un parent inconnu, comme un endpoint pas encore à jour
+    chain.bad_parents[102] = 1
+
+    async def scenario(w3):
+        cache = seeded_cache(w3)
+        changed = await cache.sync_to(102)
+        return cache, changed
+
+    cache, changed = run_with_chain(chain, scenario)
+    assert changed == {POOL_A, POOL_B}
+    assert cache.get(POOL_B) == (12, 18)
+    assert cache.block_number == 102
+    assert not cache.needs_reseed
+
+
+def test_persistently_inconsistent_parent_requires_reseed():
+    chain = StubChain()
+    chain.add_block(100)
+    chain.add_block(101, [(POOL_A, 1100, 1900)])
+    chain.bad_parents[101] = 100
+
+    async def scenario(w3):
+        cache = ReserveCache(w3, max_reorg_retries=3, metrics=Metrics(enabled=False))
+        cache.seed({POOL_A: (1000, 2000)}, 100, bytes.fromhex(block_hash(100)[2:]))
+        await cache.sync_to(101)
+        return cache
+
+    cache = run_with_chain(chain, scenario)
+    # Le nombre de tentatives est borné : le cache demande une réinitialisation au lieu de boucler
+    assert cache.needs_reseed
+    assert chain.bad_parents[101] == 100 - 4
+    assert cache.block_number == 100
+    assert cache.get(POOL_A) == (1000, 2000)
@@ -0,0 +1,30 @@
+import asyncio
+from web3 import AsyncWeb3
+from benchmarks.mock_rpc import MockRpcServer
+from src.metrics import Metrics
+from src.rpc_transport import PooledAsyncProvider
+
+
+def test_pinned_requests_stay_on_one_endpoint():
+    servers = [MockRpcServer(), MockRpcServer()]
+    urls = [server.start_in_thread() for server in servers]
+
+    async def scenario():
+        provider = PooledAsyncProvider(urls, requests_per_second=10**6, metrics=Metrics(enabled=False))
+        w3 = AsyncWeb3(provider)
+        try:
+            with provider.pinned():
+                await w3.eth.block_number
+                # Requêtes concurrentes lancées depuis le bloc : même endpoint, sans mutualisation
+                await asyncio.gather(*(w3.eth.block_number for _ in range(4)))
+                await w3.eth.gas_price
+        finally:
+            await provider.close()
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        for server in servers:
+            server.stop_thread()
+    counts = sorted(server.calls['eth_blockNumber'] + server.calls['eth_gasPrice'] for server in servers)
+    assert counts == [0, 6]
@@ -0,0 +1,73 @@
+import asyncio
+from src.metrics import Metrics
+from src.scheduler import OpportunityScheduler
+
+
+class ControlledTrading:
+    """Exécutions qui ne se terminent que lorsque le test libère leur événement"""
+
+    def __init__(self):
+        self.executed = []
+        self.release = {}
+
+    async def execute_opportunity(self, opportunity, snapshot=None):
+        self.executed.append(opportunity)
+        event = self.release.setdefault(opportunity['token0'], asyncio.Event())
+        await event.wait()
+        return {'success': True}
+
+
+def opportunity(token0, buy_venue, sell_venue, net_profit_usdt, block_number):
+    return {
+        'token0': token0, 'token1': 'USDT', 'buy_venue': buy_venue, 'sell_venue': sell_venue,
+        'net_profit_usdt': net_profit_usdt, 'block_number': block_number
+    }
+
+
+def test_blocked_entry_expires_on_empty_blocks():
+    async def scenario():
+        trading = ControlledTrading()
+        metrics = Metrics()
+        scheduler = OpportunityScheduler(trading, max_in_flight=2, max_age_blocks=2, metrics=metrics)
+        # Même paire dans les deux sens : la seconde attend que les pools de la première se libèrent
+        scheduler.submit([
+            opportunity('WETH', 'uniswap', 'sushiswap', 10.0, 100),
+            opportunity('WETH', 'sushiswap', 'uniswap', 5.0, 100)
+        ], block_number=100)
+        await asyncio.sleep(0)
+        assert [o['buy_venue'] for o in trading.executed] == ['uniswap']
+        assert len(scheduler) == 1
+
+        # Blocs sans opportunité : l'horloge avance quand même
+        for block_number in range(101, 104):
+            scheduler.submit([], block_number=block_number)
+        assert scheduler.block_number == 103
+        assert len(scheduler) == 0
+
+        # La fin de l'exécution en vol ne relance pas l'entrée périmée
+        trading.release['WETH'].set()
+        await asyncio.sleep(0.01)
+        assert [o['buy_venue'] for o in trading.executed] == ['uniswap']
+        assert not scheduler.tasks
+        assert metrics.counters['scheduler_events_total']['stale'] == 1
+        await scheduler.close()
+
+    asyncio.run(scenario())
+
+
+def test_blocked_entry_runs_while_fresh():
+    async def scenario():
+        trading = ControlledTrading()
+        scheduler = OpportunityScheduler(trading, max_in_flight=2, max_age_blocks=2, metrics=Metrics())
+        scheduler.submit([
+            opportunity('WETH', 'uniswap', 'sushiswap', 10.0, 100),
+            opportunity('WETH', 'sushiswap', 'uniswap', 5.0, 100)
+        ], block_number=100)
+        await asyncio.sleep(0)
+        scheduler.submit([], block_number=102)
+        trading.release['WETH'].set()
+        await asyncio.sleep(0.01)
+        assert [o['buy_venue'] for o in trading.executed] == ['uniswap', 'sushiswap']
+        await scheduler.close()
+
+    asyncio.run(scenario())
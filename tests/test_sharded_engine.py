@@ -0,0 +1,58 @@
+import asyncio
+from multiprocessing import shared_memory
+import numpy as np
+import pytest
+from src.arbitrage_logic import ArbitrageLogic, PairUsdPrices
+from src.metrics import Metrics
+from src.sharded_engine import ShardedEngine
+from src.venues import DEFAULT_VENUES
+from benchmarks.bench_arbitrage_batch import generate_pairs
+from benchmarks.bench_sharded import ETH_PRICE_USDT, generate_blocks, make_pairs
+
+
+def expected_candidates(logic, reserves, decimals0, decimals1, pairs, touched, block_number):
+    """Calcul exact de toutes les paires modifiées, dans le processus du test"""
+    usd_prices = PairUsdPrices(pairs).prices(ETH_PRICE_USDT)
+    found = {}
+    for i in touched:
+        opportunity = logic.find_arbitrage_opportunity(
+            [(int(r0), int(r1)) for r0, r1 in reserves[i]], int(decimals0[i]), int(decimals1[i]),
+            block_number, tuple(usd_prices[i].tolist())
+        )
+        if opportunity is not None and opportunity['expected_profit_usdt'] > 0:
+            found[i] = opportunity['expected_profit_usdt']
+    return found
+
+
+def test_shards_screen_shared_reserves_like_a_single_process():
+    reserves, decimals0, decimals1 = generate_pairs(300, 2)
+    blocks = generate_blocks(reserves, 3, changed=0.3)
+    pairs = make_pairs(len(decimals0))
+    logic = ArbitrageLogic(25000, 1.0, Metrics(enabled=False), DEFAULT_VENUES[:2])
+
+    async def scenario():
+        engine = ShardedEngine(
+            workers=3, min_volume_usdt=25000, min_profit_percent=1.0,
+            venues=DEFAULT_VENUES[:2], metrics=Metrics(enabled=False)
+        )
+        engine.start(pairs, zip(decimals0.tolist(), decimals1.tolist()))
+        name = engine.shared.name
+        current = np.zeros_like(reserves)
+        try:
+            for block_number, updates in enumerate(blocks):
+                candidates = await engine.evaluate(block_number, updates, 0.0, ETH_PRICE_USDT)
+                for i, venue, reserve0, reserve1 in updates:
+                    current[i, venue] = (reserve0, reserve1)
+                touched = sorted({update[0] for update in updates})
+                expected = expected_candidates(logic, current, decimals0, decimals1, pairs, touched, block_number)
+                assert {c['pair_index']: c['expected_profit_usdt'] for c in candidates} == expected
+                # Marques effacées par les processus : seules les paires du bloc suivant seront filtrées
+                assert not engine.dirty.any()
+        finally:
+            engine.stop()
+        return name
+
+    name = asyncio.run(scenario())
+    # stop() libère le segment partagé
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=name)
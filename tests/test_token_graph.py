@@ -0,0 +1,104 @@
+import random
+from src.token_graph import TokenGraph
+from src.venues import Venue
+
+
+def token(i: int) -> str:
+    return f"0x{i:040x}"
+
+
+def pool(i: int) -> str:
+    return f"0x{i + 10**6:040x}"
+
+
+def consistent_graph(n_tokens: int = 60, n_pools: int = 400, seed: int = 3):
+    """Réserves alignées sur un prix de référence par token, bruit inférieur aux frais : aucun cycle profitable"""
+    rng = random.Random(seed)
+    prices = [rng.uniform(0.01, 1000) for _ in range(n_tokens)]
+    graph, reserves, seen = TokenGraph(), {}, set()
+    while len(reserves) < n_pools:
+        a, b = rng.randrange(n_tokens), rng.randrange(n_tokens)
+        if a == b or (a, b) in seen or (b, a) in seen:
+            continue
+        seen.add((a, b))
+        address = pool(len(reserves))
+        liquidity = rng.uniform(1e3, 1e6)
+        reserves[address] = (int(liquidity / prices[a] * 1e18), int(liquidity / prices[b] * rng.uniform(0.999, 1.001) * 1e18))
+        graph.add_pool(address, token(a), token(b), reserves[address])
+    return graph, reserves, prices
+
+
+def cycle_pools(cycles):
+    return {frozenset(cycle['pools']) for cycle in cycles}
+
+
+def test_consistent_graph_has_no_cycle():
+    graph, _, _ = consistent_graph()
+    assert graph.find_cycles() == []
+
+
+def test_injected_triangle_is_found():
+    graph, _, prices = consistent_graph()
+    a, b, c = 100, 101, 102
+    # A -> B -> C au prix juste, C -> A avec 3 % de A en trop
+    triangle = {
+        pool(9001): (token(a), token(b), (10**21, 10**21)),
+        pool(9002): (token(b), token(c), (10**21, 10**21)),
+        pool(9003): (token(a), token(c), (10**21, int(10**21 * 0.97))),
+    }
+    for address, (token0, token1, reserves) in triangle.items():
+        graph.add_pool(address, token0, token1, reserves)
+
+    cycles = graph.find_cycles()
+    assert cycle_pools(cycles) == {frozenset(triangle)}
+    assert cycles[0]['tokens'][0] == cycles[0]['tokens'][-1]
+    assert 2.0 < cycles[0]['profit_percent'] < 3.1
+
+
+def test_injected_four_hop_cycle_is_found():
+    graph, _, _ = consistent_graph()
+    square = [pool(9101), pool(9102), pool(9103), pool(9104)]
+    tokens = [token(200), token(201), token(202), token(203)]
+    for i, address in enumerate(square):
+        reserve1 = int(10**21 * 1.05) if i == 3 else 10**21
+        graph.add_pool(address, tokens[i], tokens[(i + 1) % 4], (10**21, reserve1))
+
+    assert graph.find_cycles(min_hops=3, max_hops=3) == []
+    assert cycle_pools(graph.find_cycles(min_hops=4, max_hops=4)) == {frozenset(square)}
+
+
+def test_incremental_search_matches_full_search():
+    graph, reserves, _ = consistent_graph()
+    rng = random.Random(11)
+    changed = {}
+    for address in rng.sample(sorted(reserves), 40):
+        reserve0, reserve1 = reserves[address]
+        changed[address] = (reserve0, int(reserve1 * rng.uniform(0.95, 1.05)))
+
+    incremental = graph.update_and_find_cycles(changed)
+    full = graph.find_cycles()
+    assert incremental
+    # Avant le bloc aucun cycle n'existait : tous les cycles passent par un pool modifié
+    assert cycle_pools(incremental) == cycle_pools(full)
+    for cycle in full:
+        assert set(cycle['pools']) & set(changed)
+
+
+def test_edge_weight_uses_pool_venue_fee():
+    cheap = Venue('cheap', token(1), token(2), fee_numerator=9975, fee_denominator=10000)
+    triangle = [
+        (pool(1), token(10), token(11), (10**21, 10**21)),
+        (pool(2), token(11), token(12), (10**21, 10**21)),
+        (pool(3), token(10), token(12), (10**21, int(10**21 * 0.9925))),
+    ]
+    default_graph, cheap_graph = TokenGraph(), TokenGraph()
+    for address, token0, token1, reserves in triangle:
+        default_graph.add_pool(address, token0, token1, reserves)
+        cheap_graph.add_pool(address, token0, token1, reserves, cheap)
+
+    # 0,75 % d'écart : absorbé par trois frais de 0,3 %, profitable avec trois frais de 0,25 %
+    assert default_graph.find_cycles() == []
+    assert cycle_pools(cheap_graph.find_cycles()) == {frozenset(address for address, *_ in triangle)}
+    # Une mise à jour des réserves conserve les frais du pool
+    cheap_graph.update_pool(pool(3), (10**21, 10**21))
+    assert cheap_graph.find_cycles() == []
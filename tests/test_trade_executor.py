@@ -0,0 +1,86 @@
+import asyncio
+from hexbytes import HexBytes
+from web3 import AsyncWeb3
+from src.metrics import Metrics
+from src.rpc_transport import PooledAsyncProvider
+from src.trade_executor import TRANSFER_TOPIC, TradeExecutor
+
+TOKEN0 = '0x' + '01' * 20
+TOKEN1 = '0x' + '02' * 20
+POOL = '0x' + 'a1' * 20
+
+
+class StubFees:
+    async def get(self, block_number=None):
+        return {'base_fee': 10**10, 'gas_price': 2 * 10**10, 'priority_fee': 10**9, 'eth_price_usdt': 2000.0}
+
+
+class MinedTransaction:
+    def __init__(self, receipt):
+        self.future = asyncio.get_running_loop().create_future()
+        self.future.set_result(receipt)
+
+
+def transfer_log(token, sender, recipient, amount):
+    return {
+        'address': token,
+        'topics': [HexBytes(TRANSFER_TOPIC), HexBytes(bytes(12) + bytes.fromhex(sender[2:])), HexBytes(bytes(12) + bytes.fromhex(recipient[2:]))],
+        'data': HexBytes(amount.to_bytes(32, 'big'))
+    }
+
+
+def run_execution(opportunity, logs):
+    async def scenario():
+        provider = PooledAsyncProvider(['http://127.0.0.1:1'], requests_per_second=10**6)
+        executor = TradeExecutor(AsyncWeb3(provider), '0x' + '11' * 32, Metrics(enabled=False), fee_oracle=StubFees())
+        receipt = {
+            'status': 1, 'transactionHash': HexBytes(b'\x01' * 32), 'gasUsed': 200_000,
+            'effectiveGasPrice': 2 * 10**10, 'logs': logs(executor.account.address)
+        }
+
+        async def submit(_):
+            return MinedTransaction(receipt)
+
+        executor.submit_arbitrage = submit
+        try:
+            return await executor.execute_arbitrage(opportunity)
+        finally:
+            await provider.close()
+
+    return asyncio.run(scenario())
+
+
+def test_pair_trade_books_no_profit_for_the_single_leg():
+    opportunity = {
+        'token0': TOKEN0, 'token1': TOKEN1, 'buy_venue': 'sushiswap', 'sell_venue': 'uniswap',
+        'optimal_amount': 10**18, 'expected_intermediate_amount': 2000 * 10**6,
+        'expected_profit_usdt': 25.0, 'block_number': 100
+    }
+    result = run_execution(opportunity, lambda account: [
+        transfer_log(TOKEN0, account, POOL, 10**18),
+        transfer_log(TOKEN1, POOL, account, 1990 * 10**6)
+    ])
+
+    assert result['success']
+    # Le rachat n'est pas soumis : le profit attendu n'est pas comptabilisé, le gas payé l'est
+    assert result['profit_usdt'] == 0.0
+    assert result['amount_received'] == 1990 * 10**6
+    assert abs(result['gas_cost_usdt'] - 200_000 * 2 * 10**10 * 2000.0 / 1e18) < 1e-9
+
+
+def test_cycle_profit_comes_from_receipt_transfers():
+    opportunity = {
+        'token0': TOKEN0, 'token1': TOKEN1, 'tokens': [TOKEN0, TOKEN1, TOKEN0], 'hops': [], 'venue': 'uniswap',
+        'optimal_amount': 1000 * 10**6, 'expected_amount_out': 1030 * 10**6,
+        'expected_profit_usdt': 30.0, 'token_price_usdt': 1e-6, 'block_number': 100
+    }
+    result = run_execution(opportunity, lambda account: [
+        transfer_log(TOKEN0, account, POOL, 1000 * 10**6),
+        # Un Transfer vers un autre compte n'est pas compté
+        transfer_log(TOKEN0, POOL, '0x' + 'ee' * 20, 7 * 10**6),
+        transfer_log(TOKEN0, POOL, account, 1012 * 10**6)
+    ])
+
+    assert result['success']
+    assert abs(result['profit_usdt'] - 12.0) < 1e-9
+    assert result['amount_received'] == 1012 * 10**6
@@ -0,0 +1,27 @@
+from src.config import USDC_ADDRESS, USDT_ADDRESS, WETH_ADDRESS
+from src.venues import DEFAULT_VENUES, compute_pair_address
+
+# Paires déployées sur mainnet : une constante init_code_hash fausse ne trouverait aucune paire
+MAINNET_PAIRS = {
+    'uniswap': {
+        USDT_ADDRESS: '0x0d4a11d5EEaaC28EC3F61d100daF4d40471f1852',
+        USDC_ADDRESS: '0xB4e16d0168e52d35CaCD2c6185b44281Ec28C9Dc',
+    },
+    'sushiswap': {
+        USDT_ADDRESS: '0x06da0fd433C1A5d7a4faa01111c044910A184553',
+        USDC_ADDRESS: '0x397FF1542f962076d0BFE58eA045FfA2d347ACa0',
+    },
+}
+
+
+def test_default_venues_derive_mainnet_pair_addresses():
+    venues = {venue.name: venue for venue in DEFAULT_VENUES}
+    for name, pairs in MAINNET_PAIRS.items():
+        venue = venues[name]
+        for quote, pair_address in pairs.items():
+            # L'ordre des tokens ne change pas l'adresse
+            assert compute_pair_address(venue.factory, venue.init_code_hash, WETH_ADDRESS, quote) == pair_address
+            assert compute_pair_address(venue.factory, venue.init_code_hash, quote, WETH_ADDRESS) == pair_address
+            assert compute_pair_address(
+                venue.factory, venue.init_code_hash, WETH_ADDRESS, quote, checksum=False
+            ) == pair_address.lower()